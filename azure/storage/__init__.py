@@ -33,15 +33,30 @@ from .models import (
     GeoReplication,
     LocationMode,
     RetryContext,
+    ConnectionPoolStats,
+    OperationMetrics,
+    MetricsSnapshot,
+    RequestTiming,
+    TimingReport,
 )
 
 from .retry import (
     ExponentialRetry,
     LinearRetry,
+    DecorrelatedJitterRetry,
+    RetryBudget,
     no_retry,
 )
 
+from ._concurrency import AdaptiveConcurrencyLimiter
+from ._health import EndpointHealthTracker
+from ._metrics import StorageMetrics
+from ._http import HTTPTransport
 from .cloudstorageaccount import CloudStorageAccount
 from .sharedaccesssignature import (
     SharedAccessSignature,
 )
+
+import sys
+if sys.version_info >= (3, 5):
+    from ._http.http2client import HTTP2Transport
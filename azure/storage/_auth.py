@@ -12,21 +12,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import hashlib
+import hmac
+
 from ._common_conversion import (
-    _sign_string,
+    _decode_base64_to_bytes,
+    _encode_base64,
+)
+from .models import _unicode_type
+
+_SIGNED_HEADERS = (
+    'content-encoding', 'content-language', 'content-length',
+    'content-md5', 'content-type', 'date', 'if-modified-since',
+    'if-match', 'if-none-match', 'if-unmodified-since', 'byte_range'
 )
 
+_TABLE_SIGNED_HEADERS = ('content-md5', 'content-type', 'x-ms-date')
+
 
 class _StorageSharedKeyAuthentication(object):
     def __init__(self, account_name, account_key):
         self.account_name = account_name
         self.account_key = account_key
 
-    def _get_headers(self, request, headers_to_sign):
-        headers = dict((name.lower(), value) for name, value in request.headers.items() if value)
-        if 'content-length' in headers and headers['content-length'] == '0':
-            del headers['content-length']
-        return '\n'.join(headers.get(x, '') for x in headers_to_sign) + '\n'
+    @property
+    def account_key(self):
+        return self._account_key
+
+    @account_key.setter
+    def account_key(self, account_key):
+        # The key is decoded once, and each request signed with a copy of an
+        # HMAC already keyed with it
+        self._account_key = account_key
+        self._hmac = None
+        if account_key is not None:
+            self._hmac = hmac.HMAC(_decode_base64_to_bytes(account_key), digestmod=hashlib.sha256)
+
+    def _get_lowercase_headers(self, request):
+        return {name.lower(): value for name, value in request.headers.items() if value is not None}
+
+    def _get_headers(self, headers, headers_to_sign):
+        values = [headers.get(x) or '' for x in headers_to_sign]
+        if headers.get('content-length') == '0' and 'content-length' in headers_to_sign:
+            values[headers_to_sign.index('content-length')] = ''
+        values.append('')
+        return '\n'.join(values)
 
     def _get_verb(self, request):
         return request.method + '\n'
@@ -35,64 +65,49 @@ class _StorageSharedKeyAuthentication(object):
         uri_path = request.path.split('?')[0]
         return '/' + self.account_name + uri_path
 
-    def _get_canonicalized_headers(self, request):
-        string_to_sign = ''
-        x_ms_headers = []
-        for name, value in request.headers.items():
-            if name.startswith('x-ms-'):
-                x_ms_headers.append((name.lower(), value))
-        x_ms_headers.sort()
-        for name, value in x_ms_headers:
-            if value is not None:
-                string_to_sign += ''.join([name, ':', value, '\n'])
-        return string_to_sign
+    def _get_canonicalized_headers(self, headers):
+        x_ms_headers = sorted(item for item in headers.items() if item[0].startswith('x-ms-'))
+        return ''.join([name + ':' + value + '\n' for name, value in x_ms_headers])
+
+    def _sign(self, string_to_sign):
+        if isinstance(string_to_sign, _unicode_type):
+            string_to_sign = string_to_sign.encode('utf-8')
+        signed_hmac_sha256 = self._hmac.copy()
+        signed_hmac_sha256.update(string_to_sign)
+        return _encode_base64(signed_hmac_sha256.digest())
 
     def _add_authorization_header(self, request, string_to_sign):
-        signature = _sign_string(self.account_key, string_to_sign)
+        signature = self._sign(string_to_sign)
         auth_string = 'SharedKey ' + self.account_name + ':' + signature
         request.headers['Authorization'] = auth_string
 
 
 class _StorageSharedKeyAuthentication(_StorageSharedKeyAuthentication):
     def sign_request(self, request):
-        string_to_sign = \
-            self._get_verb(request) + \
-            self._get_headers(
-                request,
-                [
-                    'content-encoding', 'content-language', 'content-length',
-                    'content-md5', 'content-type', 'date', 'if-modified-since',
-                    'if-match', 'if-none-match', 'if-unmodified-since', 'byte_range'
-                ]
-            ) + \
-            self._get_canonicalized_headers(request) + \
-            self._get_canonicalized_resource(request) + \
-            self._get_canonicalized_resource_query(request)
+        headers = self._get_lowercase_headers(request)
+        string_to_sign = ''.join([
+            self._get_verb(request),
+            self._get_headers(headers, _SIGNED_HEADERS),
+            self._get_canonicalized_headers(headers),
+            self._get_canonicalized_resource(request),
+            self._get_canonicalized_resource_query(request),
+        ])
 
         self._add_authorization_header(request, string_to_sign)
 
     def _get_canonicalized_resource_query(self, request):
-        sorted_queries = [(name, value) for name, value in request.query.items()]
-        sorted_queries.sort()
-
-        string_to_sign = ''
-        for name, value in sorted_queries:
-            if value:
-                string_to_sign += '\n' + name.lower() + ':' + value
-
-        return string_to_sign
+        sorted_queries = sorted(request.query.items())
+        return ''.join(['\n' + name.lower() + ':' + value for name, value in sorted_queries if value])
 
 
 class _StorageTableSharedKeyAuthentication(_StorageSharedKeyAuthentication):
     def sign_request(self, request):
-        string_to_sign = \
-            self._get_verb(request) + \
-            self._get_headers(
-                request,
-                ['content-md5', 'content-type', 'x-ms-date'],
-            ) + \
-            self._get_canonicalized_resource(request) + \
-            self._get_canonicalized_resource_query(request)
+        string_to_sign = ''.join([
+            self._get_verb(request),
+            self._get_headers(self._get_lowercase_headers(request), _TABLE_SIGNED_HEADERS),
+            self._get_canonicalized_resource(request),
+            self._get_canonicalized_resource_query(request),
+        ])
 
         self._add_authorization_header(request, string_to_sign)
 
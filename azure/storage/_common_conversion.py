@@ -17,11 +17,13 @@ import base64
 import hashlib
 import hmac
 import sys
+from datetime import datetime
 from dateutil.tz import tzutc
 
 from .models import (
     _unicode_type,
 )
+from ._timing import _timed_cpu
 
 if sys.version_info < (3,):
     def _str(value):
@@ -53,6 +55,66 @@ def _bool_to_str(value):
 def _to_utc_datetime(value):
     return value.strftime('%Y-%m-%dT%H:%M:%SZ')
 
+_UTC = tzutc()
+
+_MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+           'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+
+# The number of dates _parse_date keeps parsed. The dates of the entries of a
+# listing, or of the messages of a queue, are given to the second and often
+# repeat.
+_DATE_CACHE_SIZE = 1024
+_date_cache = {}
+
+def _parse_date(value):
+    '''
+    Parses a date returned by the service, in the RFC 1123 format of headers, 
+    such as Mon, 01 Aug 2016 00:00:00 GMT, or in the ISO 8601 format of 
+    response bodies, such as 2016-08-01T00:00:00.0000000Z. Dates in any other 
+    format are parsed by dateutil.
+    '''
+    date = _date_cache.get(value)
+    if date is not None:
+        return date
+
+    try:
+        date = _parse_fixed_format_date(value)
+    except (ValueError, KeyError, TypeError):
+        date = None
+
+    if date is None:
+        from dateutil import parser
+        return parser.parse(value)
+
+    if len(_date_cache) >= _DATE_CACHE_SIZE:
+        _date_cache.clear()
+    _date_cache[value] = date
+    return date
+
+def _parse_fixed_format_date(value):
+    length = len(value)
+    if length == 29 and value[3:5] == ', ' and value[25:] == ' GMT' \
+            and value[19] == ':' and value[22] == ':':
+        return datetime(int(value[12:16]), _MONTHS[value[8:11]], int(value[5:7]),
+                        int(value[17:19]), int(value[20:22]), int(value[23:25]), tzinfo=_UTC)
+
+    if length >= 20 and value[-1] == 'Z' and value[4] == '-' and value[7] == '-' \
+            and value[10] == 'T' and value[13] == ':' and value[16] == ':':
+        microsecond = 0
+        if length > 20:
+            # The service gives up to 7 digits, which are truncated to 
+            # microseconds as dateutil does
+            fraction = value[20:-1]
+            if value[19] != '.' or not fraction.isdigit():
+                return None
+            microsecond = int(fraction[:6].ljust(6, '0'))
+
+        return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                        int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                        microsecond, tzinfo=_UTC)
+
+    return None
+
 def _datetime_to_utc_string(value):
     # Azure expects the date value passed in to be UTC.
     # Azure will always return values as UTC.
@@ -96,10 +158,18 @@ def _sign_string(key, string_to_sign, key_is_base64=True):
     encoded_digest = _encode_base64(digest)
     return encoded_digest
 
+@_timed_cpu('hash')
 def _get_content_md5(data):
     md5 = hashlib.md5()
     md5.update(data)
     return base64.b64encode(md5.digest()).decode('utf-8') 
 
+def _xml_escape(text):
+    # As xml.sax.saxutils.escape, which imports urllib.request on first import
+    return text.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;')
+
+def _xml_unescape(text):
+    return text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&')
+
 def _lower(text):
     return text.lower()
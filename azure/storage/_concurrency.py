@@ -0,0 +1,165 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import threading
+from time import time
+
+# The status codes the service returns when a scalability target is exceeded,
+# 503 Server Busy and 500 Operation Timed Out.
+_THROTTLING_STATUSES = (500, 503)
+
+# The weight of each new latency in the average latency of a host.
+_LATENCY_WEIGHT = 0.1
+
+
+class AdaptiveConcurrencyLimiter(object):
+    '''
+    Limits the number of requests in flight to each host, such as the blob or
+    queue endpoint of an account, and adapts the limit to the responses. The
+    limit is cut by decrease_factor when the service throttles a request, at
+    most once for the requests in flight at the time, and grows by one for
+    each limit's worth of requests which succeed within latency_tolerance
+    times the average latency of the host. Requests over the limit wait for
+    one in flight to complete.
+
+    Set the same limiter on the service clients of an account so its requests
+    all count towards the same limits. Chunked uploads and downloads, queue
+    messages and table batches sent through these clients then slow down
+    together when the account reaches its scalability targets, rather than
+    each retrying on its own.
+    '''
+
+    def __init__(self, initial_limit=16, min_limit=1, max_limit=256, decrease_factor=0.5,
+                 latency_tolerance=2.0):
+        '''
+        :param int initial_limit:
+            The number of requests allowed in flight to a host before any
+            response is received.
+        :param int min_limit:
+            The least number of requests allowed in flight to a host.
+        :param int max_limit:
+            The most requests allowed in flight to a host.
+        :param float decrease_factor:
+            The factor the limit is multiplied by when a request is throttled.
+        :param float latency_tolerance:
+            A request taking longer than this many times the average latency of
+            the host does not grow the limit.
+        '''
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get_host(self, host):
+        with self._lock:
+            host_limit = self._hosts.get(host)
+            if host_limit is None:
+                host_limit = _HostLimit(self, self.initial_limit)
+                self._hosts[host] = host_limit
+            return host_limit
+
+    def acquire(self, host):
+        '''
+        Waits until a request may be sent to the host.
+
+        :param str host:
+            The host the request is sent to.
+        :return: The slot taken, to be released once the response is received.
+        :rtype: _ConcurrencySlot
+        '''
+        return self._get_host(host).acquire()
+
+    def get_limit(self, host):
+        '''
+        :param str host:
+            The host the requests are sent to.
+        :return: The number of requests currently allowed in flight to the host.
+        :rtype: int
+        '''
+        return self._get_host(host).get_limit()
+
+    def get_throttled(self, host):
+        '''
+        :param str host:
+            The host the requests are sent to.
+        :return: The number of requests to the host the service throttled.
+        :rtype: int
+        '''
+        return self._get_host(host).throttled
+
+
+class _HostLimit(object):
+    def __init__(self, limiter, limit):
+        self.limiter = limiter
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.throttled = 0
+        self.latency = None
+        self.decreased = 0
+        self.condition = threading.Condition()
+
+    def get_limit(self):
+        with self.condition:
+            return int(self.limit)
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+        return _ConcurrencySlot(self, time())
+
+    def release(self, started, status):
+        limiter = self.limiter
+        latency = time() - started
+        with self.condition:
+            self.in_flight -= 1
+
+            if status in _THROTTLING_STATUSES:
+                self.throttled += 1
+
+                # Requests sent before the last decrease reflect the old limit
+                if started >= self.decreased:
+                    self.limit = max(limiter.min_limit, self.limit * limiter.decrease_factor)
+                    self.decreased = time()
+            elif status is not None and status < 300:
+                if self.latency is None:
+                    self.latency = latency
+                elif latency <= self.latency * limiter.latency_tolerance:
+                    self.limit = min(limiter.max_limit, self.limit + 1.0 / self.limit)
+                self.latency += (latency - self.latency) * _LATENCY_WEIGHT
+
+            self.condition.notify_all()
+
+
+class _ConcurrencySlot(object):
+    '''
+    A request allowed in flight by an AdaptiveConcurrencyLimiter.
+    '''
+
+    def __init__(self, host_limit, started):
+        self._host_limit = host_limit
+        self._started = started
+
+    def release(self, status):
+        '''
+        Frees the slot for another request and adjusts the limit.
+
+        :param int status:
+            The status of the response, or None if no response was received.
+        '''
+        self._host_limit.release(self._started, status)
@@ -39,5 +39,12 @@ DEV_ACCOUNT_KEY = 'Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6t
 # Socket timeout in seconds is 11
 SOCKET_TIMEOUT = 11
 
+# Size of the thread pool shared by the chunked transfers of a service client
+MAX_TRANSFER_CONNECTIONS = 64
+
+# Pooled connections idle for longer than this many seconds are closed rather
+# than reused, as load balancers and NATs commonly drop them after 4 minutes.
+CONNECTION_IDLE_TIMEOUT = 120
+
 #Encryption constants
 _ENCRYPTION_PROTOCOL_V1 = '1.0'
\ No newline at end of file
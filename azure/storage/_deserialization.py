@@ -12,8 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from dateutil import parser
-from ._common_conversion import _to_str
+import base64
+import hashlib
+from ._common_conversion import (
+    _parse_date,
+    _to_str,
+)
+from ._timing import (
+    _cpu_timer,
+    _get_thread_timing,
+    _timed_cpu,
+)
 try:
     from xml.etree import cElementTree as ETree
 except ImportError:
@@ -31,6 +40,10 @@ from .models import (
     ServiceStats,
 )
 
+# The size of the pieces read from a streamed response body before being 
+# written to the destination stream.
+_STREAM_READ_SIZE = 64 * 1024
+
 def _int_to_str(value):
     return value if value is None else int(value)
 
@@ -45,7 +58,7 @@ def _get_download_size(start_range, end_range, resource_size):
         return resource_size
 
 GET_PROPERTIES_ATTRIBUTE_MAP = {
-    'last-modified': (None, 'last_modified', parser.parse),
+    'last-modified': (None, 'last_modified', _parse_date),
     'etag': (None, 'etag', _to_str),
     'x-ms-blob-type': (None, 'blob_type', _to_str),
     'content-length': (None, 'content_length', _int_to_str),
@@ -66,7 +79,7 @@ GET_PROPERTIES_ATTRIBUTE_MAP = {
     'x-ms-copy-source': ('copy', 'source', _to_str),
     'x-ms-copy-status': ('copy', 'status', _to_str),
     'x-ms-copy-progress': ('copy', 'progress', _to_str),
-    'x-ms-copy-completion-time': ('copy', 'completion_time', parser.parse),
+    'x-ms-copy-completion-time': ('copy', 'completion_time', _parse_date),
     'x-ms-copy-status-description': ('copy', 'status_description', _to_str),
 }
 
@@ -148,11 +161,11 @@ def _convert_xml_to_signed_identifiers(response):
         if access_policy_element is not None:
             start_element = access_policy_element.find('Start')
             if start_element is not None:
-                access_policy.start = parser.parse(start_element.text)
+                access_policy.start = _parse_date(start_element.text)
 
             expiry_element = access_policy_element.find('Expiry')
             if expiry_element is not None:
-                access_policy.expiry = parser.parse(expiry_element.text)
+                access_policy.expiry = _parse_date(expiry_element.text)
 
             access_policy.permission = access_policy_element.findtext('Permission')
 
@@ -179,7 +192,7 @@ def _convert_xml_to_service_stats(response):
 
     geo_replication = GeoReplication()
     geo_replication.status = geo_replication_element.find('Status').text
-    geo_replication.last_sync_time = parser.parse(geo_replication_element.find('LastSyncTime').text)
+    geo_replication.last_sync_time = _parse_date(geo_replication_element.find('LastSyncTime').text)
 
     service_stats = ServiceStats()
     service_stats.geo_replication = geo_replication
@@ -328,4 +341,66 @@ def _convert_xml_to_retention_policy(xml, retention_policy):
 
 
 def _bool(value):
-    return value.lower() == 'true'
\ No newline at end of file
+    return value.lower() == 'true'
+
+def _is_seekable(stream):
+    try:
+        return stream.seekable()
+    except AttributeError:
+        # Python 2 files and other streams without seekable()
+        try:
+            stream.tell()
+            return hasattr(stream, 'seek')
+        except Exception:
+            return False
+
+def _can_overwrite(stream):
+    '''
+    Returns whether data written to the stream can later be rewritten by
+    seeking back, which streaming a range requires to retry safely. This is
+    not the case for files opened for appending, which always write at the end.
+    '''
+    mode = getattr(stream, 'mode', None)
+    if isinstance(mode, str) and 'a' in mode:
+        return False
+    return _is_seekable(stream)
+
+class _RangeStreamWriter(object):
+    '''
+    Writes the body of a ranged get into a seekable stream. Offsets passed to 
+    write are relative to the start of the range, so a retried request simply 
+    overwrites the data a failed attempt had already written. A lock must be 
+    supplied if the stream is shared between threads.
+    '''
+    def __init__(self, stream, stream_offset, stream_lock=None):
+        self.stream = stream
+        self.stream_offset = stream_offset
+        self.stream_lock = stream_lock
+
+    @_timed_cpu('write')
+    def write(self, offset, data):
+        if self.stream_lock is not None:
+            with self.stream_lock:
+                self.stream.seek(self.stream_offset + offset)
+                self.stream.write(data)
+        else:
+            self.stream.seek(self.stream_offset + offset)
+            self.stream.write(data)
+
+def _write_response_body(response, stream_writer, compute_md5=False):
+    '''
+    Drains a streamed response body into the stream writer without holding 
+    more than one piece of it in memory. Returns the base64 encoded MD5 of the 
+    body if compute_md5 is set, otherwise None.
+    '''
+    md5 = hashlib.md5() if compute_md5 else None
+    thread_timing = _get_thread_timing()
+    offset = 0
+    for data in response.iter_content(_STREAM_READ_SIZE):
+        if md5 is not None:
+            with _cpu_timer(thread_timing, 'hash'):
+                md5.update(data)
+        stream_writer.write(offset, data)
+        offset += len(data)
+
+    return base64.b64encode(md5.digest()).decode('utf-8') if md5 is not None else None
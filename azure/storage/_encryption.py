@@ -27,11 +27,14 @@ from ._error import(
     _validate_key_encryption_key_unwrap,
     _validate_kek_id,
 )
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.ciphers.algorithms import AES
-from cryptography.hazmat.primitives.ciphers.modes import CBC
-from cryptography.hazmat.primitives.ciphers import Cipher
 from collections import OrderedDict
+from json import loads
+from threading import Lock
+from time import time
+
+# Unwrapped content encryption keys are kept for at most this many seconds
+_CONTENT_KEY_CACHE_TTL = 300
+_CONTENT_KEY_CACHE_SIZE = 128
 
 class _EncryptionAlgorithm(object):
     '''
@@ -142,6 +145,64 @@ def _generate_encryption_data_dict(kek, cek, iv):
     
     return encryption_data_dict
 
+class _ExpiringCache(object):
+    '''
+    A thread safe cache holding at most max_size values, each for at most ttl
+    seconds. The least recently used value is evicted when the cache is full.
+    '''
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._values.pop(key, None)
+            if entry is None:
+                return None
+
+            value, expiry = entry
+            if expiry <= time():
+                return None
+
+            # Reinsert to mark the value as the most recently used
+            self._values[key] = entry
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._values.pop(key, None)
+            while len(self._values) >= self.max_size:
+                self._values.popitem(last=False)
+            self._values[key] = (value, time() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+# Shared by blob, queue and table decryption so that a key is unwrapped once
+# per object rather than once per range or message.
+_CONTENT_KEY_CACHE = _ExpiringCache(_CONTENT_KEY_CACHE_SIZE, _CONTENT_KEY_CACHE_TTL)
+_ENCRYPTION_DATA_CACHE = _ExpiringCache(_CONTENT_KEY_CACHE_SIZE, _CONTENT_KEY_CACHE_TTL)
+
+def _json_to_encryption_data(encryption_data_json):
+    '''
+    Parses the JSON form of the encryption data, as stored in the metadata of
+    a blob, reusing the result for each range of the same blob.
+
+    :param str encryption_data_json:
+        The JSON string containing the encryption data.
+    :return: an _EncryptionData object built from the JSON string.
+    :rtype: _EncryptionData
+    '''
+    encryption_data = _ENCRYPTION_DATA_CACHE.get(encryption_data_json)
+    if encryption_data is None:
+        encryption_data = _dict_to_encryption_data(loads(encryption_data_json))
+        _ENCRYPTION_DATA_CACHE.put(encryption_data_json, encryption_data)
+    return encryption_data
+
 def _dict_to_encryption_data(encryption_data_dict):
     '''
     Converts the specified dictionary to an EncryptionData object for
@@ -187,12 +248,34 @@ def _generate_AES_CBC_cipher(cek, iv):
     :return: A cipher for encrypting in AES256 CBC.
     :rtype: ~cryptography.hazmat.primitives.ciphers.Cipher
     '''
-    
+    # cryptography is imported on first use, so the services can be imported
+    # without loading it when client-side encryption is not used
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.ciphers import Cipher
+    from cryptography.hazmat.primitives.ciphers.algorithms import AES
+    from cryptography.hazmat.primitives.ciphers.modes import CBC
+
     backend = default_backend()
     algorithm = AES(cek)
     mode = CBC(iv)
     return Cipher(algorithm, mode, backend)
 
+def _get_PKCS7_padder():
+    '''
+    Returns a PKCS7 padder with 16 byte blocks, which ensures compatibility 
+    with AES.
+    '''
+    from cryptography.hazmat.primitives.padding import PKCS7
+    return PKCS7(128).padder()
+
+def _get_PKCS7_unpadder():
+    '''
+    Returns a PKCS7 unpadder with 16 byte blocks, for data padded by 
+    _get_PKCS7_padder.
+    '''
+    from cryptography.hazmat.primitives.padding import PKCS7
+    return PKCS7(128).unpadder()
+
 def _validate_and_unwrap_cek(encryption_data, key_encryption_key=None, key_resolver=None):
     '''
     Extracts and returns the content_encryption_key stored in the encryption_data object
@@ -214,19 +297,36 @@ def _validate_and_unwrap_cek(encryption_data, key_encryption_key=None, key_resol
     
     _validate_encryption_protocol_version(encryption_data.encryption_agent.protocol)
 
-    content_encryption_key = None
+    wrapped_content_key = encryption_data.wrapped_content_key
+
+    # Keys unwrapped by one resolver or key_encryption_key are not reused by others.
+    cache_key = (key_resolver if key_resolver is not None else key_encryption_key,
+                 wrapped_content_key.key_id,
+                 wrapped_content_key.encrypted_key,
+                 wrapped_content_key.algorithm)
+    try:
+        content_encryption_key = _CONTENT_KEY_CACHE.get(cache_key)
+    except TypeError:
+        # The resolver or key_encryption_key is not hashable
+        cache_key = content_encryption_key = None
+    if content_encryption_key is not None:
+        if key_resolver is None:
+            _validate_kek_id(wrapped_content_key.key_id, key_encryption_key.get_kid())
+        return content_encryption_key
 
     # If the resolver exists, give priority to the key it finds.
     if key_resolver is not None:
-        key_encryption_key = key_resolver(encryption_data.wrapped_content_key.key_id)
+        key_encryption_key = key_resolver(wrapped_content_key.key_id)
 
     _validate_not_none('key_encryption_key', key_encryption_key)
     _validate_key_encryption_key_unwrap(key_encryption_key)
-    _validate_kek_id(encryption_data.wrapped_content_key.key_id, key_encryption_key.get_kid())
+    _validate_kek_id(wrapped_content_key.key_id, key_encryption_key.get_kid())
 
     # Will throw an exception if the specified algorithm is not supported.
-    content_encryption_key = key_encryption_key.unwrap_key(encryption_data.wrapped_content_key.encrypted_key,
-                                                           encryption_data.wrapped_content_key.algorithm)
+    content_encryption_key = key_encryption_key.unwrap_key(wrapped_content_key.encrypted_key,
+                                                           wrapped_content_key.algorithm)
     _validate_not_none('content_encryption_key', content_encryption_key)
 
+    if cache_key is not None:
+        _CONTENT_KEY_CACHE.put(cache_key, content_encryption_key)
     return content_encryption_key
\ No newline at end of file
@@ -0,0 +1,173 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import threading
+from collections import deque
+from time import time
+
+from .models import LocationMode
+
+
+class EndpointHealthTracker(object):
+    '''
+    Tracks the error rate and latency of the requests sent to the primary and
+    secondary locations of a storage account over a rolling window, and opens
+    the circuit of a location whose requests fail too often. While the circuit
+    of the location a client reads from is open, operations which may be sent
+    to either location, such as reads from an account with read-access
+    geo-redundant replication, go to the other location instead of each
+    waiting for the unhealthy one to fail first. Operations which may only be
+    sent to one location, such as writes, are sent as usual.
+
+    Once open_seconds have passed a single request is let through to the
+    location as a probe. The circuit closes when a request to the location
+    succeeds, and stays open for another open_seconds if the probe fails.
+
+    A request fails if no response is received, if the response is a server
+    error or a timeout, or if it took longer than max_latency when set.
+    '''
+
+    def __init__(self, window_seconds=60, min_requests=10, max_error_rate=0.5,
+                 max_latency=None, open_seconds=30):
+        '''
+        :param float window_seconds:
+            The number of seconds of requests the error rate and latency are
+            computed over.
+        :param int min_requests:
+            The number of requests in the window needed before the circuit of
+            a location is opened.
+        :param float max_error_rate:
+            The fraction of the requests in the window which must fail for the
+            circuit to open.
+        :param float max_latency:
+            If set, requests taking longer than this many seconds count as
+            failed.
+        :param float open_seconds:
+            The number of seconds a circuit stays open before a probe is sent.
+        '''
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.max_error_rate = max_error_rate
+        self.max_latency = max_latency
+        self.open_seconds = open_seconds
+        self._locations = {
+            LocationMode.PRIMARY: _LocationHealth(),
+            LocationMode.SECONDARY: _LocationHealth(),
+        }
+        self._lock = threading.Lock()
+
+    def is_open(self, location_mode):
+        '''
+        :param str location_mode:
+            The :class:`~azure.storage.models.LocationMode` of the location.
+        :return: Whether the circuit of the location is open.
+        :rtype: bool
+        '''
+        with self._lock:
+            return self._locations[location_mode].opened is not None
+
+    def get_error_rate(self, location_mode):
+        '''
+        :param str location_mode:
+            The :class:`~azure.storage.models.LocationMode` of the location.
+        :return: The fraction of the requests to the location in the window
+            which failed, or 0 if there were none.
+        :rtype: float
+        '''
+        with self._lock:
+            health = self._locations[location_mode]
+            health.trim(time() - self.window_seconds)
+            if not health.samples:
+                return 0.0
+            return float(health.failures) / len(health.samples)
+
+    def get_latency(self, location_mode):
+        '''
+        :param str location_mode:
+            The :class:`~azure.storage.models.LocationMode` of the location.
+        :return: The average latency of the requests to the location in the
+            window, in seconds, or None if there were none.
+        :rtype: float
+        '''
+        with self._lock:
+            health = self._locations[location_mode]
+            health.trim(time() - self.window_seconds)
+            if not health.samples:
+                return None
+            return health.total_latency / len(health.samples)
+
+    def _is_available(self, location_mode):
+        # Lets a single probe through once the circuit has been open long enough
+        with self._lock:
+            health = self._locations[location_mode]
+            if health.opened is None:
+                return True
+
+            now = time()
+            if now - health.opened >= self.open_seconds and \
+                    (health.probed is None or now - health.probed >= self.open_seconds):
+                health.probed = now
+                return True
+            return False
+
+    def _record(self, location_mode, status, latency):
+        failed = status is None or status >= 500 or status == 408 or \
+            (self.max_latency is not None and latency > self.max_latency)
+
+        with self._lock:
+            health = self._locations[location_mode]
+            now = time()
+
+            if health.opened is not None:
+                if failed:
+                    # Wait for another period before the next probe
+                    health.opened = now
+                    health.probed = None
+                else:
+                    health.opened = None
+                    health.probed = None
+                    health.clear()
+                return
+
+            health.add(now, failed, latency)
+            health.trim(now - self.window_seconds)
+            if len(health.samples) >= self.min_requests and \
+                    health.failures >= self.max_error_rate * len(health.samples):
+                health.opened = now
+                health.clear()
+
+
+class _LocationHealth(object):
+    def __init__(self):
+        self.samples = deque()
+        self.failures = 0
+        self.total_latency = 0.0
+        self.opened = None
+        self.probed = None
+
+    def add(self, now, failed, latency):
+        self.samples.append((now, failed, latency))
+        self.failures += failed
+        self.total_latency += latency
+
+    def trim(self, oldest):
+        while self.samples and self.samples[0][0] < oldest:
+            _, failed, latency = self.samples.popleft()
+            self.failures -= failed
+            self.total_latency -= latency
+
+    def clear(self):
+        self.samples.clear()
+        self.failures = 0
+        self.total_latency = 0.0
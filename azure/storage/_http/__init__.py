@@ -39,6 +39,10 @@ class HTTPResponse(object):
 
     '''
     Represents a response from an HTTP request.
+
+    If the request was sent in streaming mode, body is None and the content must 
+    be read with iter_content or readinto. The response should then be closed 
+    to release the connection whether or not the content was fully read.
     
     :ivar int status:
         the status code of the response
@@ -47,14 +51,120 @@ class HTTPResponse(object):
     :ivar dict headers:
         the returned headers
     :ivar bytes body:
-        the body of the response
+        the body of the response, or None if the body is streamed
     '''
 
-    def __init__(self, status, message, headers, body):
+    def __init__(self, status, message, headers, body, raw=None):
         self.status = status
         self.message = message
         self.headers = headers
         self.body = body
+        self._raw = raw
+
+    def iter_content(self, chunk_size):
+        '''
+        Iterates over the body of the response in pieces of at most chunk_size 
+        bytes. If the body was already read into memory it is returned as a 
+        single piece.
+
+        :param int chunk_size:
+            The maximum number of bytes to return at a time.
+        '''
+        if self._raw is None:
+            if self.body:
+                yield self.body
+            return
+
+        while True:
+            data = self._raw.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+    def readinto(self, buffer):
+        '''
+        Reads the next bytes of a streamed body into a pre-allocated, writable 
+        buffer. Returns the number of bytes read, which is 0 once the body is 
+        exhausted.
+
+        :param buffer:
+            A bytearray or writable memoryview to read into.
+        :return: The number of bytes read.
+        :rtype: int
+        '''
+        if self._raw is None:
+            raise ValueError('readinto is only supported on streamed responses.')
+        return self._raw.readinto(buffer)
+
+    def close(self):
+        '''
+        Releases the connection held by a streamed response. This is a no-op if 
+        the body was not streamed.
+        '''
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+
+class HTTPTransport(object):
+
+    '''
+    The interface through which service clients send their requests. A service 
+    client uses a requests based transport unless its transport is set to 
+    another implementation, such as :class:`~azure.storage.HTTP2Transport`.
+
+    :ivar str protocol:
+        http or https. If None when the transport is set on a service client, 
+        the protocol of the client is used.
+    :ivar int timeout:
+        The timeout for connecting and for each read of the response, in 
+        seconds. If None when the transport is set on a service client, the 
+        timeout of the client is used.
+    :ivar session:
+        The session object the transport sends requests with, or None if it 
+        has none.
+    '''
+
+    def __init__(self, protocol=None, timeout=None, session=None):
+        self.protocol = protocol
+        self.timeout = timeout
+        self.session = session
+
+    def perform_request(self, request, stream=False):
+        '''
+        Sends an HTTPRequest and returns an HTTPResponse, whatever its status.
+
+        :param HTTPRequest request:
+            The request to send.
+        :param bool stream:
+            If True, the body of a successful response is not read into memory. 
+            The response must then expose it through HTTPResponse.iter_content 
+            and readinto, and release the connection when closed.
+        :return: The response received.
+        :rtype: :class:`~azure.storage._http.HTTPResponse`
+        '''
+        raise NotImplementedError()
+
+    def set_proxy(self, host, port, user, password):
+        '''
+        Sets the proxy server host and port for the HTTP CONNECT Tunnelling.
+        '''
+        raise NotImplementedError()
+
+    def get_stats(self):
+        '''
+        :return: Statistics of the connections used, or None if the transport 
+            does not keep any.
+        :rtype: :class:`~azure.storage.models.ConnectionPoolStats`
+        '''
+        return None
+
+    def close(self):
+        '''
+        Releases the connections held by the transport. The transport may still 
+        be used afterward.
+        '''
+        pass
 
 
 class HTTPRequest(object):
@@ -0,0 +1,135 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+from . import HTTPResponse
+
+_ERROR_AIOHTTP_MISSING = \
+    'The async clients require the aiohttp package. Install it with ' \
+    '"pip install azure-storage[async]".'
+
+
+def _import_aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError(_ERROR_AIOHTTP_MISSING)
+    return aiohttp
+
+
+class _AsyncHTTPClient(object):
+
+    '''
+    Takes the request and sends it to cloud service and returns the response,
+    without blocking the event loop. Requires the aiohttp package.
+    '''
+
+    def __init__(self, protocol=None, session=None, timeout=None):
+        '''
+        :param str protocol:
+            http or https.
+        :param aiohttp.ClientSession session:
+            session object created with aiohttp. If not specified, one is
+            created on first use, in the running event loop, and closed by close.
+        :param int timeout:
+            timeout for connecting and for each read of the response, in
+            seconds. As for the requests based client, it does not limit the
+            time taken by a whole request.
+        '''
+        # Fail on construction rather than on the first request
+        self._aiohttp = _import_aiohttp()
+
+        self.protocol = protocol
+        self.session = session
+        self.timeout = timeout
+        self.proxy = None
+
+        self._owns_session = session is None
+
+    def set_proxy(self, host, port, user, password):
+        '''
+        Sets the proxy server host and port for the HTTP CONNECT Tunnelling.
+
+        :param str host:
+            Address of the proxy. Ex: '192.168.0.100'
+        :param int port:
+            Port of the proxy. Ex: 6000
+        :param str user:
+            User for proxy authorization.
+        :param str password:
+            Password for proxy authorization.
+        '''
+        if user and password:
+            proxy_string = '{}:{}@{}:{}'.format(user, password, host, port)
+        else:
+            proxy_string = '{}:{}'.format(host, port)
+
+        self.proxy = 'http://{}'.format(proxy_string)
+
+    def _get_session(self):
+        if self.session is None:
+            # aiohttp decompresses bodies by default which would break MD5
+            # validation. Accept-Encoding is not sent for the same reason.
+            self.session = self._aiohttp.ClientSession(auto_decompress=False)
+        return self.session
+
+    async def perform_request(self, request, stream=False):
+        '''
+        Sends an HTTPRequest to Azure Storage and returns an HTTPResponse.
+
+        :param HTTPRequest request:
+            The request to serialize and send.
+        :param bool stream:
+            Accepted for compatibility with the synchronous client. The body
+            is always read into memory.
+        :return: An HTTPResponse containing the parsed HTTP response.
+        :rtype: :class:`~azure.storage._http.HTTPResponse`
+        '''
+        # Verify the body is in bytes or a buffer of bytes
+        if request.body:
+            assert isinstance(request.body, (bytes, bytearray, memoryview))
+
+        # Construct the URI
+        uri = self.protocol.lower() + '://' + request.host + request.path
+
+        # Unlike requests, aiohttp does not drop parameters and headers set to None
+        params = dict((name, value) for name, value in request.query.items() if value is not None)
+        headers = dict((name, value) for name, value in request.headers.items() if value is not None)
+
+        # Send the request. Content-Type is skipped so the signed headers are
+        # exactly the ones sent.
+        async with self._get_session().request(
+                request.method,
+                uri,
+                params=params,
+                headers=headers,
+                data=request.body or None,
+                timeout=self._aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout),
+                proxy=self.proxy,
+                skip_auto_headers=('Accept', 'Accept-Encoding', 'Content-Type')) as response:
+            body = await response.read()
+
+            # Parse the response
+            respheaders = {}
+            for key, name in response.headers.items():
+                respheaders[key.lower()] = name
+
+            return HTTPResponse(response.status, response.reason, respheaders, body)
+
+    async def close(self):
+        '''
+        Closes the session if it was created by this client.
+        '''
+        if self._owns_session and self.session is not None:
+            session, self.session = self.session, None
+            await session.close()
@@ -0,0 +1,213 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import socket
+import threading
+from time import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import (
+    HTTPConnectionPool,
+    HTTPSConnectionPool,
+)
+
+from .._constants import CONNECTION_IDLE_TIMEOUT
+from ..models import ConnectionPoolStats
+from .._timing import _get_request_timing
+
+# Seconds a connection is idle before TCP keep-alive probes are sent
+_TCP_KEEPALIVE_IDLE = 60
+
+
+def _get_socket_options():
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, _TCP_KEEPALIVE_IDLE))
+    return options
+
+
+def _time_connection(conn, tls):
+    '''
+    Wraps the methods of a connection which open its socket, so the time spent 
+    opening it, including name resolution, and the rest of the time spent 
+    connecting, the TLS handshake when tls is set, are added to the timing of 
+    the request being sent, if any. The methods are wrapped on the instance so 
+    this works with whichever connection class the pool uses.
+    '''
+    new_conn = getattr(conn, '_new_conn', None)
+    connect = conn.connect
+
+    def timed_new_conn():
+        request_timing = _get_request_timing()
+        if request_timing is None:
+            return new_conn()
+
+        started = time()
+        try:
+            return new_conn()
+        finally:
+            request_timing.connect = (request_timing.connect or 0.0) + time() - started
+
+    def timed_connect():
+        request_timing = _get_request_timing()
+        if request_timing is None:
+            return connect()
+
+        opened = request_timing.connect or 0.0
+        started = time()
+        try:
+            return connect()
+        finally:
+            seconds = time() - started
+            if new_conn is None:
+                request_timing.connect = opened + seconds
+            elif tls:
+                opening = (request_timing.connect or 0.0) - opened
+                request_timing.tls = (request_timing.tls or 0.0) + seconds - opening
+
+    if new_conn is not None:
+        conn._new_conn = timed_new_conn
+    conn.connect = timed_connect
+    conn._timed = True
+
+
+class _PoolStatsCounter(object):
+    def __init__(self):
+        self.requests = 0
+        self.opens = 0
+        self.exhausted = 0
+        self.discards = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            return ConnectionPoolStats(self.requests, self.opens, self.exhausted, self.discards)
+
+
+class _CountingPoolMixin(object):
+    '''
+    Counts the connections handed out by a urllib3 pool and closes those which
+    were idle for too long, so a connection the server or a load balancer has
+    since dropped is not used for a request.
+    '''
+    _stats = None
+    _idle_timeout = CONNECTION_IDLE_TIMEOUT
+
+    def _get_conn(self, timeout=None):
+        exhausted = self.pool is not None and self.pool.empty()
+        conn = super(_CountingPoolMixin, self)._get_conn(timeout)
+
+        if not getattr(conn, '_timed', False):
+            _time_connection(conn, isinstance(self, HTTPSConnectionPool))
+
+        idle_since = getattr(conn, '_idle_since', None)
+        if idle_since is not None and time() - idle_since > self._idle_timeout:
+            conn.close()
+
+        with self._stats.lock:
+            self._stats.requests += 1
+            if getattr(conn, 'sock', None) is None:
+                self._stats.opens += 1
+            if exhausted:
+                self._stats.exhausted += 1
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn._idle_since = time()
+            if self.pool is not None and self.pool.full():
+                with self._stats.lock:
+                    self._stats.discards += 1
+        super(_CountingPoolMixin, self)._put_conn(conn)
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _PooledAdapter(HTTPAdapter):
+    def __init__(self, stats, idle_timeout, pool_maxsize):
+        self._stats = stats
+        self._idle_timeout = idle_timeout
+        HTTPAdapter.__init__(self, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', _get_socket_options())
+        HTTPAdapter.init_poolmanager(self, connections, maxsize, block, **pool_kwargs)
+
+        # Each pool manager gets its own classes, bound to the adapter's stats
+        attributes = {'_stats': self._stats, '_idle_timeout': self._idle_timeout}
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('_HTTPConnectionPool', (_CountingHTTPConnectionPool,), attributes),
+            'https': type('_HTTPSConnectionPool', (_CountingHTTPSConnectionPool,), attributes),
+        }
+
+    def resize(self, maxsize):
+        old_poolmanager = self.poolmanager
+        self.init_poolmanager(self._pool_connections, maxsize, self._pool_block)
+
+        # Idle connections are closed now, those in use once they are returned
+        old_poolmanager.clear()
+
+
+class _PooledSession(requests.Session):
+    '''
+    The session used by service clients when none is given. It keeps up to
+    maxsize connections per host, so that each thread of a parallel transfer
+    can reuse a connection rather than open a new one, and counts how the
+    pooled connections are used. A session may be shared by several service
+    clients, each reserving the connections it needs.
+    '''
+
+    def __init__(self, maxsize, idle_timeout=CONNECTION_IDLE_TIMEOUT):
+        '''
+        :param int maxsize:
+            The number of connections kept per host.
+        :param int idle_timeout:
+            The number of seconds a connection may be idle before it is closed
+            rather than reused.
+        '''
+        requests.Session.__init__(self)
+        self.maxsize = maxsize
+        self._stats = _PoolStatsCounter()
+        self._lock = threading.Lock()
+
+        for prefix in ('https://', 'http://'):
+            self.mount(prefix, _PooledAdapter(self._stats, idle_timeout, maxsize))
+
+    def reserve(self, maxsize):
+        '''
+        Grows the pool to keep at least maxsize connections per host.
+        '''
+        with self._lock:
+            if maxsize <= self.maxsize:
+                return
+            self.maxsize = maxsize
+            for adapter in self.adapters.values():
+                if isinstance(adapter, _PooledAdapter):
+                    adapter.resize(maxsize)
+
+    def get_stats(self):
+        '''
+        :return: The statistics of the connections used since the session was created.
+        :rtype: :class:`~azure.storage.models.ConnectionPoolStats`
+        '''
+        return self._stats.snapshot()
@@ -0,0 +1,278 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import threading
+
+from . import HTTPResponse, HTTPTransport
+from .._constants import CONNECTION_IDLE_TIMEOUT
+from ..models import ConnectionPoolStats
+
+_ERROR_HTTPX_MISSING = \
+    'HTTP2Transport requires the httpx and h2 packages. Install them with ' \
+    '"pip install azure-storage[http2]".'
+
+# The number of connections opened per host. Each carries many concurrent
+# requests as HTTP/2 streams.
+_HTTP2_MAX_CONNECTIONS = 4
+
+
+def _import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError(_ERROR_HTTPX_MISSING)
+    return httpx
+
+
+async def _next_piece(pieces):
+    try:
+        return await pieces.__anext__()
+    except StopAsyncIteration:
+        return b''
+
+
+class HTTP2Transport(HTTPTransport):
+
+    '''
+    A transport sending requests over HTTP/2 where the service supports it, so
+    the ranges of parallel transfers and other concurrent requests are
+    multiplexed over a few connections rather than each using a connection of
+    its own. Requests over plain http use HTTP/1.1 unless the session given
+    was created with http1=False. Requires the httpx and h2 packages.
+
+    The requests of every thread are sent by an event loop running on a thread
+    of the transport, as the connections of the synchronous httpx client may
+    not be shared by several threads over HTTP/2.
+
+    To use it, set the transport of a service client:
+    service.transport = HTTP2Transport()
+    '''
+
+    def __init__(self, protocol=None, timeout=None, session=None,
+                 max_connections=_HTTP2_MAX_CONNECTIONS):
+        '''
+        :param str protocol:
+            http or https. Defaults to the protocol of the service client.
+        :param int timeout:
+            timeout for connecting and for each read or write, in seconds.
+            Defaults to the timeout of the service client.
+        :param httpx.AsyncClient session:
+            session object created with httpx. If not specified, one is
+            created with HTTP/2 enabled on first use and closed by close.
+        :param int max_connections:
+            The number of connections the session created keeps open.
+        '''
+        # Fail on construction rather than on the first request
+        self._httpx = _import_httpx()
+
+        HTTPTransport.__init__(self, protocol, timeout, session)
+        self.max_connections = max_connections
+        self.proxy = None
+
+        self._owns_session = session is None
+        self._loop = None
+        self._thread = None
+        self._requests = 0
+        self._opens = 0
+        self._lock = threading.Lock()
+
+        if session is not None:
+            self._remove_default_headers(session)
+
+    def _remove_default_headers(self, session):
+        # As for the requests session, Accept and Accept-Encoding are only sent
+        # when a request sets them.
+        for name in ('Accept', 'Accept-Encoding'):
+            if name in session.headers:
+                del session.headers[name]
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                # asyncio is imported here as importing it takes as long as
+                # importing the rest of the library
+                import asyncio
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever)
+                self._thread.daemon = True
+                self._thread.start()
+
+            if self.session is None:
+                limits = self._httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_connections,
+                                            keepalive_expiry=CONNECTION_IDLE_TIMEOUT)
+                self.session = self._httpx.AsyncClient(http2=True, limits=limits, proxy=self.proxy)
+                self._remove_default_headers(self.session)
+            return self.session
+
+    def _run(self, coroutine):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _trace(self, event_name, info):
+        if event_name == 'connection.connect_tcp.complete':
+            with self._lock:
+                self._opens += 1
+
+    async def _atrace(self, event_name, info):
+        self._trace(event_name, info)
+
+    def set_proxy(self, host, port, user, password):
+        '''
+        Sets the proxy server host and port for the HTTP CONNECT Tunnelling.
+        This only applies to the session created by the transport, which is
+        recreated on the next request.
+
+        :param str host:
+            Address of the proxy. Ex: '192.168.0.100'
+        :param int port:
+            Port of the proxy. Ex: 6000
+        :param str user:
+            User for proxy authorization.
+        :param str password:
+            Password for proxy authorization.
+        '''
+        if user and password:
+            proxy_string = '{}:{}@{}:{}'.format(user, password, host, port)
+        else:
+            proxy_string = '{}:{}'.format(host, port)
+
+        self.proxy = 'http://{}'.format(proxy_string)
+        self.close()
+
+    def perform_request(self, request, stream=False):
+        '''
+        Sends an HTTPRequest to Azure Storage and returns an HTTPResponse.
+
+        :param HTTPRequest request:
+            The request to serialize and send.
+        :param bool stream:
+            If True, the body of a successful response is not read into memory.
+            It must be consumed with HTTPResponse.iter_content or readinto and
+            the response closed afterwards. Error responses are always read so
+            they can be parsed.
+        :return: An HTTPResponse containing the parsed HTTP response.
+        :rtype: :class:`~azure.storage._http.HTTPResponse`
+        '''
+        # Verify the body is in bytes or a buffer of bytes
+        body = request.body or None
+        if body is not None:
+            assert isinstance(body, (bytes, bytearray, memoryview))
+
+        # Construct the URI
+        uri = self.protocol.lower() + '://' + request.host + request.path
+
+        # Unlike requests, httpx does not drop parameters and headers set to None
+        params = [(name, value) for name, value in request.query.items() if value is not None]
+        headers = [(name, value) for name, value in request.headers.items() if value is not None]
+
+        session = self._start()
+        with self._lock:
+            self._requests += 1
+
+        response, body = self._run(self._send(session, request.method, uri, params, headers, body, stream))
+
+        # Parse the response
+        respheaders = {}
+        for key, name in response.headers.items():
+            respheaders[key.lower()] = name
+
+        if body is None:
+            return HTTPResponse(response.status_code, response.reason_phrase, respheaders, None,
+                                _HTTP2ResponseStream(self, response))
+        return HTTPResponse(response.status_code, response.reason_phrase, respheaders, body)
+
+    async def _send(self, session, method, uri, params, headers, body, stream):
+        if body is not None and not isinstance(body, bytes):
+            # httpx only takes bytes as is. Other buffers are sent as a single
+            # piece rather than copied, with the Content-Length already set.
+            body = _single_piece(body)
+
+        httpx_request = session.build_request(method,
+                                              uri,
+                                              params=params,
+                                              headers=headers,
+                                              content=body,
+                                              timeout=self._httpx.Timeout(self.timeout, pool=None),
+                                              extensions={'trace': self._atrace})
+        response = await session.send(httpx_request, stream=True)
+        if stream and response.status_code < 300:
+            return response, None
+
+        try:
+            return response, await response.aread()
+        finally:
+            await response.aclose()
+
+    def get_stats(self):
+        '''
+        Returns the number of requests sent and connections opened. HTTP/2
+        connections are never exhausted nor discarded, as requests are queued
+        for a stream once max_connections are open.
+        '''
+        with self._lock:
+            return ConnectionPoolStats(self._requests, self._opens)
+
+    def close(self):
+        '''
+        Closes the session and stops the event loop if the session was created
+        by the transport. New ones are created by the next request.
+        '''
+        with self._lock:
+            if not self._owns_session or self._loop is None:
+                return
+            session, self.session = self.session, None
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+
+        if session is not None:
+            import asyncio
+            asyncio.run_coroutine_threadsafe(session.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+async def _single_piece(body):
+    yield body
+
+
+class _HTTP2ResponseStream(object):
+
+    '''
+    Exposes the body of a streamed httpx response as a readable object for
+    HTTPResponse. A body sent with a Content-Encoding is decoded, as it is for
+    a response which is not streamed.
+    '''
+
+    def __init__(self, transport, response):
+        self._transport = transport
+        self._response = response
+        self._pieces = response.aiter_bytes()
+        self._pending = b''
+
+    def read(self, amt):
+        if not self._pending:
+            self._pending = self._transport._run(_next_piece(self._pieces))
+
+        data, self._pending = self._pending[:amt], self._pending[amt:]
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._transport._run(self._response.aclose())
@@ -14,6 +14,7 @@
 #--------------------------------------------------------------------------
 import base64
 import sys
+from time import time
 
 if sys.version_info < (3,):
     from httplib import (
@@ -28,9 +29,11 @@ else:
         )
     from urllib.parse import quote as url_quote
 
-from . import HTTPError, HTTPResponse
+from . import HTTPError, HTTPResponse, HTTPTransport
+from .connectionpool import _PooledSession
+from .._timing import _get_thread_timing
 
-class _HTTPClient(object):
+class _HTTPClient(HTTPTransport):
 
     '''
     Takes the request and sends it to cloud service and returns the response.
@@ -45,9 +48,7 @@ class _HTTPClient(object):
         :param int timeout:
             timeout for the http request, in seconds.
         '''
-        self.protocol = protocol
-        self.session = session
-        self.timeout = timeout
+        HTTPTransport.__init__(self, protocol, timeout, session)
 
         # By default, requests adds an Accept:*/* and Accept-Encoding to the session, 
         # which causes issues with some Azure REST APIs. Removing these here gives us 
@@ -87,23 +88,32 @@ class _HTTPClient(object):
         self.proxies['http'] = 'http://{}'.format(proxy_string)
         self.proxies['https'] = 'https://{}'.format(proxy_string)
 
-    def perform_request(self, request):
+    def perform_request(self, request, stream=False):
         '''
         Sends an HTTPRequest to Azure Storage and returns an HTTPResponse. If 
         the response code indicates an error, raise an HTTPError.    
         
         :param HTTPRequest request:
             The request to serialize and send.
+        :param bool stream:
+            If True, the body of a successful response is not read into memory. 
+            It must be consumed with HTTPResponse.iter_content or readinto and 
+            the response closed afterwards. Error responses are always read so 
+            they can be parsed.
         :return: An HTTPResponse containing the parsed HTTP response.
         :rtype: :class:`~azure.storage._http.HTTPResponse`             
         '''
-        # Verify the body is in bytes
+        # Verify the body is in bytes or a buffer of bytes
         if request.body:
-            assert isinstance(request.body, bytes)
+            assert isinstance(request.body, (bytes, bytearray, memoryview))
 
         # Construct the URI
         uri = self.protocol.lower() + '://' + request.host + request.path
 
+        thread_timing = _get_thread_timing()
+        request_timing = thread_timing.request if thread_timing is not None else None
+        started = time()
+
         # Send the request
         response = self.session.request(request.method, 
                                         uri,
@@ -111,12 +121,93 @@ class _HTTPClient(object):
                                         headers=request.headers, 
                                         data=request.body or None,
                                         timeout=self.timeout,
-                                        proxies=self.proxies)
+                                        proxies=self.proxies,
+                                        stream=stream)
 
         # Parse the response
         status = int(response.status_code)
-        respheaders = {}
-        for key, name in response.headers.items():
-            respheaders[key.lower()] = name
+        respheaders = dict(response.headers.lower_items())
+
+        if stream and status < 300:
+            if request_timing is not None:
+                _record_timing(request_timing, response, None)
+            return HTTPResponse(status, response.reason, respheaders, None, 
+                                _ResponseStream(response, thread_timing))
+
+        content = response.content
+        if request_timing is not None:
+            _record_timing(request_timing, response, time() - started)
+        return HTTPResponse(status, response.reason, respheaders, content)
+
+    def get_stats(self):
+        '''
+        Returns the statistics of the session if the service client created it.
+        '''
+        if isinstance(self.session, _PooledSession):
+            return self.session.get_stats()
+        return None
 
-        return HTTPResponse(status, response.reason, respheaders, response.content)
\ No newline at end of file
+    def close(self):
+        '''
+        Leaves the session open, as it may be shared by other service clients.
+        '''
+        pass
+
+
+def _record_timing(request_timing, response, seconds):
+    '''
+    Splits the time a requests response took into the phases of the request 
+    timing. requests measures the time until the headers were parsed, which 
+    includes opening the connection. The body phase is the rest of seconds, 
+    or is measured as the body is read if seconds is None.
+    '''
+    waited = response.elapsed.total_seconds()
+    request_timing.first_byte = waited - (request_timing.connect or 0.0) - (request_timing.tls or 0.0)
+    request_timing.body = seconds - waited if seconds is not None else 0.0
+
+
+class _ResponseStream(object):
+
+    '''
+    Exposes the body of a streamed requests response as a readable object for 
+    HTTPResponse. A body sent with a Content-Encoding is decoded, as requests 
+    does for the content of a response which is not streamed, so both give 
+    the same bytes.
+    '''
+
+    def __init__(self, response, thread_timing=None):
+        self._response = response
+        self._pending = b''
+        self._thread_timing = thread_timing
+        self._request_timing = thread_timing.request if thread_timing is not None else None
+
+    def read(self, amt):
+        if self._pending:
+            data, self._pending = self._pending[:amt], self._pending[amt:]
+            return data
+
+        if self._request_timing is None:
+            data = self._response.raw.read(amt, decode_content=True)
+        else:
+            started = time()
+            previous = self._thread_timing.start('transport')
+            try:
+                data = self._response.raw.read(amt, decode_content=True)
+            finally:
+                self._thread_timing.stop(previous)
+                self._request_timing.body += time() - started
+
+        # Decoding may produce more than was asked for
+        if len(data) > amt:
+            data, self._pending = data[:amt], data[amt:]
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        # Closing the response returns the connection to the pool if the body 
+        # was read fully and discards it otherwise.
+        self._response.close()
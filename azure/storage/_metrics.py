@@ -0,0 +1,301 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import sys
+import threading
+from bisect import bisect_left
+from time import time
+
+from azure.common import AzureHttpError
+
+from .models import (
+    MetricsSnapshot,
+    OperationMetrics,
+)
+
+# The upper bounds, in seconds, of the buckets of the latency histograms. The
+# last bucket holds the operations slower than all of them.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# The status codes the service returns when a scalability target is exceeded.
+_THROTTLING_STATUSES = (500, 503)
+
+
+def _get_operation_name():
+    '''
+    Returns the name of the service method which is sending a request, the
+    first caller of _perform_request outside of it, without a leading
+    underscore. Ranges of chunked downloads are named get_blob, blocks of
+    chunked uploads put_block, and so on.
+    '''
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_name.startswith('_perform_request'):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return frame.f_code.co_name.lstrip('_')
+
+
+class StorageMetrics(object):
+    '''
+    Aggregates metrics of the operations performed by the service clients it
+    is set on, as their metrics property. An operation is a call to a method
+    of a service client which sends a request, such as put_message, or one
+    of the ranges or blocks sent by a chunked transfer, such as get_blob or
+    put_block. It is named after that method. For each operation name the
+    metrics hold a latency histogram covering the retries, the counts of
+    errors, retries by cause and throttled responses, and the bytes sent and
+    received. The number of operations in flight is also tracked.
+
+    Updates take a lock and do a few dictionary and arithmetic operations,
+    so a single instance can be shared by every client of a process.
+    '''
+
+    def __init__(self):
+        self._operations = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _start(self, name):
+        with self._lock:
+            self._in_flight += 1
+        return _OperationRecorder(self, name, time())
+
+    def _get_operation(self, name):
+        # Called with the lock held
+        operation = self._operations.get(name)
+        if operation is None:
+            operation = _OperationCounters()
+            self._operations[name] = operation
+        return operation
+
+    def snapshot(self):
+        '''
+        Returns the metrics recorded so far. The snapshot is a copy which is
+        not updated by operations completing afterward.
+
+        :rtype: :class:`~azure.storage.models.MetricsSnapshot`
+        '''
+        with self._lock:
+            operations = {}
+            for name, counters in self._operations.items():
+                buckets = []
+                total = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), counters.buckets):
+                    total += count
+                    buckets.append((bound, total))
+
+                operations[name] = OperationMetrics(
+                    count=counters.count, errors=counters.errors, latency_sum=counters.latency_sum,
+                    latency_buckets=buckets, bytes_sent=counters.bytes_sent,
+                    bytes_received=counters.bytes_received, retries=dict(counters.retries),
+                    throttled=counters.throttled)
+            return MetricsSnapshot(operations, self._in_flight)
+
+    def to_prometheus(self, prefix='azure_storage'):
+        '''
+        Returns the metrics recorded so far in the Prometheus text exposition
+        format, with the operation name as the operation label.
+
+        :param str prefix:
+            The prefix of the metric names.
+        :rtype: str
+        '''
+        snapshot = self.snapshot()
+        lines = []
+
+        def add(metric, kind, help_text, samples):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, metric, help_text))
+            lines.append('# TYPE {0}_{1} {2}'.format(prefix, metric, kind))
+            for suffix, labels, value in samples:
+                label_text = ','.join('{0}="{1}"'.format(key, _escape_label(label))
+                                      for key, label in labels)
+                lines.append('{0}_{1}{2}{{{3}}} {4}'.format(prefix, metric, suffix, label_text,
+                                                            _format_value(value)))
+
+        names = sorted(snapshot.operations)
+        operations = [(name, snapshot.operations[name]) for name in names]
+
+        samples = []
+        for name, operation in operations:
+            for bound, count in operation.latency_buckets:
+                samples.append(('_bucket', [('operation', name), ('le', _format_value(bound))], count))
+            samples.append(('_sum', [('operation', name)], operation.latency_sum))
+            samples.append(('_count', [('operation', name)], operation.count))
+        add('operation_duration_seconds', 'histogram', 'The time operations took, including retries.',
+            samples)
+
+        add('operation_errors_total', 'counter', 'The operations which failed.',
+            [('', [('operation', name)], operation.errors) for name, operation in operations])
+        add('sent_bytes_total', 'counter', 'The bytes of the request bodies sent.',
+            [('', [('operation', name)], operation.bytes_sent) for name, operation in operations])
+        add('received_bytes_total', 'counter', 'The bytes of the response bodies received.',
+            [('', [('operation', name)], operation.bytes_received) for name, operation in operations])
+        add('retries_total', 'counter', 'The retries, by the status code or error which caused them.',
+            [('', [('operation', name), ('cause', cause)], count)
+             for name, operation in operations for cause, count in sorted(operation.retries.items())])
+        add('throttled_total', 'counter', 'The responses throttling a request.',
+            [('', [('operation', name)], operation.throttled) for name, operation in operations])
+
+        lines.append('# HELP {0}_operations_in_flight The operations in flight.'.format(prefix))
+        lines.append('# TYPE {0}_operations_in_flight gauge'.format(prefix))
+        lines.append('{0}_operations_in_flight {1}'.format(prefix, snapshot.in_flight))
+        return '\n'.join(lines) + '\n'
+
+    def to_opentelemetry(self, prefix='azure.storage'):
+        '''
+        Returns the metrics recorded so far as a list of metrics shaped as in
+        the OpenTelemetry protocol's JSON encoding, cumulative since the
+        metrics were created, with the operation name as the operation
+        attribute. The list may be passed to an OpenTelemetry exporter or
+        serialized with json.
+
+        :param str prefix:
+            The prefix of the metric names.
+        :rtype: list(dict)
+        '''
+        snapshot = self.snapshot()
+        names = sorted(snapshot.operations)
+        operations = [(name, snapshot.operations[name]) for name in names]
+
+        def attributes(**values):
+            return [{'key': key, 'value': {'stringValue': value}} for key, value in sorted(values.items())]
+
+        def counter(metric, unit, values):
+            return {
+                'name': '{0}.{1}'.format(prefix, metric),
+                'unit': unit,
+                'sum': {
+                    'aggregationTemporality': 'AGGREGATION_TEMPORALITY_CUMULATIVE',
+                    'isMonotonic': True,
+                    'dataPoints': [{'attributes': labels, 'asInt': value} for labels, value in values],
+                },
+            }
+
+        duration_points = []
+        for name, operation in operations:
+            counts = []
+            previous = 0
+            for _, count in operation.latency_buckets:
+                counts.append(count - previous)
+                previous = count
+            duration_points.append({
+                'attributes': attributes(operation=name),
+                'count': operation.count,
+                'sum': operation.latency_sum,
+                'bucketCounts': counts,
+                'explicitBounds': list(LATENCY_BUCKETS),
+            })
+
+        return [
+            {
+                'name': '{0}.operation.duration'.format(prefix),
+                'unit': 's',
+                'histogram': {
+                    'aggregationTemporality': 'AGGREGATION_TEMPORALITY_CUMULATIVE',
+                    'dataPoints': duration_points,
+                },
+            },
+            counter('operation.errors', '1',
+                    [(attributes(operation=name), o.errors) for name, o in operations]),
+            counter('sent', 'By',
+                    [(attributes(operation=name), o.bytes_sent) for name, o in operations]),
+            counter('received', 'By',
+                    [(attributes(operation=name), o.bytes_received) for name, o in operations]),
+            counter('retries', '1',
+                    [(attributes(operation=name, cause=cause), count)
+                     for name, o in operations for cause, count in sorted(o.retries.items())]),
+            counter('throttled', '1',
+                    [(attributes(operation=name), o.throttled) for name, o in operations]),
+            {
+                'name': '{0}.operations.in_flight'.format(prefix),
+                'unit': '1',
+                'gauge': {'dataPoints': [{'attributes': [], 'asInt': snapshot.in_flight}]},
+            },
+        ]
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _OperationCounters(object):
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = {}
+        self.throttled = 0
+
+
+class _OperationRecorder(object):
+    '''
+    Records the requests, retries and outcome of one operation. The counts of
+    the requests are kept here and added to the metrics when the operation
+    ends, so the lock is only taken once per request.
+    '''
+
+    def __init__(self, metrics, name, started):
+        self.metrics = metrics
+        self.name = name
+        self.started = started
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.throttled = 0
+        self.retries = []
+
+    def record_response(self, request, response):
+        if request.body:
+            self.bytes_sent += len(request.body)
+
+        if response.body is not None:
+            self.bytes_received += len(response.body)
+        else:
+            # The body of a streamed response is read by the parser
+            self.bytes_received += int(response.headers.get('content-length') or 0)
+
+        if response.status in _THROTTLING_STATUSES:
+            self.throttled += 1
+
+    def record_retry(self, error):
+        if isinstance(error, AzureHttpError):
+            self.retries.append(str(error.status_code))
+        else:
+            self.retries.append('error')
+
+    def end(self, succeeded):
+        latency = time() - self.started
+        metrics = self.metrics
+        with metrics._lock:
+            metrics._in_flight -= 1
+            operation = metrics._get_operation(self.name)
+            operation.count += 1
+            if not succeeded:
+                operation.errors += 1
+            operation.latency_sum += latency
+            operation.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            operation.bytes_sent += self.bytes_sent
+            operation.bytes_received += self.bytes_received
+            operation.throttled += self.throttled
+            for cause in self.retries:
+                operation.retries[cause] = operation.retries.get(cause, 0) + 1
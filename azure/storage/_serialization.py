@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import itertools
+import os
 import sys
 import uuid
 from datetime import date
@@ -45,6 +47,38 @@ from ._common_conversion import (
     _str,
 )
 
+# Client request ids are a prefix drawn at random once per process followed by 
+# a counter, which is cheaper than generating a new uuid for every request.
+_request_id_prefix = None
+_request_id_counter = None
+_request_id_pid = None
+
+def _get_client_request_id():
+    global _request_id_prefix, _request_id_counter, _request_id_pid
+
+    # A forked process draws its own prefix so its ids differ from the parent's
+    if _request_id_pid != os.getpid():
+        _request_id_prefix = str(uuid.uuid4())[:24]
+        _request_id_counter = itertools.count()
+        _request_id_pid = os.getpid()
+
+    return '{0}{1:012x}'.format(_request_id_prefix, next(_request_id_counter) & 0xffffffffffff)
+
+# Paths are quoted once and then looked up, as most requests of a client are 
+# made to the same few containers, queues and tables. The cache is emptied 
+# when it grows too large to keep memory bounded.
+_QUOTED_PATHS_MAX = 1024
+_quoted_paths = {}
+
+def _quote_path(path):
+    quoted = _quoted_paths.get(path)
+    if quoted is None:
+        quoted = url_quote(path, '/()$=\',~')
+        if len(_quoted_paths) >= _QUOTED_PATHS_MAX:
+            _quoted_paths.clear()
+        _quoted_paths[path] = quoted
+    return quoted
+
 def _to_utc_datetime(value):
     # Azure expects the date value passed in to be UTC.
     # Azure will always return values as UTC.
@@ -56,16 +90,16 @@ def _to_utc_datetime(value):
 def _update_request(request):
     # Verify body
     if request.body:
-        assert isinstance(request.body, bytes)
+        assert isinstance(request.body, (bytes, bytearray, memoryview))
 
     # if it is PUT, POST, MERGE, DELETE, need to add content-length to header.
-    if request.method in ['PUT', 'POST', 'MERGE', 'DELETE']:
+    if request.method in ('PUT', 'POST', 'MERGE', 'DELETE'):
         request.headers['Content-Length'] = str(len(request.body))
 
     # append addtional headers based on the service
     request.headers['x-ms-version'] = X_MS_VERSION
     request.headers['User-Agent'] = USER_AGENT_STRING
-    request.headers['x-ms-client-request-id'] = str(uuid.uuid1())
+    request.headers['x-ms-client-request-id'] = _get_client_request_id()
 
     # If the host has a path component (ex local storage), move it
     path = request.host.split('/', 1)
@@ -74,7 +108,7 @@ def _update_request(request):
         request.path = '/{}{}'.format(path[1], request.path)
 
     # Encode and optionally add local storage prefix to path
-    request.path = url_quote(request.path, '/()$=\',~')
+    request.path = _quote_path(request.path)
 
 def _add_metadata_headers(metadata, request):
     if metadata:
@@ -89,11 +123,12 @@ def _add_date_header(request):
 
 def _get_data_bytes_only(param_name, param_value):
     '''Validates the request body passed in and converts it to bytes
-    if our policy allows it.'''
+    if our policy allows it. Buffers are returned as is so they can be sent
+    without a copy.'''
     if param_value is None:
         return b''
 
-    if isinstance(param_value, bytes):
+    if isinstance(param_value, (bytes, bytearray, memoryview)):
         return param_value
 
     raise TypeError(_ERROR_VALUE_SHOULD_BE_BYTES.format(param_name))
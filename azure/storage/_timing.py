@@ -0,0 +1,250 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import sys
+import threading
+import time as _time
+from functools import wraps
+from time import time
+
+# The kinds of client work the CPU time of a call is split into. Time spent in
+# the http stack sending requests and reading responses, including TLS, is
+# counted as transport.
+CPU_CATEGORIES = ('sign', 'serialize', 'transport', 'parse', 'hash', 'encrypt', 'decrypt', 'write')
+
+# The CPU time of the calling thread alone, so the threads of a transfer are
+# not charged for each other's work.
+if hasattr(_time, 'thread_time'):
+    _cpu_time = _time.thread_time
+elif sys.version_info >= (3, 3):
+    _cpu_time = _time.process_time
+else:
+    _cpu_time = _time.clock
+
+_local = threading.local()
+
+
+def _get_thread_timing():
+    '''
+    Returns the _ThreadTiming of the call the current thread works on, or None
+    if the call is not being timed.
+    '''
+    return getattr(_local, 'timing', None)
+
+
+def _get_request_timing():
+    '''
+    Returns the RequestTiming of the request the current thread is sending, or
+    None if it is not being timed.
+    '''
+    timing = getattr(_local, 'timing', None)
+    return timing.request if timing is not None else None
+
+
+class _TimingRecorder(object):
+    '''
+    Collects the timings of the requests of a call and the CPU time its threads
+    spent on the client side, for the TimingReport given to the callback.
+    '''
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.started = time()
+        self.requests = []
+        self.cpu = dict.fromkeys(CPU_CATEGORIES, 0.0)
+        self.lock = threading.Lock()
+
+    def add_cpu(self, category, seconds):
+        with self.lock:
+            self.cpu[category] += seconds
+
+    def add_request(self, request_timing):
+        with self.lock:
+            self.requests.append(request_timing)
+
+    def get_report(self):
+        # Imported here as models depends on modules which time their work
+        from .models import TimingReport
+        with self.lock:
+            return TimingReport(self.operation, time() - self.started, list(self.requests), dict(self.cpu))
+
+
+class _ThreadTiming(object):
+    '''
+    The timing state of a thread working on a timed call. CPU time is charged
+    to one category at a time: starting a category pauses the one it interrupts,
+    so the stream writes made while a response is parsed count as write rather
+    than parse, and are not counted twice.
+    '''
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.operation = recorder.operation
+        self.request = None
+        self.category = None
+        self.cpu_started = None
+
+    def start(self, category):
+        now = _cpu_time()
+        previous = self.category
+        if previous is not None:
+            self._charge(previous, now - self.cpu_started)
+        self.category = category
+        self.cpu_started = now
+        return previous
+
+    def stop(self, previous):
+        now = _cpu_time()
+        self._charge(self.category, now - self.cpu_started)
+        self.category = previous
+        self.cpu_started = now
+
+    def _charge(self, category, seconds):
+        self.recorder.add_cpu(category, seconds)
+        if self.request is not None:
+            self.request.cpu[category] += seconds
+
+    def start_request(self):
+        from .models import RequestTiming
+        self.request = RequestTiming(self.operation, cpu=dict.fromkeys(CPU_CATEGORIES, 0.0))
+        return time()
+
+    def end_request(self, started, status):
+        request = self.request
+        request.status = status
+        request.elapsed = time() - started
+        self.request = None
+        self.recorder.add_request(request)
+
+
+class _CpuTimer(object):
+    def __init__(self, thread_timing, category):
+        self.thread_timing = thread_timing
+        self.category = category
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = self.thread_timing.start(self.category)
+
+    def __exit__(self, *args):
+        self.thread_timing.stop(self.previous)
+
+
+class _NullTimer(object):
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+
+def _cpu_timer(thread_timing, category):
+    '''
+    Returns a context manager charging the CPU time of its block to category,
+    which does nothing if thread_timing is None.
+    '''
+    if thread_timing is None:
+        return _NULL_TIMER
+    return _CpuTimer(thread_timing, category)
+
+
+def _timed_cpu(category):
+    '''
+    Decorates a function so its CPU time is charged to category when it runs
+    for a timed call.
+    '''
+    def decorator(function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            thread_timing = getattr(_local, 'timing', None)
+            if thread_timing is None:
+                return function(*args, **kwargs)
+
+            previous = thread_timing.start(category)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                thread_timing.stop(previous)
+        return timed
+    return decorator
+
+
+def _bind_timing(function):
+    '''
+    Returns function wrapped to run for the call the current thread is timing,
+    if any, so the work done on behalf of the call by other threads, such as
+    the chunks of a transfer, is part of its report.
+    '''
+    thread_timing = getattr(_local, 'timing', None)
+    if thread_timing is None:
+        return function
+
+    recorder = thread_timing.recorder
+
+    def bound(*args, **kwargs):
+        previous = getattr(_local, 'timing', None)
+        _local.timing = _ThreadTiming(recorder)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _local.timing = previous
+    return bound
+
+
+class _OperationTiming(object):
+    '''
+    Times a call to a method of a service client. The first timed call on a
+    thread creates the report, which is given to callback when it ends; calls
+    it makes, and the requests they send, are added to that report.
+    '''
+
+    def __init__(self, operation, callback):
+        self.callback = callback
+        self.thread_timing = getattr(_local, 'timing', None)
+        if self.thread_timing is None:
+            self.thread_timing = _ThreadTiming(_TimingRecorder(operation))
+            _local.timing = self.thread_timing
+            self.owner = True
+        else:
+            self.owner = False
+
+        self.previous_operation = self.thread_timing.operation
+        self.thread_timing.operation = operation
+
+    def end(self):
+        self.thread_timing.operation = self.previous_operation
+        if self.owner:
+            _local.timing = None
+            self.callback(self.thread_timing.recorder.get_report())
+
+
+def _timed_transfer(method):
+    '''
+    Decorates a method of a service client which may run a chunked transfer,
+    so the requests and CPU time of the whole transfer are reported together
+    to the client's timing_callback.
+    '''
+    @wraps(method)
+    def timed(self, *args, **kwargs):
+        if self.timing_callback is None:
+            return method(self, *args, **kwargs)
+
+        timing = _OperationTiming(method.__name__, self.timing_callback)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            timing.end()
+    return timed
@@ -0,0 +1,424 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import math
+import sys
+import threading
+from collections import deque
+from time import time
+
+if sys.version_info >= (3,):
+    from queue import Queue, Empty
+else:
+    from Queue import Queue, Empty
+
+from ._timing import _bind_timing
+
+# Adaptive chunks taking less than half this many seconds grow, chunks taking
+# more than twice as long shrink.
+_CHUNK_TARGET_SECONDS = 2
+
+# Adaptive chunks stay within this factor of the configured chunk size.
+_CHUNK_SIZE_FACTOR = 8
+
+# The service only returns a transactional MD5 for ranges up to this size.
+_MAX_VALIDATED_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Hedge delays are computed from this many of the latest ranges to complete.
+_HEDGE_SAMPLES = 100
+
+
+class _TransferExecutor(object):
+    '''
+    A thread pool shared by all the chunked uploads and downloads of a service
+    client. The pool is created on first use and lives until shutdown is called,
+    so threads are not created and torn down for every transfer. As every
+    transfer runs on the same pool, its size caps the number of ranges in
+    flight across all concurrent calls.
+    '''
+
+    def __init__(self, max_workers):
+        '''
+        :param int max_workers:
+            The number of threads in the pool.
+        '''
+        self.max_workers = max_workers
+        self._executor = None
+        self._active = 0
+        self._shutdown_pending = False
+        self._lock = threading.Lock()
+
+    def _start_transfer(self):
+        with self._lock:
+            if self._executor is None:
+                import concurrent.futures
+                self._executor = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+            self._active += 1
+            return self._executor
+
+    def _end_transfer(self):
+        executor = None
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._shutdown_pending:
+                executor, self._executor = self._executor, None
+                self._shutdown_pending = False
+
+        if executor is not None:
+            executor.shutdown(False)
+
+    def map(self, fn, iterable, max_connections):
+        '''
+        Calls fn for each item of iterable on the pool and returns the results
+        in order. At most max_connections calls for this transfer are queued or
+        running at a time and the iterable is only advanced as calls complete.
+        If a call fails no further items are submitted and the error is raised
+        once the calls already in flight have finished.
+
+        :param function fn:
+            The function to call for each item.
+        :param iterable:
+            The items to process, typically chunk offsets or chunk streams.
+        :param int max_connections:
+            The maximum number of calls of this transfer in flight at once.
+        :return: The results of fn for each item, in the order of iterable.
+        :rtype: list
+        '''
+        from concurrent.futures import wait, FIRST_COMPLETED
+
+        # Chunks are part of the timing report of the transfer, if it is timed
+        fn = _bind_timing(fn)
+        executor = self._start_transfer()
+        futures = []
+        running = set()
+        try:
+            for item in iterable:
+                if len(running) >= max_connections:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # Raise the first failure rather than keep submitting
+                        future.result()
+
+                future = executor.submit(fn, item)
+                futures.append(future)
+                running.add(future)
+        finally:
+            # Never return, even on error, while calls still use the caller's
+            # stream.
+            wait(running)
+            self._end_transfer()
+
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        '''
+        Shuts down the pool. If transfers are running in other threads, the
+        pool is kept for them and shut down when the last one completes; this
+        call does not wait for them. A new pool is created if the executor is
+        used again.
+
+        :param bool wait:
+            Whether to wait for running calls to complete when the pool is
+            shut down right away.
+        '''
+        with self._lock:
+            if self._active:
+                self._shutdown_pending = True
+                return
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait)
+
+
+class _BufferPool(object):
+    '''
+    A set of chunk sized buffers recycled across the chunks of a transfer.
+    Buffers are allocated on demand up to max_buffers, after which acquire
+    blocks until a buffer is released, so a transfer holds at most that many
+    chunks in memory however large the blob.
+    '''
+
+    def __init__(self, buffer_size, max_buffers):
+        '''
+        :param int buffer_size:
+            The size of each buffer, in bytes.
+        :param int max_buffers:
+            The maximum number of buffers allocated.
+        '''
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self._allocated = 0
+        self._free = []
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        '''
+        Returns a free buffer, waiting for one to be released if all are in use.
+
+        :rtype: bytearray
+        '''
+        with self._condition:
+            while not self._free:
+                if self._allocated < self.max_buffers:
+                    self._allocated += 1
+                    return bytearray(self.buffer_size)
+                self._condition.wait()
+            return self._free.pop()
+
+    def release(self, buffer):
+        '''
+        Returns a buffer obtained from acquire to the pool.
+
+        :param bytearray buffer:
+            The buffer, which must no longer be used by the caller.
+        '''
+        with self._condition:
+            self._free.append(buffer)
+            self._condition.notify()
+
+
+class _ReadAhead(object):
+    '''
+    Iterates over an iterable on a separate thread, keeping at most depth items
+    ready ahead of the consumer. This lets a chunked upload read the next
+    chunks of a stream while the previous ones are being sent, with the reader
+    blocking once depth chunks are waiting so memory use does not grow with
+    the size of the stream. close must be called once iteration stops.
+    '''
+
+    def __init__(self, iterable, depth, discard=None):
+        '''
+        :param iterable:
+            The items to read ahead, typically chunks of a stream.
+        :param int depth:
+            The maximum number of items read but not yet consumed.
+        :param function discard:
+            Called with each item read but not consumed when close is called
+            before the iterable is exhausted.
+        '''
+        self._iterable = iterable
+        self._items = Queue(depth)
+        self._discard = discard
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=_bind_timing(self._read))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _read(self):
+        try:
+            for item in self._iterable:
+                self._items.put((True, item))
+                if self._stopped.is_set():
+                    return
+        except Exception as ex:
+            self._items.put((False, ex))
+            return
+
+        self._items.put((False, None))
+
+    def __iter__(self):
+        while True:
+            succeeded, item = self._items.get()
+            if not succeeded:
+                if item is not None:
+                    raise item
+                return
+            yield item
+
+    def close(self):
+        '''
+        Stops reading and waits for the reader to finish with the iterable, so
+        the stream is no longer used once this returns. Items read but not
+        consumed are passed to discard.
+        '''
+        self._stopped.set()
+
+        # Keep emptying the queue so a reader blocked on a full queue, or
+        # waiting for resources held by unconsumed items, reaches the stop check
+        while self._thread.is_alive():
+            self._drain()
+            self._thread.join(0.01)
+
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                succeeded, item = self._items.get_nowait()
+            except Empty:
+                return
+
+            if succeeded and self._discard is not None:
+                self._discard(item)
+
+
+class _ChunkSizer(object):
+    '''
+    Picks the size of the chunks of a transfer from the time the chunks before
+    them took. A chunk finishing well under _CHUNK_TARGET_SECONDS is mostly
+    spent on the round trip, so the size doubles to make fewer requests. A
+    chunk taking well over it, typically on a slow or lossy link where retries
+    add up, halves the size so less is repeated when a request fails. The size
+    stays between the configured size divided by _CHUNK_SIZE_FACTOR and
+    max_size.
+    '''
+
+    def __init__(self, chunk_size, max_size):
+        '''
+        :param int chunk_size:
+            The configured chunk size, used for the first chunks.
+        :param int max_size:
+            The largest chunk size allowed.
+        '''
+        self.size = chunk_size
+        self.min_size = max(1, chunk_size // _CHUNK_SIZE_FACTOR)
+        self.max_size = max(chunk_size, max_size)
+        self._lock = threading.Lock()
+
+    def record(self, size, seconds):
+        '''
+        Adjusts the chunk size given the time a chunk took.
+
+        :param int size:
+            The size of the chunk, in bytes.
+        :param float seconds:
+            The time the chunk took to transfer, including retries.
+        '''
+        with self._lock:
+            # Chunks of another size were started before the last change, and 
+            # the last chunk of a transfer is usually smaller
+            if size != self.size:
+                return
+
+            if seconds < _CHUNK_TARGET_SECONDS / 2.0:
+                self.size = min(self.size * 2, self.max_size)
+            elif seconds > _CHUNK_TARGET_SECONDS * 2:
+                self.size = max(self.size // 2, self.min_size)
+
+
+def _get_chunk_sizer(chunk_size, validate_content):
+    '''
+    Returns a _ChunkSizer for ranged gets of chunk_size, which may grow up to
+    _CHUNK_SIZE_FACTOR times larger, or no larger than the service returns an
+    MD5 for if validate_content is set.
+    '''
+    max_size = chunk_size * _CHUNK_SIZE_FACTOR
+    if validate_content:
+        max_size = min(max_size, _MAX_VALIDATED_CHUNK_SIZE)
+    return _ChunkSizer(chunk_size, max_size)
+
+
+class _RangeHedger(object):
+    '''
+    Runs the range gets of a transfer under a HedgePolicy. Until min_samples 
+    ranges have completed each range is requested once. After that a range is 
+    requested on a separate thread and, if it has not completed within the 
+    policy's percentile of the time per byte of the ranges before it, 
+    requested again. The result of whichever request completes first is used, 
+    or the result of the other if the first failed.
+    '''
+
+    def __init__(self, policy, stats):
+        '''
+        :param HedgePolicy policy:
+            The percentile, minimum samples and minimum delay to hedge with.
+        :param HedgeStats stats:
+            Updated with the ranges requested and hedged.
+        '''
+        self.policy = policy
+        self.stats = stats
+        self._samples = deque(maxlen=_HEDGE_SAMPLES)
+        self._lock = threading.Lock()
+
+    def get_delay(self, size):
+        '''
+        Returns the time after which a range of size bytes is requested again, 
+        or None if too few ranges have completed to tell.
+
+        :param int size:
+            The size of the range, in bytes.
+        '''
+        with self._lock:
+            if len(self._samples) < max(1, self.policy.min_samples):
+                return None
+            samples = sorted(self._samples)
+
+        index = int(math.ceil(len(samples) * self.policy.percentile / 100.0)) - 1
+        seconds_per_byte = samples[min(max(index, 0), len(samples) - 1)]
+        return max(seconds_per_byte * size, self.policy.min_delay)
+
+    def call(self, fn, size):
+        '''
+        Gets a range, hedging it once enough ranges have completed.
+
+        :param function fn:
+            Called with False to request the range and True to request it again.
+        :param int size:
+            The size of the range, in bytes.
+        :return: The result of fn for the first request to succeed.
+        '''
+        with self._lock:
+            self.stats.ranges += 1
+
+        started = time()
+        delay = self.get_delay(size)
+        if delay is None:
+            result = fn(False)
+            self._record(size, time() - started)
+            return result
+
+        results = Queue()
+        self._start(fn, False, results)
+        try:
+            succeeded, hedge, result = results.get(timeout=delay)
+            pending = 0
+        except Empty:
+            with self._lock:
+                self.stats.hedged += 1
+            self._start(fn, True, results)
+            succeeded, hedge, result = results.get()
+            pending = 1
+
+        if not succeeded and pending:
+            # The other request may still succeed
+            error = result
+            succeeded, hedge, result = results.get()
+            if not succeeded:
+                raise error
+
+        if not succeeded:
+            raise result
+
+        with self._lock:
+            if hedge:
+                self.stats.hedges_won += 1
+        self._record(size, time() - started)
+        return result
+
+    def _start(self, fn, hedge, results):
+        def run():
+            try:
+                results.put((True, hedge, fn(hedge)))
+            except Exception as ex:
+                results.put((False, hedge, ex))
+
+        thread = threading.Thread(target=_bind_timing(run))
+        thread.daemon = True
+        thread.start()
+
+    def _record(self, size, seconds):
+        if size > 0:
+            with self._lock:
+                self._samples.append(seconds / size)
@@ -0,0 +1,290 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import asyncio
+from time import time
+
+from azure.common import (
+    AzureException,
+)
+from .models import (
+    RetryContext,
+    _OperationContext,
+)
+from ._constants import SOCKET_TIMEOUT
+from ._http import HTTPError
+from ._http.aiohttpclient import _AsyncHTTPClient
+from ._metrics import _get_operation_name
+from ._serialization import (
+    _update_request,
+    _add_date_header,
+)
+from ._error import (
+    _ERROR_DECRYPTION_FAILURE,
+    _http_error_handler,
+)
+
+
+class AsyncStorageClient(object):
+
+    '''
+    The base class for the asyncio service objects. It is combined with a
+    synchronous service class, from which it takes every request builder and
+    response parser, and replaces the transport and the retry loop with
+    coroutines. Methods of the synchronous class which only build a request and
+    return the parsed response become coroutines as is; the others are
+    overridden by the async service classes.
+
+    Retries wait with asyncio.sleep and chunked transfers run their ranges as
+    concurrent tasks on the event loop rather than on a thread pool. The
+    retry, location_mode, metrics and callback attributes behave as for the
+    synchronous clients. Requires the aiohttp package.
+    '''
+
+    def _use_async_transport(self, session=None):
+        '''
+        Replaces the requests based transport set up by StorageClient.
+
+        :param aiohttp.ClientSession session:
+            The session object to use for http requests. If not specified, one
+            is created on first use and closed by close.
+        '''
+        self._httpclient = _AsyncHTTPClient(
+            protocol=self._httpclient.protocol,
+            session=session,
+            timeout=SOCKET_TIMEOUT,
+        )
+
+    async def close(self):
+        '''
+        Closes the http session if it was created by this client.
+        '''
+        await self._httpclient.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _run_chunks(self, fn, iterable, max_connections):
+        '''
+        Awaits fn for each item of iterable and returns the results in order.
+        At most max_connections calls are running at a time and the iterable is
+        only advanced as calls complete, so no more than that many chunks are
+        held in memory. If a call fails no further items are started and the
+        error is raised once the calls already running have finished.
+        '''
+        tasks = []
+        running = set()
+        try:
+            for item in iterable:
+                if len(running) >= max_connections:
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        # Raise the first failure rather than keep starting calls
+                        task.result()
+
+                task = asyncio.ensure_future(fn(item))
+                tasks.append(task)
+                running.add(task)
+        finally:
+            if running:
+                await asyncio.wait(running)
+
+            # Mark every failure as retrieved, only the first one is raised
+            for task in tasks:
+                if not task.cancelled():
+                    task.exception()
+
+        return await asyncio.gather(*tasks)
+
+    async def _perform_request(self, request, parser=None, parser_args=None, operation_context=None,
+                               stream=False):
+        '''
+        Sends the request and return response. Catches HTTPError and hands it
+        to error handler. The response body is always read into memory; stream
+        is accepted for compatibility with the synchronous client.
+        '''
+        metrics = self.metrics
+        if metrics is None:
+            return await self._perform_request_with_retries(request, parser, parser_args, operation_context)
+
+        # The operation is named after the service method sending the request
+        recorder = metrics._start(_get_operation_name())
+        succeeded = False
+        try:
+            result = await self._perform_request_with_retries(request, parser, parser_args, operation_context,
+                                                              recorder)
+            succeeded = True
+            return result
+        finally:
+            recorder.end(succeeded)
+
+    async def _perform_request_with_retries(self, request, parser, parser_args, operation_context,
+                                            metrics_recorder=None):
+        operation_context = operation_context or _OperationContext()
+        retry_context = RetryContext()
+
+        # Apply the appropriate host based on the location mode
+        self._apply_host(request, operation_context, retry_context)
+
+        # Apply common settings to the request
+        _update_request(request)
+
+        while(True):
+            try:
+                try:
+                    # Execute the request callback
+                    if self.request_callback:
+                        self.request_callback(request)
+
+                    # Add date and auth after the callback so date doesn't get too old and
+                    # authentication is still correct if signed headers are added in the request
+                    # callback. This also ensures retry policies with long back offs
+                    # will work as it resets the time sensitive headers.
+                    _add_date_header(request)
+                    self.authentication.sign_request(request)
+
+                    # Set the request context
+                    retry_context.request = request
+
+                    # Perform the request
+                    started = time()
+                    try:
+                        response = await self._httpclient.perform_request(request)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        self._record_health(retry_context.location_mode, None, started)
+                        raise
+                    self._record_health(retry_context.location_mode, response.status, started)
+                    if metrics_recorder is not None:
+                        metrics_recorder.record_response(request, response)
+
+                    # Execute the response callback
+                    if self.response_callback:
+                        self.response_callback(response)
+
+                    # Set the response context
+                    retry_context.response = response
+
+                    # Parse and wrap HTTP errors in AzureHttpError which inherits from AzureException
+                    if response.status >= 300:
+                        # This exception will be caught by the general error handler
+                        # and raised as an azure http exception
+                        _http_error_handler(HTTPError(response.status, response.message, response.headers, response.body))
+
+                    # Parse the response
+                    if parser:
+                        if parser_args:
+                            args = [response]
+                            args.extend(parser_args)
+                            return parser(*args)
+                        else:
+                            return parser(response)
+                    else:
+                        return
+                except AzureException as ex:
+                    raise ex
+                except asyncio.CancelledError:
+                    raise
+                except Exception as ex:
+                    raise AzureException(ex.args[0] if ex.args else str(ex))
+
+            except AzureException as ex:
+                # Decryption failures (invalid objects, invalid algorithms, data unencrypted in strict mode, etc)
+                # will not be resolved with retries.
+                if str(ex) == _ERROR_DECRYPTION_FAILURE:
+                    raise ex
+                # Determine whether a retry should be performed and if so, how
+                # long to wait before performing retry.
+                retry_interval = self.retry(retry_context)
+                if retry_interval is not None:
+                    if metrics_recorder is not None:
+                        metrics_recorder.record_retry(ex)
+
+                    # Execute the callback
+                    if self.retry_callback:
+                        self.retry_callback(retry_context)
+
+                    # Wait for the desired retry interval without blocking the loop
+                    await asyncio.sleep(retry_interval)
+                else:
+                    raise ex
+            finally:
+                # If this is a location locked operation and the location is not set,
+                # this is the first request of that operation. Set the location to
+                # be used for subsequent requests in the operation.
+                if operation_context.location_lock and not operation_context.host_location:
+                    # The request host no longer has the path of a path style
+                    # endpoint, such as the emulator's, so take the unmodified one
+                    location = retry_context.location_mode
+                    operation_context.host_location = {location: request.host_locations[location]}
+
+
+class AsyncListGenerator(object):
+    '''
+    An asynchronous iterator used to list storage resources with async for.
+    The iterator will lazily follow the continuation tokens returned by the
+    service and stop when all resources have been returned or max_results is
+    reached.
+
+    If max_results is specified and the account has more than that number of
+    resources, the iterator will have a populated next_marker field once it
+    finishes. This marker can be used to create a new iterator if more
+    results are desired.
+    '''
+    def __init__(self, resources, list_method, list_args, list_kwargs):
+        self.items = resources
+        self.next_marker = resources.next_marker
+
+        self._list_method = list_method
+        self._list_args = list_args
+        self._list_kwargs = list_kwargs
+        self._index = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while self._index >= len(self.items):
+            # if no more results on the service, stop
+            if not self.next_marker:
+                raise StopAsyncIteration
+
+            # update the marker args
+            self._list_kwargs['marker'] = self.next_marker
+
+            # handle max results, if present
+            max_results = self._list_kwargs.get('max_results')
+            if max_results is not None:
+                max_results = max_results - len(self.items)
+
+                # if we've reached max_results, stop
+                # else, update the max_results arg
+                if max_results <= 0:
+                    raise StopAsyncIteration
+                else:
+                    self._list_kwargs['max_results'] = max_results
+
+            # get the next segment
+            resources = await self._list_method(*self._list_args, **self._list_kwargs)
+            self.items = resources
+            self.next_marker = resources.next_marker
+            self._index = 0
+
+        item = self.items[self._index]
+        self._index += 1
+        return item
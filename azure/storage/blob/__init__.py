@@ -34,8 +34,21 @@ from .models import (
     PublicAccess,
     BlobPrefix,
     DeleteSnapshot,
+    HedgePolicy,
+    HedgeStats,
 )
 
 from .blockblobservice import BlockBlobService
 from .pageblobservice import PageBlobService
 from .appendblobservice import AppendBlobService
+
+import sys
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # The async service is imported on first use, as it imports asyncio
+        if name == 'AsyncBlockBlobService':
+            from .asyncblockblobservice import AsyncBlockBlobService
+            return AsyncBlockBlobService
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+elif sys.version_info >= (3, 5):
+    from .asyncblockblobservice import AsyncBlockBlobService
@@ -0,0 +1,109 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import json
+import os
+import threading
+
+
+class _TransferCheckpoint(object):
+    '''
+    A journal of the chunks of a transfer which have completed, kept in a file
+    so that a transfer which failed may be resumed by a later call. The first
+    line of the file describes the transfer and each following line holds the
+    offset of a completed chunk. Chunks recorded for a transfer described
+    differently, for example against another ETag, are discarded.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.description = None
+        self.done = set()
+        self._journal = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as journal:
+                lines = journal.read().split('\n')
+
+            # The last line is either empty or was cut short by a failure
+            description = json.loads(lines[0])
+            done = set(int(line) for line in lines[1:-1])
+        except (IOError, OSError, ValueError):
+            return
+
+        self.description = description
+        self.done = done
+
+    def begin(self, description):
+        '''
+        Starts recording the transfer described, keeping the chunks recorded
+        by an earlier attempt if it was described the same way.
+
+        :param dict description:
+            Values identifying the transfer, serializable to JSON.
+        :return: Whether chunks from an earlier attempt were kept.
+        :rtype: bool
+        '''
+        with self._lock:
+            if description != self.description:
+                self.description = description
+                self.done = set()
+            self._rewrite()
+            return bool(self.done)
+
+    def retain(self, offsets):
+        '''
+        Forgets the recorded chunks whose offsets are not given.
+        '''
+        with self._lock:
+            self.done &= set(offsets)
+            self._rewrite()
+
+    def is_done(self, offset):
+        return offset in self.done
+
+    def record(self, offset):
+        with self._lock:
+            self.done.add(offset)
+            self._journal.write('{0}\n'.format(offset))
+            self._journal.flush()
+
+    def close(self):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def remove(self):
+        '''
+        Deletes the journal once the transfer has completed.
+        '''
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _rewrite(self):
+        if self._journal is not None:
+            self._journal.close()
+
+        self._journal = open(self.path, 'w')
+        self._journal.write(json.dumps(self.description, sort_keys=True) + '\n')
+        for offset in sorted(self.done):
+            self._journal.write('{0}\n'.format(offset))
+        self._journal.flush()
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from dateutil import parser
 from azure.storage._error import AzureException
 try:
     from xml.etree import cElementTree as ETree
@@ -20,6 +19,7 @@ except ImportError:
     from xml.etree import ElementTree as ETree
 from .._common_conversion import (
     _decode_base64_to_text,
+    _parse_date,
     _to_str,
 )
 from .._deserialization import (
@@ -27,6 +27,7 @@ from .._deserialization import (
     _int_to_str,
     _parse_metadata,
     _convert_xml_to_signed_identifiers,
+    _write_response_body,
 )
 from .models import (
     Container,
@@ -55,7 +56,7 @@ def _parse_base_properties(response):
     Extracts basic response headers.
     '''   
     resource_properties = ResourceProperties()
-    resource_properties.last_modified = parser.parse(response.headers.get('last-modified'))
+    resource_properties.last_modified = _parse_date(response.headers.get('last-modified'))
     resource_properties.etag = response.headers.get('etag')
 
     return resource_properties
@@ -65,7 +66,7 @@ def _parse_page_properties(response):
     Extracts page response headers.
     '''   
     put_page = PageBlobProperties()
-    put_page.last_modified = parser.parse(response.headers.get('last-modified'))
+    put_page.last_modified = _parse_date(response.headers.get('last-modified'))
     put_page.etag = response.headers.get('etag')
     put_page.sequence_number = _int_to_str(response.headers.get('x-ms-blob-sequence-number'))
 
@@ -76,7 +77,7 @@ def _parse_append_block(response):
     Extracts append block response headers.
     '''   
     append_block = AppendBlockProperties()
-    append_block.last_modified = parser.parse(response.headers.get('last-modified'))
+    append_block.last_modified = _parse_date(response.headers.get('last-modified'))
     append_block.etag = response.headers.get('etag')
     append_block.append_offset = _int_to_str(response.headers.get('x-ms-blob-append-offset'))
     append_block.committed_block_count = _int_to_str(response.headers.get('x-ms-blob-committed-block-count'))
@@ -91,6 +92,12 @@ def _parse_snapshot_blob(response, name):
 
     return _parse_blob(response, name, snapshot)
 
+def _parse_copy_properties(response):
+    '''
+    Extracts the copy properties of a copy blob response.
+    '''
+    return _parse_properties(response, BlobProperties).copy
+
 def _parse_lease(response):
     '''
     Extracts lease time and ID return headers.
@@ -105,13 +112,22 @@ def _parse_lease(response):
     return lease
 
 def _parse_blob(response, name, snapshot, validate_content=False, require_encryption=False,
-                key_encryption_key=None, key_resolver_function=None, start_offset=None, end_offset=None):
+                key_encryption_key=None, key_resolver_function=None, start_offset=None, end_offset=None,
+                stream_writer=None):
     if response is None:
         return None
 
     metadata = _parse_metadata(response)
     props = _parse_properties(response, BlobProperties)
 
+    if stream_writer is not None:
+        # The body is streamed straight into the user stream so the blob is 
+        # returned without content.
+        computed_md5 = _write_response_body(response, stream_writer, validate_content)
+        if validate_content:
+            _validate_content_match(props.content_settings.content_md5, computed_md5)
+        return Blob(name, snapshot, None, props, metadata)
+
     if validate_content:
         computed_md5 = _get_content_md5(response.body)
         _validate_content_match(props.content_settings.content_md5, computed_md5)
@@ -190,7 +206,7 @@ def _convert_xml_to_containers(response):
         # Properties
         properties_element = container_element.find('Properties')
         container.properties.etag = properties_element.findtext('Etag')
-        container.properties.last_modified = parser.parse(properties_element.findtext('Last-Modified'))
+        container.properties.last_modified = _parse_date(properties_element.findtext('Last-Modified'))
         container.properties.lease_status = properties_element.findtext('LeaseStatus')
         container.properties.lease_state = properties_element.findtext('LeaseState')
         container.properties.lease_duration = properties_element.findtext('LeaseDuration')
@@ -201,7 +217,7 @@ def _convert_xml_to_containers(response):
     return containers
 
 LIST_BLOBS_ATTRIBUTE_MAP = {
-    'Last-Modified': (None, 'last_modified', parser.parse),
+    'Last-Modified': (None, 'last_modified', _parse_date),
     'Etag': (None, 'etag', _to_str),
     'x-ms-blob-sequence-number': (None, 'sequence_number', _int_to_str),
     'BlobType': (None, 'blob_type', _to_str),
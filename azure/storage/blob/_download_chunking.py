@@ -12,19 +12,88 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import os
 import threading
 
-from time import sleep
+from time import (
+    sleep,
+    time,
+)
 from azure.common import (
     AzureHttpError,
 )
 from .._error import _ERROR_NO_SINGLE_THREAD_CHUNKING
+from .._deserialization import (
+    _RangeStreamWriter,
+    _can_overwrite,
+)
+from ..models import _OperationContext
+from .._timing import _timed_cpu
+from .._transfer import (
+    _RangeHedger,
+    _get_chunk_sizer,
+)
+from .models import HedgeStats
+
+def _get_first_range(start_range, end_range, first_get_size):
+    '''
+    Returns the start and end offsets of the first get of a chunked download.
+    '''
+    initial_request_start = start_range if start_range else 0
+
+    if end_range and end_range - initial_request_start < first_get_size:
+        initial_request_end = end_range
+    else:
+        initial_request_end = initial_request_start + first_get_size - 1
+
+    return initial_request_start, initial_request_end
+
+def _get_download_size(blob_size, start_range, end_range):
+    '''
+    Returns the number of bytes to download given the size of the blob and the
+    range requested by the user.
+    '''
+    if end_range:
+        # Use the end_range unless it is over the end of the blob
+        return min(blob_size, end_range - (start_range or 0) + 1)
+    elif start_range:
+        return blob_size - start_range
+    else:
+        return blob_size
+
+def _get_download_end(blob_size, end_range):
+    '''
+    Returns the offset after the last byte to download.
+    '''
+    if end_range:
+        # Use the end_range unless it is over the end of the blob
+        return min(blob_size, end_range + 1)
+    return blob_size
+
+def _set_download_properties(blob, blob_size, start_range, download_size):
+    '''
+    Sets the properties returned by a chunked download, which would otherwise
+    describe the last range downloaded.
+    '''
+    # Set the content length to the download size instead of the size of 
+    # the last range
+    blob.properties.content_length = download_size
+
+    # Overwrite the content range to the range downloaded
+    start_range = start_range or 0
+    blob.properties.content_range = 'bytes {0}-{1}/{2}'.format(
+        start_range, start_range + download_size - 1, blob_size)
+
+    # Overwrite the content MD5 as it is the MD5 for the last range instead 
+    # of the stored MD5
+    # TODO: Set to the stored MD5 when the service returns this
+    blob.properties.content_md5 = None
 
 def _download_blob_chunks(blob_service, container_name, blob_name,
                           download_size, block_size, progress, start_range, end_range, 
                           stream, max_connections, progress_callback, validate_content, 
                           lease_id, if_modified_since, if_unmodified_since, if_match, 
-                          if_none_match, timeout, operation_context):
+                          if_none_match, timeout, operation_context, checkpoint=None):
     if max_connections <= 1:
         raise ValueError(_ERROR_NO_SINGLE_THREAD_CHUNKING.format('blob'))
 
@@ -47,17 +116,77 @@ def _download_blob_chunks(blob_service, container_name, blob_name,
         if_none_match,
         timeout,
         operation_context,
+        checkpoint,
     )
 
-    import concurrent.futures
-    executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-    result = list(executor.map(downloader.process_chunk, downloader.get_chunk_offsets()))
+    try:
+        blob_service._transfer_executor.map(downloader.process_chunk, downloader.get_chunk_ranges(),
+                                            max_connections)
+    finally:
+        hedger = downloader.hedger
+        if hedger is not None and hedger.policy.callback is not None:
+            hedger.policy.callback(hedger.stats)
+
+    downloader.seek_stream_end()
+
+def _get_writable_fileno(stream):
+    # Writing a file with pwrite does not move the file position, so workers
+    # need not take turns on the stream lock. Files opened for appending are
+    # left out as they write at the end whatever the offset.
+    mode = getattr(stream, 'mode', None)
+    if not hasattr(os, 'pwrite') or not isinstance(mode, str) or 'b' not in mode \
+            or 'a' in mode or not ('w' in mode or '+' in mode):
+        return None
+
+    try:
+        return stream.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+
+def _preallocate(fileno, size):
+    # Grow the file to its final size before the ranges are written, so they
+    # may land in any order without the file system extending it each time.
+    file_size = os.fstat(fileno).st_size
+    if file_size >= size:
+        return
+
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fileno, file_size, size - file_size)
+            return
+        except OSError:
+            # Not supported by every file system
+            pass
+
+    os.ftruncate(fileno, size)
+
+def _pwrite(fileno, data, offset):
+    # pwrite may write less than asked
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fileno, view, offset)
+        view = view[written:]
+        offset += written
+
+class _RangeFileWriter(object):
+    '''
+    Writes the body of a ranged get into a file with pwrite. As with 
+    _RangeStreamWriter offsets are relative to the start of the range, but no 
+    lock is needed as the file position is never moved.
+    '''
+    def __init__(self, fileno, file_offset):
+        self.fileno = fileno
+        self.file_offset = file_offset
+
+    def write(self, offset, data):
+        _pwrite(self.fileno, data, self.file_offset + offset)
 
 class _BlobChunkDownloader(object):
     def __init__(self, blob_service, container_name, blob_name, download_size,
                  chunk_size, progress, start_range, end_range, stream, 
                  progress_callback, validate_content, lease_id, if_modified_since, 
-                 if_unmodified_since, if_match, if_none_match, timeout, operation_context):
+                 if_unmodified_since, if_match, if_none_match, timeout, operation_context,
+                 checkpoint=None):
         self.blob_service = blob_service
         self.container_name = container_name
         self.blob_name = blob_name
@@ -70,12 +199,46 @@ class _BlobChunkDownloader(object):
         self.stream = stream
         self.stream_start = stream.tell()
         self.stream_lock = threading.Lock()
+        self.stream_fileno = _get_writable_fileno(stream)
+        if self.stream_fileno is not None:
+            # The first range may still be held in the stream's buffer
+            stream.flush()
+            _preallocate(self.stream_fileno, self.stream_start + (end_range - start_range))
+
         self.progress_callback = progress_callback
         self.progress_total = progress
+        self.progress_next = start_range
+        self.progress_done = {}
         self.progress_lock = threading.Lock()
+
+        # Chunks completed by an earlier attempt are skipped but still count 
+        # towards the progress
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            for chunk_start in range(start_range, end_range, chunk_size):
+                if checkpoint.is_done(chunk_start):
+                    self.progress_done[chunk_start] = min(chunk_start + chunk_size, end_range)
+
+        # Chunks recorded in a checkpoint must keep their boundaries
+        self.chunk_sizer = None
+        if blob_service.ADAPTIVE_CHUNK_SIZE and checkpoint is None:
+            self.chunk_sizer = _get_chunk_sizer(chunk_size, validate_content)
+
         self.timeout = timeout
         self.operation_context = operation_context
 
+        # Duplicate requests go to the download's location unless the policy 
+        # names another
+        self.hedger = None
+        self.hedge_context = operation_context
+        policy = blob_service.hedge_policy
+        if policy is not None:
+            self.hedger = _RangeHedger(policy, HedgeStats())
+            if policy.location_mode is not None:
+                locations = blob_service._get_host_locations(secondary=True)
+                self.hedge_context = _OperationContext(location_lock=True)
+                self.hedge_context.host_location = {policy.location_mode: locations[policy.location_mode]}
+
         self.validate_content = validate_content
         self.lease_id = lease_id
         self.if_modified_since=if_modified_since
@@ -83,37 +246,91 @@ class _BlobChunkDownloader(object):
         self.if_match=if_match
         self.if_none_match=if_none_match
 
-    def get_chunk_offsets(self):
+    def get_chunk_ranges(self):
         index = self.start_index
         while index < self.blob_end:
-            yield index
-            index += self.chunk_size
-
-    def process_chunk(self, chunk_start):
-        if chunk_start + self.chunk_size > self.blob_end:
-            chunk_end = self.blob_end
-        else:
-            chunk_end = chunk_start + self.chunk_size
+            # The size is picked as each chunk is submitted, so it follows the 
+            # chunks completed so far
+            chunk_size = self.chunk_sizer.size if self.chunk_sizer else self.chunk_size
+            chunk_end = min(index + chunk_size, self.blob_end)
+            if self.checkpoint is None or not self.checkpoint.is_done(index):
+                yield index, chunk_end
+            index = chunk_end
 
-        chunk_data = self._download_chunk(chunk_start, chunk_end).content
+    def process_chunk(self, chunk_range):
+        chunk_start, chunk_end = chunk_range
         length = chunk_end - chunk_start
+        started = time()
+        if self.hedger is not None:
+            chunk_data = self.hedger.call(
+                lambda hedge: self._download_chunk(chunk_start, chunk_end, hedge).content, length)
+        else:
+            chunk_data = self._download_chunk(chunk_start, chunk_end).content
+        if self.chunk_sizer is not None:
+            self.chunk_sizer.record(length, time() - started)
         if length > 0:
-            self._write_to_stream(chunk_data, chunk_start)
-            self._update_progress(length)
+            # The content is None if the range was streamed into the stream
+            if chunk_data is not None:
+                self._write_to_stream(chunk_data, chunk_start)
+            if self.checkpoint is not None:
+                self._record_chunk(chunk_start)
+            self._update_progress(chunk_start, chunk_end)
+
+    def _record_chunk(self, chunk_start):
+        # The chunk is only recorded once its data has reached the file
+        if self.stream_fileno is None:
+            with self.stream_lock:
+                self.stream.flush()
+        self.checkpoint.record(chunk_start)
 
-    def _update_progress(self, length):
+    def seek_stream_end(self):
+        # pwrite leaves the stream where the first range ended and seek and 
+        # write where the last range to complete ended, move it past the data
+        if self.blob_end > self.start_index:
+            self.stream.seek(self.stream_start + (self.blob_end - self.start_index))
+
+    def _update_progress(self, chunk_start, chunk_end):
         if self.progress_callback is not None:
             with self.progress_lock:
-                self.progress_total += length
-                total = self.progress_total
-                self.progress_callback(total, self.download_size)
+                # Chunks complete out of order. Each is reported once all the 
+                # chunks before it are done, so the progress is always a 
+                # contiguous prefix of the download.
+                self.progress_done[chunk_start] = chunk_end
+                while self.progress_next in self.progress_done:
+                    chunk_end = self.progress_done.pop(self.progress_next)
+                    self.progress_total += chunk_end - self.progress_next
+                    self.progress_next = chunk_end
+                    self.progress_callback(self.progress_total, self.download_size)
 
+    @_timed_cpu('write')
     def _write_to_stream(self, chunk_data, chunk_start):
+        if self.stream_fileno is not None:
+            _pwrite(self.stream_fileno, chunk_data, self.stream_start + (chunk_start - self.start_index))
+            return
+
         with self.stream_lock:
             self.stream.seek(self.stream_start + (chunk_start - self.start_index))
             self.stream.write(chunk_data)
 
-    def _download_chunk(self, chunk_start, chunk_end):
+    def _get_stream_writer(self, chunk_start):
+        # Hedged ranges are buffered, as either request may complete first and 
+        # the other must not write to the stream
+        if self.hedger is not None:
+            return None
+
+        if self.stream_fileno is not None:
+            return _RangeFileWriter(self.stream_fileno,
+                                    self.stream_start + (chunk_start - self.start_index))
+
+        # Ranges are buffered and written with _write_to_stream otherwise
+        if not _can_overwrite(self.stream):
+            return None
+
+        return _RangeStreamWriter(self.stream,
+                                  self.stream_start + (chunk_start - self.start_index),
+                                  self.stream_lock)
+
+    def _download_chunk(self, chunk_start, chunk_end, hedge=False):
         response = self.blob_service._get_blob(
             self.container_name,
             self.blob_name,
@@ -126,7 +343,8 @@ class _BlobChunkDownloader(object):
             if_match=self.if_match,
             if_none_match=self.if_none_match,
             timeout=self.timeout,
-            _context=self.operation_context
+            _context=self.hedge_context if hedge else self.operation_context,
+            _stream_writer=self._get_stream_writer(chunk_start)
         )
 
         # This makes sure that if_match is set so that we can validate 
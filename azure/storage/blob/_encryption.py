@@ -16,7 +16,6 @@
 from os import urandom
 from json import(
     dumps,
-    loads,
 )
 from .._error import(
     _validate_not_none,
@@ -24,14 +23,17 @@ from .._error import(
     _ERROR_DATA_NOT_ENCRYPTED,
 )
 from .._encryption import (
+    _get_PKCS7_padder,
+    _get_PKCS7_unpadder,
     _generate_encryption_data_dict,
     _generate_AES_CBC_cipher,
-    _dict_to_encryption_data,
+    _json_to_encryption_data,
     _validate_and_unwrap_cek,
     _EncryptionAlgorithm,
 )
-from cryptography.hazmat.primitives.padding import PKCS7
+from .._timing import _timed_cpu
 
+@_timed_cpu('encrypt')
 def _encrypt_blob(blob, key_encryption_key):
     '''
     Encrypts the given blob using AES256 in CBC mode with 128 bit padding.
@@ -62,7 +64,7 @@ def _encrypt_blob(blob, key_encryption_key):
     cipher = _generate_AES_CBC_cipher(content_encryption_key, initialization_vector)
 
     # PKCS7 with 16 byte blocks ensures compatibility with AES.
-    padder = PKCS7(128).padder()
+    padder = _get_PKCS7_padder()
     padded_data = padder.update(blob) + padder.finalize()
 
     # Encrypt the data.
@@ -99,6 +101,7 @@ def _generate_blob_encryption_data(key_encryption_key):
 
     return (content_encryption_key, initialization_vector, encryption_data)
 
+@_timed_cpu('decrypt')
 def _decrypt_blob(require_encryption, key_encryption_key, key_resolver, 
                   response, start_offset, end_offset):
     '''
@@ -122,7 +125,7 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     _validate_not_none('content', content)
     
     try:
-        encryption_data = _dict_to_encryption_data(loads(response.headers['x-ms-meta-encryptiondata']))
+        encryption_data = _json_to_encryption_data(response.headers['x-ms-meta-encryptiondata'])
     except:
         if require_encryption:
             raise ValueError(_ERROR_DATA_NOT_ENCRYPTED)
@@ -172,7 +175,7 @@ def _decrypt_blob(require_encryption, key_encryption_key, key_resolver,
     
     content = decryptor.update(content) + decryptor.finalize()
     if unpad:
-        unpadder = PKCS7(128).unpadder()
+        unpadder = _get_PKCS7_unpadder()
         content = unpadder.update(content) + unpadder.finalize()
 
     return content[start_offset : len(content) - end_offset]
@@ -184,6 +187,6 @@ def _get_blob_encryptor_and_padder(cek, iv, should_pad):
     if cek is not None and iv is not None:
         cipher = _generate_AES_CBC_cipher(cek, iv)
         encryptor = cipher.encryptor()
-        padder = PKCS7(128).padder() if should_pad else None
+        padder = _get_PKCS7_padder() if should_pad else None
 
     return encryptor, padder
\ No newline at end of file
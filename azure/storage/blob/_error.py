@@ -32,6 +32,12 @@ _ERROR_INVALID_LEASE_DURATION = \
 _ERROR_INVALID_LEASE_BREAK_PERIOD = \
     "lease_break_period param needs to be between 0 and 60."
 
+_ERROR_CHECKPOINT_APPEND = \
+    'A download cannot be resumed from a checkpoint into a file opened for appending.'
+
+_ERROR_CHECKPOINT_ENCRYPTION = \
+    'An encrypted upload cannot be resumed from a checkpoint.'
+
 _ERROR_NO_SINGLE_THREAD_CHUNKING = \
     'To use blob chunk downloader more than 1 thread must be ' + \
     'used since get_blob_to_bytes should be called for single threaded ' + \
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from xml.sax.saxutils import escape as xml_escape
 try:
     from xml.etree import cElementTree as ETree
 except ImportError:
@@ -20,7 +19,9 @@ except ImportError:
 from .._common_conversion import (
     _encode_base64,
     _str,
+    _xml_escape,
 )
+from .._timing import _timed_cpu
 from .._error import (
     _validate_not_none,
     _ERROR_START_END_NEEDED_FOR_MD5,
@@ -85,6 +86,7 @@ def _validate_and_format_range_headers(request, start_range, end_range, start_ra
 
         request.headers['x-ms-range-get-content-md5'] = 'true'
 
+@_timed_cpu('serialize')
 def _convert_block_list_to_xml(block_id_list):
     '''
     <?xml version="1.0" encoding="utf-8"?>
@@ -109,7 +111,7 @@ def _convert_block_list_to_xml(block_id_list):
     for block in block_id_list:
         if block.id is None:
             raise ValueError(_ERROR_INVALID_BLOCK_ID)
-        id = xml_escape(_str(format(_encode_base64(block.id))))
+        id = _xml_escape(_str(format(_encode_base64(block.id))))
         ETree.SubElement(block_list_element, block.state).text = id
 
     # Add xml declaration and serialize
@@ -12,33 +12,75 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import os
 import threading
-import sys
 from time import sleep
-from cryptography.hazmat.primitives.padding import PKCS7
 from .._common_conversion import _encode_base64
 from .._serialization import(
     url_quote,
     _get_data_bytes_only,
 )
+from .._deserialization import _is_seekable
 from ._encryption import(
     _get_blob_encryptor_and_padder,
 )
 from azure.common import (
     AzureHttpError,
+    AzureMissingResourceHttpError,
 )
 from .models import BlobBlock
-if sys.version_info >= (3,):
-    from io import BytesIO
-else:
-    from cStringIO import StringIO as BytesIO
+from .._timing import _timed_cpu
+from .._transfer import (
+    _BufferPool,
+    _ReadAhead,
+)
 
 def _upload_blob_chunks(blob_service, container_name, blob_name,
                         blob_size, block_size, stream, max_connections,
                         progress_callback, validate_content, lease_id, uploader_class, 
                         maxsize_condition=None, if_match=None, timeout=None,
-                        content_encryption_key=None, initialization_vector=None):
+                        content_encryption_key=None, initialization_vector=None,
+                        checkpoint=None):
+
+    uploader = _create_blob_chunk_uploader(
+        blob_service, container_name, blob_name, blob_size, block_size, stream,
+        max_connections, progress_callback, validate_content, lease_id, uploader_class,
+        maxsize_condition, if_match, timeout, content_encryption_key, initialization_vector)
+    uploader.checkpoint = checkpoint
 
+    if progress_callback is not None:
+        progress_callback(0, blob_size)
+
+    if max_connections > 1 and uploader.can_read_by_offset():
+        # Each worker reads its own chunk so reads are parallel too. At most
+        # max_connections chunks are in flight, so as many buffers are enough.
+        uploader.buffer_pool = _BufferPool(block_size, max_connections)
+        range_ids = blob_service._transfer_executor.map(uploader.process_chunk_at_offset,
+                                                        uploader.get_chunk_offsets(),
+                                                        max_connections)
+    elif max_connections > 1:
+        # The stream is read in order on a separate thread, up to
+        # max_connections chunks ahead of the ones in flight. The reader waits
+        # for a free buffer beyond that.
+        uploader.buffer_pool = _BufferPool(block_size, 2 * max_connections)
+        chunks = _ReadAhead(uploader.get_chunk_streams(), max_connections, uploader.discard_chunk)
+        try:
+            range_ids = blob_service._transfer_executor.map(uploader.process_chunk,
+                                                            chunks,
+                                                            max_connections)
+        finally:
+            chunks.close()
+    else:
+        uploader.buffer_pool = _BufferPool(block_size, 1)
+        range_ids = [uploader.process_chunk(result) for result in uploader.get_chunk_streams()]
+
+    return range_ids
+
+def _create_blob_chunk_uploader(blob_service, container_name, blob_name,
+                                blob_size, block_size, stream, max_connections,
+                                progress_callback, validate_content, lease_id, uploader_class,
+                                maxsize_condition=None, if_match=None, timeout=None,
+                                content_encryption_key=None, initialization_vector=None):
     encryptor, padder = _get_blob_encryptor_and_padder(content_encryption_key, initialization_vector,
                                                        uploader_class is not _PageBlobChunkUploader)
 
@@ -64,17 +106,42 @@ def _upload_blob_chunks(blob_service, container_name, blob_name,
     # before the previous finishes and provides an etag
     uploader.if_match = if_match if not max_connections > 1 else None
 
-    if progress_callback is not None:
-        progress_callback(0, blob_size)
+    return uploader
 
-    if max_connections > 1:
-        import concurrent.futures
-        executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-        range_ids = list(executor.map(uploader.process_chunk, uploader.get_chunk_streams()))
-    else:
-        range_ids = [uploader.process_chunk(result) for result in uploader.get_chunk_streams()]
+def _get_uncommitted_block_offsets(blob_service, container_name, blob_name,
+                                   blob_size, block_size, lease_id=None, timeout=None):
+    '''
+    Returns the offsets of the chunks of a blob whose blocks were uploaded by
+    _BlockBlobChunkUploader and are still uncommitted, with the expected size.
+    '''
+    try:
+        block_list = blob_service.get_block_list(container_name, blob_name,
+                                                 block_list_type='uncommitted',
+                                                 lease_id=lease_id, timeout=timeout)
+    except AzureMissingResourceHttpError:
+        return set()
 
-    return range_ids
+    offsets = set()
+    for block in block_list.uncommitted_blocks:
+        try:
+            offset = int(block.id)
+        except ValueError:
+            continue
+        if offset < blob_size and block.size == min(block_size, blob_size - offset):
+            offsets.add(offset)
+    return offsets
+
+def _get_readonly_fileno(stream):
+    # Reading a file with preadv does not move the file position, so workers
+    # need not take turns on the stream lock. Files opened for writing are left
+    # out as they may hold data not yet flushed to the file.
+    if not hasattr(os, 'preadv') or getattr(stream, 'mode', None) != 'rb':
+        return None
+
+    try:
+        return stream.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
 
 class _BlobChunkUploader(object):
     def __init__(self, blob_service, container_name, blob_name, blob_size,
@@ -87,7 +154,7 @@ class _BlobChunkUploader(object):
         self.chunk_size = chunk_size
         self.stream = stream
         self.parallel = parallel
-        self.stream_start = stream.tell() if parallel else None
+        self.stream_start = stream.tell() if parallel and _is_seekable(stream) else None
         self.stream_lock = threading.Lock() if parallel else None
         self.progress_callback = progress_callback
         self.progress_total = 0
@@ -97,47 +164,158 @@ class _BlobChunkUploader(object):
         self.timeout = timeout
         self.encryptor = encryptor
         self.padder = padder
+        self.buffer_pool = None
+        self.checkpoint = None
+        self.stream_fileno = _get_readonly_fileno(stream) if parallel else None
 
     def get_chunk_streams(self):
+        if self.encryptor is None and self.padder is None and hasattr(self.stream, 'readinto'):
+            return self._get_chunk_buffers()
+
+        return self._get_chunk_bytes()
+
+    def _get_chunk_buffers(self):
+        # Read each chunk in place into a buffer which is then sent as is, the
+        # buffer is recycled once the chunk is uploaded.
+        index = 0
+        while True:
+            read_size = self.chunk_size
+            if self.blob_size:
+                read_size = min(self.chunk_size, self.blob_size - index)
+
+            buffer = self._acquire_buffer()
+            view = memoryview(buffer)
+            length = 0
+
+            # Buffer until we either reach the end of the stream or get a whole chunk.
+            while length < read_size:
+                count = self.stream.readinto(view[length:read_size])
+                if not count:
+                    break
+                length += count
+
+            if length == 0:
+                if self.buffer_pool:
+                    self.buffer_pool.release(buffer)
+                break
+
+            yield index, view[:length], buffer
+
+            if length < read_size:
+                break
+
+            index += length
+
+    def _get_chunk_bytes(self):
         index = 0
         while True:
-            data = b''
+            pieces = []
+            length = 0
             read_size = self.chunk_size
 
             # Buffer until we either reach the end of the stream or get a whole chunk.
             while True:
                 if self.blob_size:
-                    read_size = min(self.chunk_size-len(data), self.blob_size - (index + len(data)))
+                    read_size = min(self.chunk_size - length, self.blob_size - (index + length))
                 temp = self.stream.read(read_size)
                 temp = _get_data_bytes_only('temp', temp)
-                data += temp
+                pieces.append(temp)
+                length += len(temp)
 
                 # We have read an empty string and so are at the end
                 # of the buffer or we have read a full chunk.
-                if temp == b'' or len(data) == self.chunk_size:
+                if temp == b'' or length == self.chunk_size:
                     break
 
+            data = pieces[0] if len(pieces) == 1 else b''.join(pieces)
+
             if len(data) == self.chunk_size:
-                if self.padder:
-                    data = self.padder.update(data)
-                if self.encryptor:
-                    data = self.encryptor.update(data)
-                yield index, BytesIO(data)
+                data = self._encrypt_chunk(data, False)
+                yield index, data, None
             else:
-                if self.padder:
-                    data = self.padder.update(data) + self.padder.finalize()
-                if self.encryptor:
-                    data = self.encryptor.update(data) + self.encryptor.finalize()
+                data = self._encrypt_chunk(data, True)
                 if len(data) > 0:
-                    yield index, BytesIO(data)
+                    yield index, data, None
                 break
-            
+
             index += len(data)
 
+    @_timed_cpu('encrypt')
+    def _encrypt_chunk(self, data, last):
+        if self.padder:
+            data = self.padder.update(data)
+            if last:
+                data += self.padder.finalize()
+        if self.encryptor:
+            data = self.encryptor.update(data)
+            if last:
+                data += self.encryptor.finalize()
+        return data
+
     def process_chunk(self, chunk_data):
-        chunk_bytes = chunk_data[1].read()
-        chunk_offset = chunk_data[0]
-        return self._upload_chunk_with_progress(chunk_offset, chunk_bytes)
+        chunk_offset, chunk_bytes, buffer = chunk_data
+        try:
+            return self._upload_chunk_with_progress(chunk_offset, chunk_bytes)
+        finally:
+            self._release_buffer(buffer)
+
+    def can_read_by_offset(self):
+        # Encrypted chunks are chained to the previous one so must be read in order
+        return self.stream_start is not None and self.blob_size is not None \
+            and self.encryptor is None and self.padder is None
+
+    def get_chunk_offsets(self):
+        index = 0
+        while index < self.blob_size:
+            yield index
+            index += self.chunk_size
+
+    def process_chunk_at_offset(self, chunk_offset):
+        size = min(self.chunk_size, self.blob_size - chunk_offset)
+        if self._is_chunk_done(chunk_offset):
+            self._update_progress(size)
+            return self._get_range_id(chunk_offset)
+
+        chunk_bytes, buffer = self._read_from_stream(chunk_offset, size)
+        return self.process_chunk((chunk_offset, chunk_bytes, buffer))
+
+    def _read_from_stream(self, offset, count):
+        position = self.stream_start + offset
+
+        if not hasattr(self.stream, 'readinto'):
+            with self.stream_lock:
+                self.stream.seek(position)
+                return _get_data_bytes_only('data', self.stream.read(count)), None
+
+        buffer = self._acquire_buffer()
+        try:
+            view = memoryview(buffer)
+            length = 0
+            while length < count:
+                if self.stream_fileno is not None:
+                    read = os.preadv(self.stream_fileno, [view[length:count]], position + length)
+                else:
+                    with self.stream_lock:
+                        self.stream.seek(position + length)
+                        read = self.stream.readinto(view[length:count])
+                if not read:
+                    break
+                length += read
+        except Exception:
+            self._release_buffer(buffer)
+            raise
+
+        return view[:length], buffer
+
+    def _acquire_buffer(self):
+        return self.buffer_pool.acquire() if self.buffer_pool else bytearray(self.chunk_size)
+
+    def discard_chunk(self, chunk_data):
+        self._release_buffer(chunk_data[2])
+
+    def _release_buffer(self, buffer):
+        if buffer is not None and self.buffer_pool:
+            self.buffer_pool.release(buffer)
 
     def _update_progress(self, length):
         if self.progress_callback is not None:
@@ -151,24 +329,36 @@ class _BlobChunkUploader(object):
             self.progress_callback(total, self.blob_size)
 
     def _upload_chunk_with_progress(self, chunk_offset, chunk_data):
-        range_id = self._upload_chunk(chunk_offset, chunk_data) 
+        if self._is_chunk_done(chunk_offset):
+            range_id = self._get_range_id(chunk_offset)
+        else:
+            range_id = self._upload_chunk(chunk_offset, chunk_data)
+            if self.checkpoint is not None:
+                self.checkpoint.record(chunk_offset)
         self._update_progress(len(chunk_data))
         return range_id
 
+    def _is_chunk_done(self, chunk_offset):
+        # Chunks uploaded by an earlier attempt and recorded in the checkpoint
+        return self.checkpoint is not None and self.checkpoint.is_done(chunk_offset)
+
 
 class _BlockBlobChunkUploader(_BlobChunkUploader):
+    def _get_range_id(self, chunk_offset):
+        return BlobBlock(url_quote(_encode_base64('{0:032d}'.format(chunk_offset))))
+
     def _upload_chunk(self, chunk_offset, chunk_data):
-        block_id=url_quote(_encode_base64('{0:032d}'.format(chunk_offset)))
+        block = self._get_range_id(chunk_offset)
         self.blob_service._put_block(
             self.container_name,
             self.blob_name,
             chunk_data,
-            block_id,
+            block.id,
             validate_content=self.validate_content,
             lease_id=self.lease_id,
             timeout=self.timeout,
         )
-        return BlobBlock(block_id)
+        return block
 
 
 class _PageBlobChunkUploader(_BlobChunkUploader):
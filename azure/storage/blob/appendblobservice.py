@@ -29,6 +29,7 @@ from .._serialization import (
     _add_metadata_headers,
 )
 from .._http import HTTPRequest
+from .._timing import _timed_transfer
 from ._upload_chunking import (
     _AppendBlobChunkUploader,
     _upload_blob_chunks,
@@ -474,6 +475,7 @@ class AppendBlobService(BaseBlobService):
             progress_callback=progress_callback,
             timeout=timeout)
 
+    @_timed_transfer
     def append_blob_from_stream(
         self, container_name, blob_name, stream, count=None,
         validate_content=False, maxsize_condition=None, progress_callback=None, 
@@ -0,0 +1,761 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+from io import BytesIO
+from os import path
+from time import time
+
+from azure.common import (
+    AzureHttpError,
+)
+from .._common_conversion import _encode_base64
+from .._constants import (
+    SERVICE_HOST_BASE,
+    DEFAULT_PROTOCOL,
+)
+from .._deserialization import _parse_length_from_content_range
+from .._error import (
+    _dont_fail_not_exist,
+    _dont_fail_on_exist,
+    _validate_not_none,
+    _validate_type_bytes,
+    _validate_encryption_required,
+    _ERROR_PARALLEL_NOT_SEEKABLE,
+    _ERROR_VALUE_NEGATIVE,
+)
+from .._serialization import url_quote
+from ..models import _OperationContext
+from ..asyncstorageclient import (
+    AsyncStorageClient,
+    AsyncListGenerator,
+)
+from ._download_chunking import (
+    _BlobChunkDownloader,
+    _get_first_range,
+    _get_download_size,
+    _get_download_end,
+    _set_download_properties,
+)
+from ._encryption import _generate_blob_encryption_data
+from ._error import (
+    _ERROR_INVALID_LEASE_DURATION,
+    _ERROR_INVALID_LEASE_BREAK_PERIOD,
+)
+from ._upload_chunking import (
+    _BlockBlobChunkUploader,
+    _create_blob_chunk_uploader,
+)
+from .blockblobservice import BlockBlobService
+from .models import (
+    BlobBlock,
+    _LeaseActions,
+)
+
+
+class AsyncBlockBlobService(AsyncStorageClient, BlockBlobService):
+
+    '''
+    The asyncio version of :class:`~azure.storage.blob.blockblobservice.BlockBlobService`.
+    Every operation which calls the service is a coroutine taking the same
+    parameters and returning the same values as its synchronous counterpart.
+    list_containers and list_blobs return an
+    :class:`~azure.storage.asyncstorageclient.AsyncListGenerator` to be used
+    with async for.
+
+    The get_blob_to_* and create_blob_from_* methods transfer the ranges or
+    blocks of large blobs as concurrent tasks, up to max_connections at a
+    time. Streams and files are read and written on the event loop. Requires
+    the aiohttp package.
+    '''
+
+    def __init__(self, account_name=None, account_key=None, sas_token=None,
+                 is_emulated=False, protocol=DEFAULT_PROTOCOL, endpoint_suffix=SERVICE_HOST_BASE,
+                 custom_domain=None, request_session=None, connection_string=None):
+        '''
+        Takes the same parameters as BlockBlobService, except for request_session.
+
+        :param aiohttp.ClientSession request_session:
+            The session object to use for http requests. If not specified, one
+            is created on first use and closed by close.
+        '''
+        super(AsyncBlockBlobService, self).__init__(
+            account_name, account_key, sas_token, is_emulated, protocol, endpoint_suffix,
+            custom_domain, None, connection_string)
+
+        self._use_async_transport(request_session)
+
+    async def list_containers(self, prefix=None, num_results=None, include_metadata=False,
+                              marker=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.list_containers`.
+
+        :return: An async iterator which produces :class:`~azure.storage.blob.models.Container` objects.
+        :rtype: :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+        '''
+        include = 'metadata' if include_metadata else None
+        operation_context = _OperationContext(location_lock=True)
+        kwargs = {'prefix': prefix, 'marker': marker, 'max_results': num_results,
+                  'include': include, 'timeout': timeout, '_context': operation_context}
+        resp = await self._list_containers(**kwargs)
+
+        return AsyncListGenerator(resp, self._list_containers, (), kwargs)
+
+    async def create_container(self, container_name, metadata=None,
+                               public_access=None, fail_on_exist=False, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.create_container`.
+
+        :return: True if container is created, False if container already exists.
+        :rtype: bool
+        '''
+        request = self._create_container_request(container_name, metadata, public_access, timeout)
+
+        if not fail_on_exist:
+            try:
+                await self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_on_exist(ex)
+                return False
+        else:
+            await self._perform_request(request)
+            return True
+
+    async def delete_container(self, container_name, fail_not_exist=False,
+                               lease_id=None, if_modified_since=None,
+                               if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.delete_container`.
+
+        :return: True if container is deleted, False container doesn't exist.
+        :rtype: bool
+        '''
+        request = self._delete_container_request(container_name, lease_id, if_modified_since,
+                                                 if_unmodified_since, timeout)
+
+        if not fail_not_exist:
+            try:
+                await self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_not_exist(ex)
+                return False
+        else:
+            await self._perform_request(request)
+            return True
+
+    async def acquire_container_lease(
+        self, container_name, lease_duration=-1, proposed_lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.acquire_container_lease`.
+
+        :return: str
+        '''
+        _validate_not_none('lease_duration', lease_duration)
+        if lease_duration != -1 and\
+           (lease_duration < 15 or lease_duration > 60):
+            raise ValueError(_ERROR_INVALID_LEASE_DURATION)
+
+        lease = await self._lease_container_impl(container_name, _LeaseActions.Acquire, None,
+                                                 lease_duration, None, proposed_lease_id,
+                                                 if_modified_since, if_unmodified_since, timeout)
+        return lease['id']
+
+    async def renew_container_lease(
+        self, container_name, lease_id, if_modified_since=None,
+        if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.renew_container_lease`.
+
+        :return: str
+        '''
+        _validate_not_none('lease_id', lease_id)
+
+        lease = await self._lease_container_impl(container_name, _LeaseActions.Renew, lease_id,
+                                                 None, None, None,
+                                                 if_modified_since, if_unmodified_since, timeout)
+        return lease['id']
+
+    async def release_container_lease(
+        self, container_name, lease_id, if_modified_since=None,
+        if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.release_container_lease`.
+        '''
+        _validate_not_none('lease_id', lease_id)
+
+        await self._lease_container_impl(container_name, _LeaseActions.Release, lease_id,
+                                         None, None, None,
+                                         if_modified_since, if_unmodified_since, timeout)
+
+    async def break_container_lease(
+        self, container_name, lease_break_period=None,
+        if_modified_since=None, if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.break_container_lease`.
+
+        :return: int
+        '''
+        if (lease_break_period is not None) and (lease_break_period < 0 or lease_break_period > 60):
+            raise ValueError(_ERROR_INVALID_LEASE_BREAK_PERIOD)
+
+        lease = await self._lease_container_impl(container_name, _LeaseActions.Break, None,
+                                                 None, lease_break_period, None,
+                                                 if_modified_since, if_unmodified_since, timeout)
+        return lease['time']
+
+    async def change_container_lease(
+        self, container_name, lease_id, proposed_lease_id,
+        if_modified_since=None, if_unmodified_since=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.change_container_lease`.
+        '''
+        _validate_not_none('lease_id', lease_id)
+
+        await self._lease_container_impl(container_name, _LeaseActions.Change, lease_id,
+                                         None, None, proposed_lease_id,
+                                         if_modified_since, if_unmodified_since, timeout)
+
+    async def list_blobs(self, container_name, prefix=None, num_results=None, include=None,
+                         delimiter=None, marker=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.list_blobs`.
+
+        :return: An async iterator which produces :class:`~azure.storage.blob.models.Blob` objects.
+        :rtype: :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+        '''
+        operation_context = _OperationContext(location_lock=True)
+        args = (container_name,)
+        kwargs = {'prefix': prefix, 'marker': marker, 'max_results': num_results,
+                  'include': include, 'delimiter': delimiter, 'timeout': timeout,
+                  '_context': operation_context}
+        resp = await self._list_blobs(*args, **kwargs)
+
+        return AsyncListGenerator(resp, self._list_blobs, args, kwargs)
+
+    async def exists(self, container_name, blob_name=None, snapshot=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.exists`.
+
+        :return: A boolean indicating whether the resource exists.
+        :rtype: bool
+        '''
+        _validate_not_none('container_name', container_name)
+        try:
+            if blob_name is None:
+                await self.get_container_properties(container_name, timeout=timeout)
+            else:
+                await self.get_blob_properties(container_name, blob_name, snapshot=snapshot, timeout=timeout)
+            return True
+        except AzureHttpError as ex:
+            _dont_fail_not_exist(ex)
+            return False
+
+    async def get_blob_to_path(
+        self, container_name, blob_name, file_path, open_mode='wb', snapshot=None,
+        start_range=None, end_range=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None,
+        if_match=None, if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.get_blob_to_path`.
+
+        :return: A Blob with properties and metadata.
+        :rtype: :class:`~azure.storage.blob.models.Blob`
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('file_path', file_path)
+        _validate_not_none('open_mode', open_mode)
+
+        if max_connections > 1 and 'a' in open_mode:
+            raise ValueError(_ERROR_PARALLEL_NOT_SEEKABLE)
+
+        with open(file_path, open_mode) as stream:
+            blob = await self.get_blob_to_stream(
+                container_name, blob_name, stream, snapshot, start_range, end_range,
+                validate_content, progress_callback, max_connections, lease_id,
+                if_modified_since, if_unmodified_since, if_match, if_none_match, timeout)
+
+        return blob
+
+    async def get_blob_to_stream(
+        self, container_name, blob_name, stream, snapshot=None,
+        start_range=None, end_range=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.get_blob_to_stream`.
+        If max_connections is greater than 1, the ranges after the first get
+        are downloaded by up to max_connections concurrent tasks.
+
+        :return: A Blob with properties and metadata.
+        :rtype: :class:`~azure.storage.blob.models.Blob`
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('stream', stream)
+
+        get_args = dict(validate_content=validate_content, lease_id=lease_id,
+                        if_modified_since=if_modified_since, if_unmodified_since=if_unmodified_since,
+                        if_match=if_match, if_none_match=if_none_match, timeout=timeout)
+
+        # If the user explicitly sets max_connections to 1, do a single shot download
+        if max_connections == 1:
+            blob = await self._get_blob(container_name, blob_name, snapshot,
+                                        start_range=start_range, end_range=end_range, **get_args)
+
+            # Set the download size
+            download_size = blob.properties.content_length
+
+        # If max_connections is greater than 1, do the first get to establish the
+        # size of the blob and get the first segment of data
+        else:
+            if not stream.seekable():
+                raise ValueError(_ERROR_PARALLEL_NOT_SEEKABLE)
+
+            # The service only provides transactional MD5s for chunks under 4MB.
+            first_get_size = self.MAX_SINGLE_GET_SIZE if not validate_content else self.MAX_CHUNK_GET_SIZE
+
+            initial_request_start, initial_request_end = _get_first_range(
+                start_range, end_range, first_get_size)
+
+            # Send a context object to make sure we always retry to the initial location
+            operation_context = _OperationContext(location_lock=True)
+            try:
+                blob = await self._get_blob(container_name, blob_name, snapshot,
+                                            start_range=initial_request_start,
+                                            end_range=initial_request_end,
+                                            _context=operation_context, **get_args)
+
+                # Parse the total blob size and adjust the download size if ranges
+                # were specified
+                blob_size = _parse_length_from_content_range(blob.properties.content_range)
+                download_size = _get_download_size(blob_size, start_range, end_range)
+            except AzureHttpError as ex:
+                if not start_range and ex.status_code == 416:
+                    # Get range will fail on an empty blob. If the user did not
+                    # request a range, do a regular get request in order to get
+                    # any properties.
+                    blob = await self._get_blob(container_name, blob_name, snapshot,
+                                                _context=operation_context, **get_args)
+
+                    # Set the download size to empty
+                    download_size = 0
+                else:
+                    raise ex
+
+        # Mark the first progress chunk
+        if progress_callback:
+            progress_callback(blob.properties.content_length, download_size)
+
+        # Write the content to the user stream
+        # Clear blob content since output has been written to user stream
+        if blob.content is not None:
+            stream.write(blob.content)
+            blob.content = None
+
+        # If the blob is small or single shot download was used, the download is
+        # complete at this point. If blob size is large, download the remaining
+        # ranges concurrently.
+        if blob.properties.content_length != download_size:
+            # Lock on the etag. This can be overriden by the user by specifying '*'
+            if_match = if_match if if_match is not None else blob.properties.etag
+
+            end_blob = _get_download_end(blob_size, end_range)
+
+            downloader = _AsyncBlobChunkDownloader(
+                self, container_name, blob_name, download_size, self.MAX_CHUNK_GET_SIZE,
+                first_get_size, initial_request_end + 1, end_blob, stream, progress_callback,
+                validate_content, lease_id, if_modified_since, if_unmodified_since, if_match,
+                if_none_match, timeout, operation_context)
+            await self._run_chunks(downloader.process_chunk, downloader.get_chunk_ranges(),
+                                   max_connections)
+            downloader.seek_stream_end()
+
+            _set_download_properties(blob, blob_size, start_range, download_size)
+
+        return blob
+
+    async def get_blob_to_bytes(
+        self, container_name, blob_name, snapshot=None,
+        start_range=None, end_range=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.get_blob_to_bytes`.
+
+        :return: A Blob with properties and metadata.
+        :rtype: :class:`~azure.storage.blob.models.Blob`
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+
+        stream = BytesIO()
+        blob = await self.get_blob_to_stream(
+            container_name, blob_name, stream, snapshot, start_range, end_range,
+            validate_content, progress_callback, max_connections, lease_id,
+            if_modified_since, if_unmodified_since, if_match, if_none_match, timeout)
+
+        blob.content = stream.getvalue()
+        return blob
+
+    async def get_blob_to_text(
+        self, container_name, blob_name, encoding='utf-8', snapshot=None,
+        start_range=None, end_range=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.get_blob_to_text`.
+
+        :return: A Blob with properties and metadata.
+        :rtype: :class:`~azure.storage.blob.models.Blob`
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('encoding', encoding)
+
+        blob = await self.get_blob_to_bytes(
+            container_name, blob_name, snapshot, start_range, end_range,
+            validate_content, progress_callback, max_connections, lease_id,
+            if_modified_since, if_unmodified_since, if_match, if_none_match, timeout)
+        blob.content = blob.content.decode(encoding)
+        return blob
+
+    async def acquire_blob_lease(self, container_name, blob_name,
+                                 lease_duration=-1,
+                                 proposed_lease_id=None,
+                                 if_modified_since=None,
+                                 if_unmodified_since=None,
+                                 if_match=None,
+                                 if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.acquire_blob_lease`.
+
+        :return: str
+        '''
+        _validate_not_none('lease_duration', lease_duration)
+        if lease_duration != -1 and\
+           (lease_duration < 15 or lease_duration > 60):
+            raise ValueError(_ERROR_INVALID_LEASE_DURATION)
+
+        lease = await self._lease_blob_impl(container_name, blob_name, _LeaseActions.Acquire,
+                                            None, lease_duration, None, proposed_lease_id,
+                                            if_modified_since, if_unmodified_since,
+                                            if_match, if_none_match, timeout)
+        return lease['id']
+
+    async def renew_blob_lease(self, container_name, blob_name,
+                               lease_id, if_modified_since=None,
+                               if_unmodified_since=None, if_match=None,
+                               if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.renew_blob_lease`.
+
+        :return: str
+        '''
+        _validate_not_none('lease_id', lease_id)
+
+        lease = await self._lease_blob_impl(container_name, blob_name, _LeaseActions.Renew,
+                                            lease_id, None, None, None,
+                                            if_modified_since, if_unmodified_since,
+                                            if_match, if_none_match, timeout)
+        return lease['id']
+
+    async def release_blob_lease(self, container_name, blob_name,
+                                 lease_id, if_modified_since=None,
+                                 if_unmodified_since=None, if_match=None,
+                                 if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.release_blob_lease`.
+        '''
+        _validate_not_none('lease_id', lease_id)
+
+        await self._lease_blob_impl(container_name, blob_name, _LeaseActions.Release,
+                                    lease_id, None, None, None,
+                                    if_modified_since, if_unmodified_since,
+                                    if_match, if_none_match, timeout)
+
+    async def break_blob_lease(self, container_name, blob_name,
+                               lease_break_period=None,
+                               if_modified_since=None,
+                               if_unmodified_since=None,
+                               if_match=None,
+                               if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.break_blob_lease`.
+
+        :return: int
+        '''
+        if (lease_break_period is not None) and (lease_break_period < 0 or lease_break_period > 60):
+            raise ValueError(_ERROR_INVALID_LEASE_BREAK_PERIOD)
+
+        lease = await self._lease_blob_impl(container_name, blob_name, _LeaseActions.Break,
+                                            None, None, lease_break_period, None,
+                                            if_modified_since, if_unmodified_since,
+                                            if_match, if_none_match, timeout)
+        return lease['time']
+
+    async def change_blob_lease(self, container_name, blob_name,
+                                lease_id,
+                                proposed_lease_id,
+                                if_modified_since=None,
+                                if_unmodified_since=None,
+                                if_match=None,
+                                if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.baseblobservice.BaseBlobService.change_blob_lease`.
+        '''
+        await self._lease_blob_impl(container_name, blob_name, _LeaseActions.Change,
+                                    lease_id, None, None, proposed_lease_id,
+                                    if_modified_since, if_unmodified_since,
+                                    if_match, if_none_match, timeout)
+
+    async def create_blob_from_path(
+        self, container_name, blob_name, file_path, content_settings=None,
+        metadata=None, validate_content=False, progress_callback=None,
+        max_connections=2, lease_id=None, if_modified_since=None,
+        if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.blockblobservice.BlockBlobService.create_blob_from_path`.
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('file_path', file_path)
+
+        count = path.getsize(file_path)
+        with open(file_path, 'rb') as stream:
+            await self.create_blob_from_stream(
+                container_name=container_name,
+                blob_name=blob_name,
+                stream=stream,
+                count=count,
+                content_settings=content_settings,
+                metadata=metadata,
+                validate_content=validate_content,
+                lease_id=lease_id,
+                progress_callback=progress_callback,
+                max_connections=max_connections,
+                if_modified_since=if_modified_since,
+                if_unmodified_since=if_unmodified_since,
+                if_match=if_match,
+                if_none_match=if_none_match,
+                timeout=timeout)
+
+    async def create_blob_from_stream(
+        self, container_name, blob_name, stream, count=None,
+        content_settings=None, metadata=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.blockblobservice.BlockBlobService.create_blob_from_stream`.
+        If the blob is uploaded in blocks, up to max_connections blocks are put
+        by concurrent tasks.
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('stream', stream)
+        _validate_encryption_required(self.require_encryption, self.key_encryption_key)
+
+        if self._is_single_put(count):
+            if progress_callback:
+                progress_callback(0, count)
+
+            data = stream.read(count)
+            await self._put_blob(
+                container_name=container_name,
+                blob_name=blob_name,
+                blob=data,
+                content_settings=content_settings,
+                metadata=metadata,
+                validate_content=validate_content,
+                lease_id=lease_id,
+                if_modified_since=if_modified_since,
+                if_unmodified_since=if_unmodified_since,
+                if_match=if_match,
+                if_none_match=if_none_match,
+                timeout=timeout)
+
+            if progress_callback:
+                progress_callback(count, count)
+        else:
+            cek, iv, encryption_data = None, None, None
+            if self.key_encryption_key:
+                cek, iv, encryption_data = _generate_blob_encryption_data(self.key_encryption_key)
+
+            uploader = _create_blob_chunk_uploader(
+                self, container_name, blob_name, count, self.MAX_BLOCK_SIZE, stream,
+                max_connections, progress_callback, validate_content, lease_id,
+                _AsyncBlockBlobChunkUploader, timeout=timeout,
+                content_encryption_key=cek, initialization_vector=iv)
+
+            if progress_callback is not None:
+                progress_callback(0, count)
+
+            block_ids = await self._run_chunks(uploader.process_chunk, uploader.get_chunk_streams(),
+                                               max_connections)
+
+            await self._put_block_list(
+                container_name=container_name,
+                blob_name=blob_name,
+                block_list=block_ids,
+                content_settings=content_settings,
+                metadata=metadata,
+                validate_content=validate_content,
+                lease_id=lease_id,
+                if_modified_since=if_modified_since,
+                if_unmodified_since=if_unmodified_since,
+                if_match=if_match,
+                if_none_match=if_none_match,
+                timeout=timeout,
+                encryption_data=encryption_data
+            )
+
+    async def create_blob_from_bytes(
+        self, container_name, blob_name, blob, index=0, count=None,
+        content_settings=None, metadata=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.blockblobservice.BlockBlobService.create_blob_from_bytes`.
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('blob', blob)
+        _validate_not_none('index', index)
+        _validate_type_bytes('blob', blob)
+
+        if index < 0:
+            raise IndexError(_ERROR_VALUE_NEGATIVE.format('index'))
+
+        if count is None or count < 0:
+            count = len(blob) - index
+
+        stream = BytesIO(blob)
+        stream.seek(index)
+
+        await self.create_blob_from_stream(
+            container_name=container_name,
+            blob_name=blob_name,
+            stream=stream,
+            count=count,
+            content_settings=content_settings,
+            metadata=metadata,
+            validate_content=validate_content,
+            progress_callback=progress_callback,
+            max_connections=max_connections,
+            lease_id=lease_id,
+            if_modified_since=if_modified_since,
+            if_unmodified_since=if_unmodified_since,
+            if_match=if_match,
+            if_none_match=if_none_match,
+            timeout=timeout)
+
+    async def create_blob_from_text(
+        self, container_name, blob_name, text, encoding='utf-8',
+        content_settings=None, metadata=None, validate_content=False,
+        progress_callback=None, max_connections=2, lease_id=None,
+        if_modified_since=None, if_unmodified_since=None, if_match=None,
+        if_none_match=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.blob.blockblobservice.BlockBlobService.create_blob_from_text`.
+        '''
+        _validate_not_none('container_name', container_name)
+        _validate_not_none('blob_name', blob_name)
+        _validate_not_none('text', text)
+
+        if not isinstance(text, bytes):
+            _validate_not_none('encoding', encoding)
+            text = text.encode(encoding)
+
+        await self.create_blob_from_bytes(
+            container_name=container_name,
+            blob_name=blob_name,
+            blob=text,
+            index=0,
+            count=len(text),
+            content_settings=content_settings,
+            metadata=metadata,
+            validate_content=validate_content,
+            lease_id=lease_id,
+            progress_callback=progress_callback,
+            max_connections=max_connections,
+            if_modified_since=if_modified_since,
+            if_unmodified_since=if_unmodified_since,
+            if_match=if_match,
+            if_none_match=if_none_match,
+            timeout=timeout)
+
+
+class _AsyncBlobChunkDownloader(_BlobChunkDownloader):
+    async def process_chunk(self, chunk_range):
+        chunk_start, chunk_end = chunk_range
+        started = time()
+        blob = await self.blob_service._get_blob(
+            self.container_name,
+            self.blob_name,
+            start_range=chunk_start,
+            end_range=chunk_end - 1,
+            validate_content=self.validate_content,
+            lease_id=self.lease_id,
+            if_modified_since=self.if_modified_since,
+            if_unmodified_since=self.if_unmodified_since,
+            if_match=self.if_match,
+            if_none_match=self.if_none_match,
+            timeout=self.timeout,
+            _context=self.operation_context
+        )
+
+        # This makes sure that if_match is set so that we can validate
+        # that subsequent downloads are to an unmodified blob
+        self.if_match = blob.properties.etag
+
+        length = chunk_end - chunk_start
+        if self.chunk_sizer is not None:
+            self.chunk_sizer.record(length, time() - started)
+        if length > 0:
+            # The seek and write do not yield to the loop so need no lock
+            self._write_to_stream(blob.content, chunk_start)
+            self._update_progress(chunk_start, chunk_end)
+
+
+class _AsyncBlockBlobChunkUploader(_BlockBlobChunkUploader):
+    # No buffer pool is set as waiting for a free buffer would block the event
+    # loop. _run_chunks bounds the chunks held in memory instead.
+
+    async def process_chunk(self, chunk_data):
+        chunk_offset, chunk_bytes, buffer = chunk_data
+
+        try:
+            block_id = url_quote(_encode_base64('{0:032d}'.format(chunk_offset)))
+            await self.blob_service._put_block(
+                self.container_name,
+                self.blob_name,
+                chunk_bytes,
+                block_id,
+                validate_content=self.validate_content,
+                lease_id=self.lease_id,
+                timeout=self.timeout,
+            )
+        finally:
+            self._release_buffer(buffer)
+
+        self._update_progress(len(chunk_bytes))
+        return BlobBlock(block_id)
@@ -27,6 +27,7 @@ from .._error import (
 from ._error import (
     _ERROR_INVALID_LEASE_DURATION,
     _ERROR_INVALID_LEASE_BREAK_PERIOD,
+    _ERROR_CHECKPOINT_APPEND,
 )
 from .._common_conversion import (
     _int_to_str,
@@ -42,7 +43,18 @@ from .._serialization import (
     _add_metadata_headers,
 )
 from .._http import HTTPRequest
-from ._download_chunking import _download_blob_chunks
+from .._timing import (
+    _cpu_timer,
+    _get_thread_timing,
+    _timed_transfer,
+)
+from ._download_chunking import (
+    _download_blob_chunks,
+    _get_first_range,
+    _get_download_size,
+    _get_download_end,
+    _set_download_properties,
+)
 from ..models import (
     Services,
     ListGenerator,
@@ -69,11 +81,11 @@ from .._constants import (
 )
 from .._deserialization import (
     _convert_xml_to_service_properties,
-    _get_download_size,
     _parse_metadata,
-    _parse_properties,
     _convert_xml_to_service_stats,
     _parse_length_from_content_range,
+    _can_overwrite,
+    _RangeStreamWriter,
 )
 from ._serialization import (
     _get_path,
@@ -85,6 +97,7 @@ from ._deserialization import (
     _convert_xml_to_blob_list,
     _parse_container,
     _parse_snapshot_blob,
+    _parse_copy_properties,
     _parse_lease,
     _convert_xml_to_signed_identifiers_and_access,
     _parse_base_properties,
@@ -93,6 +106,8 @@ from ..sharedaccesssignature import (
     SharedAccessSignature,
 )
 from ..storageclient import StorageClient
+from ._checkpoint import _TransferCheckpoint
+from os import path
 import sys
 if sys.version_info >= (3,):
     from io import BytesIO
@@ -121,6 +136,18 @@ class BaseBlobService(StorageClient):
         this. If this is set to larger than 4MB, content_validation will throw an 
         error if enabled. However, if content_validation is not desired a size 
         greater than 4MB may be optimal. Setting this below 4MB is not recommended.
+    :ivar bool ADAPTIVE_CHUNK_SIZE:
+        If set, the range gets performed by get_blob_to_* methods after the first 
+        start at MAX_CHUNK_GET_SIZE and are then sized to the time the previous 
+        ones took. Ranges finishing quickly double in size, up to 8 times 
+        MAX_CHUNK_GET_SIZE, or 4MB if validate_content is set. Slow ranges halve 
+        in size, down to an eighth of MAX_CHUNK_GET_SIZE, so less is retried on 
+        lossy links. Not used by get_blob_to_path with a checkpoint_path.
+    :ivar ~azure.storage.blob.models.HedgePolicy hedge_policy:
+        If set, the range gets performed by get_blob_to_* methods after the first 
+        are requested again when they take longer than most of the ranges before 
+        them, and written from whichever request completes first. Not used by 
+        the asyncio clients. Defaults to None.
     :ivar object key_encryption_key:
         The key-encryption-key optionally provided by the user. If provided, will be used to
         encrypt/decrypt in supported methods.
@@ -147,6 +174,7 @@ class BaseBlobService(StorageClient):
     __metaclass__ = ABCMeta
     MAX_SINGLE_GET_SIZE = 32 * 1024 * 1024
     MAX_CHUNK_GET_SIZE = 4 * 1024 * 1024
+    ADAPTIVE_CHUNK_SIZE = False
 
     def __init__(self, account_name=None, account_key=None, sas_token=None, 
                  is_emulated=False, protocol=DEFAULT_PROTOCOL, endpoint_suffix=SERVICE_HOST_BASE,
@@ -214,6 +242,7 @@ class BaseBlobService(StorageClient):
         self.require_encryption = False
         self.key_encryption_key = None
         self.key_resolver_function = None
+        self.hedge_policy = None
 
     def make_blob_url(self, container_name, blob_name, protocol=None, sas_token=None):
         '''
@@ -571,19 +600,7 @@ class BaseBlobService(StorageClient):
         :return: True if container is created, False if container already exists.
         :rtype: bool
         '''
-        _validate_not_none('container_name', container_name)
-        request = HTTPRequest()
-        request.method = 'PUT'
-        request.host_locations = self._get_host_locations()
-        request.path = _get_path(container_name)
-        request.query = {
-            'restype': 'container',
-            'timeout': _int_to_str(timeout),
-        }
-        request.headers = {
-            'x-ms-blob-public-access': _to_str(public_access)
-        }
-        _add_metadata_headers(metadata, request)
+        request = self._create_container_request(container_name, metadata, public_access, timeout)
 
         if not fail_on_exist:
             try:
@@ -818,6 +835,45 @@ class BaseBlobService(StorageClient):
         :return: True if container is deleted, False container doesn't exist.
         :rtype: bool
         '''
+        request = self._delete_container_request(container_name, lease_id, if_modified_since,
+                                                 if_unmodified_since, timeout)
+
+        if not fail_not_exist:
+            try:
+                self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_not_exist(ex)
+                return False
+        else:
+            self._perform_request(request)
+            return True
+
+    def _create_container_request(self, container_name, metadata=None, public_access=None,
+                                  timeout=None):
+        '''
+        Builds the request of create_container. Shared with the async client.
+        '''
+        _validate_not_none('container_name', container_name)
+        request = HTTPRequest()
+        request.method = 'PUT'
+        request.host_locations = self._get_host_locations()
+        request.path = _get_path(container_name)
+        request.query = {
+            'restype': 'container',
+            'timeout': _int_to_str(timeout),
+        }
+        request.headers = {
+            'x-ms-blob-public-access': _to_str(public_access)
+        }
+        _add_metadata_headers(metadata, request)
+        return request
+
+    def _delete_container_request(self, container_name, lease_id=None, if_modified_since=None,
+                                  if_unmodified_since=None, timeout=None):
+        '''
+        Builds the request of delete_container. Shared with the async client.
+        '''
         _validate_not_none('container_name', container_name)
         request = HTTPRequest()
         request.method = 'DELETE'
@@ -832,17 +888,7 @@ class BaseBlobService(StorageClient):
             'If-Modified-Since': _datetime_to_utc_string(if_modified_since),
             'If-Unmodified-Since': _datetime_to_utc_string(if_unmodified_since),          
         }
-
-        if not fail_not_exist:
-            try:
-                self._perform_request(request)
-                return True
-            except AzureHttpError as ex:
-                _dont_fail_not_exist(ex)
-                return False
-        else:
-            self._perform_request(request)
-            return True
+        return request
 
     def _lease_container_impl(
         self, container_name, lease_action, lease_id, lease_duration,
@@ -1349,7 +1395,7 @@ class BaseBlobService(StorageClient):
         request.body = _get_request_body(
             _convert_service_properties_to_xml(logging, hour_metrics, minute_metrics, cors, target_version))
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def get_blob_service_properties(self, timeout=None):
         '''
@@ -1535,7 +1581,7 @@ class BaseBlobService(StorageClient):
         self, container_name, blob_name, snapshot=None, start_range=None,
         end_range=None, validate_content=False, lease_id=None, if_modified_since=None,
         if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None, 
-        _context=None):
+        _context=None, _stream_writer=None):
         '''
         Downloads a blob's content, metadata, and properties. You can also
         call this API to read a snapshot. You can specify a range if you don't
@@ -1602,6 +1648,10 @@ class BaseBlobService(StorageClient):
 
         start_offset, end_offset = 0,0
         if self.key_encryption_key is not None or self.key_resolver_function is not None:
+            # Decryption needs the whole range in memory, so the content is 
+            # returned on the blob rather than streamed to the writer.
+            _stream_writer = None
+
             if start_range is not None:
                 # Align the start of the range along a 16 byte block
                 start_offset = start_range % 16
@@ -1645,8 +1695,9 @@ class BaseBlobService(StorageClient):
         return self._perform_request(request, _parse_blob, 
                                      [blob_name, snapshot, validate_content, self.require_encryption,
                                       self.key_encryption_key, self.key_resolver_function,
-                                      start_offset, end_offset],
-                                     operation_context=_context)
+                                      start_offset, end_offset, _stream_writer],
+                                     operation_context=_context,
+                                     stream=_stream_writer is not None)
 
     def get_blob_to_path(
         self, container_name, blob_name, file_path, open_mode='wb',
@@ -1654,7 +1705,7 @@ class BaseBlobService(StorageClient):
         validate_content=False, progress_callback=None,
         max_connections=2, lease_id=None, if_modified_since=None, 
         if_unmodified_since=None, if_match=None, if_none_match=None, 
-        timeout=None):
+        timeout=None, checkpoint_path=None):
         '''
         Downloads a blob to a file path, with automatic chunking and progress
         notifications. Returns an instance of :class:`Blob` with 
@@ -1738,6 +1789,12 @@ class BaseBlobService(StorageClient):
             The timeout parameter is expressed in seconds. This method may make 
             multiple calls to the Azure service and the timeout will apply to 
             each call individually.
+        :param str checkpoint_path:
+            Path of a file recording the ranges downloaded so far. If the download 
+            fails, calling again with the same checkpoint_path resumes it, keeping 
+            the ranges already written to file_path if the blob has not changed. 
+            The checkpoint file is removed once the download completes. Cannot be 
+            used with an append open_mode.
         :return: A Blob with properties and metadata. If max_connections is greater 
             than 1, the content_md5 (if set on the blob) will not be returned. If you 
             require this value, either use get_blob_properties or set max_connections 
@@ -1752,32 +1809,55 @@ class BaseBlobService(StorageClient):
         if max_connections > 1 and 'a' in open_mode:
             raise ValueError(_ERROR_PARALLEL_NOT_SEEKABLE)
 
-        with open(file_path, open_mode) as stream:
-            blob = self.get_blob_to_stream(
-                container_name,
-                blob_name,
-                stream,
-                snapshot,
-                start_range,
-                end_range,
-                validate_content,
-                progress_callback,
-                max_connections,
-                lease_id,
-                if_modified_since,
-                if_unmodified_since,
-                if_match,
-                if_none_match,
-                timeout)
+        checkpoint = None
+        if checkpoint_path is not None:
+            if 'a' in open_mode:
+                raise ValueError(_ERROR_CHECKPOINT_APPEND)
+
+            # Open the file an earlier attempt wrote to without truncating it
+            checkpoint = _TransferCheckpoint(checkpoint_path)
+            if checkpoint.done and path.isfile(file_path):
+                open_mode = 'r+b'
+
+        try:
+            with open(file_path, open_mode) as stream:
+                blob = self.get_blob_to_stream(
+                    container_name,
+                    blob_name,
+                    stream,
+                    snapshot,
+                    start_range,
+                    end_range,
+                    validate_content,
+                    progress_callback,
+                    max_connections,
+                    lease_id,
+                    if_modified_since,
+                    if_unmodified_since,
+                    if_match,
+                    if_none_match,
+                    timeout,
+                    _checkpoint=checkpoint)
+
+                # Drop anything past the blob left by an earlier attempt
+                if checkpoint is not None:
+                    stream.truncate()
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        if checkpoint is not None:
+            checkpoint.remove()
 
         return blob
 
+    @_timed_transfer
     def get_blob_to_stream(
         self, container_name, blob_name, stream, snapshot=None,
         start_range=None, end_range=None, validate_content=False,
         progress_callback=None, max_connections=2, lease_id=None, 
         if_modified_since=None, if_unmodified_since=None, if_match=None, 
-        if_none_match=None, timeout=None):
+        if_none_match=None, timeout=None, _checkpoint=None):
 
         '''
         Downloads a blob to a stream, with automatic chunking and progress
@@ -1870,6 +1950,10 @@ class BaseBlobService(StorageClient):
 
         # If the user explicitly sets max_connections to 1, do a single shot download
         if max_connections == 1:
+            # Stream the body straight into the user stream if it can be 
+            # overwritten, as a retry must be able to rewrite what a failed 
+            # attempt wrote. Otherwise the content is buffered and written out below.
+            stream_writer = _RangeStreamWriter(stream, stream.tell()) if _can_overwrite(stream) else None
             blob = self._get_blob(container_name,
                                   blob_name,
                                   snapshot,
@@ -1881,7 +1965,8 @@ class BaseBlobService(StorageClient):
                                   if_unmodified_since=if_unmodified_since,
                                   if_match=if_match,
                                   if_none_match=if_none_match,
-                                  timeout=timeout)
+                                  timeout=timeout,
+                                  _stream_writer=stream_writer)
 
             # Set the download size
             download_size = blob.properties.content_length
@@ -1897,15 +1982,12 @@ class BaseBlobService(StorageClient):
             # chunk so a transactional MD5 can be retrieved.
             first_get_size = self.MAX_SINGLE_GET_SIZE if not validate_content else self.MAX_CHUNK_GET_SIZE
 
-            initial_request_start = start_range if start_range else 0
-
-            if end_range and end_range - start_range < first_get_size:
-                initial_request_end = end_range
-            else:
-                initial_request_end = initial_request_start + first_get_size - 1
+            initial_request_start, initial_request_end = _get_first_range(
+                start_range, end_range, first_get_size)
 
             # Send a context object to make sure we always retry to the initial location
             operation_context = _OperationContext(location_lock=True)
+            stream_writer = _RangeStreamWriter(stream, stream.tell()) if _can_overwrite(stream) else None
             try:
                 blob = self._get_blob(container_name,
                                       blob_name,
@@ -1919,18 +2001,13 @@ class BaseBlobService(StorageClient):
                                       if_match=if_match,
                                       if_none_match=if_none_match,
                                       timeout=timeout,
-                                      _context=operation_context)
+                                      _context=operation_context,
+                                      _stream_writer=stream_writer)
 
                 # Parse the total blob size and adjust the download size if ranges 
                 # were specified
                 blob_size = _parse_length_from_content_range(blob.properties.content_range)
-                if end_range:
-                    # Use the end_range unless it is over the end of the blob
-                    download_size = min(blob_size, end_range - start_range + 1)
-                elif start_range:
-                    download_size = blob_size - start_range
-                else:
-                    download_size = blob_size
+                download_size = _get_download_size(blob_size, start_range, end_range)
             except AzureHttpError as ex:
                 if not start_range and ex.status_code == 416:
                     # Get range will fail on an empty blob. If the user did not 
@@ -1946,7 +2023,8 @@ class BaseBlobService(StorageClient):
                                           if_match=if_match,
                                           if_none_match=if_none_match,
                                           timeout=timeout,
-                                          _context=operation_context)
+                                          _context=operation_context,
+                                          _stream_writer=stream_writer)
 
                     # Set the download size to empty
                     download_size = 0
@@ -1958,10 +2036,11 @@ class BaseBlobService(StorageClient):
         if progress_callback:
             progress_callback(blob.properties.content_length, download_size)
 
-        # Write the content to the user stream  
-        # Clear blob content since output has been written to user stream   
+        # Write the content to the user stream if it was not streamed there 
+        # directly. Clear blob content since output has been written to user stream   
         if blob.content is not None:
-            stream.write(blob.content)
+            with _cpu_timer(_get_thread_timing(), 'write'):
+                stream.write(blob.content)
             blob.content = None
 
         # If the blob is small or single shot download was used, the download is 
@@ -1970,11 +2049,21 @@ class BaseBlobService(StorageClient):
             # Lock on the etag. This can be overriden by the user by specifying '*'
             if_match = if_match if if_match is not None else blob.properties.etag    
             
-            end_blob = blob_size
-            if end_range:
-                # Use the end_range unless it is over the end of the blob
-                end_blob = min(blob_size, end_range + 1)
-               
+            end_blob = _get_download_end(blob_size, end_range)
+
+            # Ranges recorded by an earlier attempt are only kept if they were 
+            # downloaded from the same version of the blob in the same chunks
+            if _checkpoint is not None:
+                _checkpoint.begin({
+                    'container_name': container_name,
+                    'blob_name': blob_name,
+                    'snapshot': snapshot,
+                    'etag': blob.properties.etag,
+                    'start': initial_request_end + 1,
+                    'end': end_blob,
+                    'chunk_size': self.MAX_CHUNK_GET_SIZE,
+                })
+
             _download_blob_chunks(
                 self,
                 container_name,
@@ -1994,20 +2083,11 @@ class BaseBlobService(StorageClient):
                 if_match,
                 if_none_match,
                 timeout,
-                operation_context
+                operation_context,
+                _checkpoint,
             )
 
-            # Set the content length to the download size instead of the size of 
-            # the last range
-            blob.properties.content_length = download_size
-
-            # Overwrite the content range to the user requested range
-            blob.properties.content_range = 'bytes {0}-{1}/{2}'.format(start_range, end_range, blob_size)
-
-            # Overwrite the content MD5 as it is the MD5 for the last range instead 
-            # of the stored MD5
-            # TODO: Set to the stored MD5 when the service returns this
-            blob.properties.content_md5 = None
+            _set_download_properties(blob, blob_size, start_range, download_size)
 
         return blob
         
@@ -3008,7 +3088,7 @@ class BaseBlobService(StorageClient):
         }
         _add_metadata_headers(metadata, request)
 
-        return self._perform_request(request, _parse_properties, [BlobProperties]).copy
+        return self._perform_request(request, _parse_copy_properties)
 
     def abort_copy_blob(self, container_name, blob_name, copy_id,
                         lease_id=None, timeout=None):
@@ -3045,7 +3125,7 @@ class BaseBlobService(StorageClient):
             'x-ms-copy-action': 'abort',
         }
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def delete_blob(self, container_name, blob_name, snapshot=None,
                     lease_id=None, delete_snapshots=None,
@@ -3115,4 +3195,4 @@ class BaseBlobService(StorageClient):
             'timeout': _int_to_str(timeout)
         }
 
-        self._perform_request(request)
+        return self._perform_request(request)
@@ -19,6 +19,9 @@ from .._error import (
     _validate_encryption_unsupported,
     _ERROR_VALUE_NEGATIVE,
 )
+from ._error import (
+    _ERROR_CHECKPOINT_ENCRYPTION,
+)
 from .._common_conversion import (
     _encode_base64,
     _to_str,
@@ -32,10 +35,13 @@ from .._serialization import (
     _add_metadata_headers,
 )
 from .._http import HTTPRequest
+from .._timing import _timed_transfer
 from ._upload_chunking import (
     _BlockBlobChunkUploader,
+    _get_uncommitted_block_offsets,
     _upload_blob_chunks,
 )
+from ._checkpoint import _TransferCheckpoint
 from .models import (
     _BlobTypes,
 )
@@ -165,7 +171,7 @@ class BlockBlobService(BaseBlobService):
         '''
         _validate_encryption_unsupported(self.require_encryption, self.key_encryption_key)
 
-        self._put_block(
+        return self._put_block(
             container_name,
             blob_name,
             block,
@@ -310,7 +316,8 @@ class BlockBlobService(BaseBlobService):
         self, container_name, blob_name, file_path, content_settings=None,
         metadata=None, validate_content=False, progress_callback=None,
         max_connections=2, lease_id=None, if_modified_since=None, 
-        if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None):
+        if_unmodified_since=None, if_match=None, if_none_match=None, timeout=None,
+        checkpoint_path=None):
         '''
         Creates a new blob from a file path, or updates the content of an
         existing blob, with automatic chunking and progress notifications.
@@ -368,36 +375,74 @@ class BlockBlobService(BaseBlobService):
             The timeout parameter is expressed in seconds. This method may make 
             multiple calls to the Azure service and the timeout will apply to 
             each call individually.
+        :param str checkpoint_path:
+            Path of a file recording the blocks uploaded so far. If the upload 
+            fails, calling again with the same checkpoint_path resumes it, skipping 
+            the blocks the service still holds uncommitted if the file has not 
+            changed. The checkpoint file is removed once the upload completes. 
+            Cannot be used with client-side encryption.
         '''
         _validate_not_none('container_name', container_name)
         _validate_not_none('blob_name', blob_name)
         _validate_not_none('file_path', file_path)
 
         count = path.getsize(file_path)
-        with open(file_path, 'rb') as stream:
-            self.create_blob_from_stream(
-                container_name=container_name,
-                blob_name=blob_name,
-                stream=stream,
-                count=count,
-                content_settings=content_settings,
-                metadata=metadata,
-                validate_content=validate_content,
-                lease_id=lease_id,
-                progress_callback=progress_callback,
-                max_connections=max_connections,
-                if_modified_since=if_modified_since,
-                if_unmodified_since=if_unmodified_since,
-                if_match=if_match,
-                if_none_match=if_none_match,
-                timeout=timeout)
 
+        # A blob uploaded in a single put has nothing to resume
+        checkpoint = None
+        if checkpoint_path is not None and not self._is_single_put(count):
+            if self.key_encryption_key is not None:
+                raise ValueError(_ERROR_CHECKPOINT_ENCRYPTION)
+
+            checkpoint = _TransferCheckpoint(checkpoint_path)
+            resumed = checkpoint.begin({
+                'container_name': container_name,
+                'blob_name': blob_name,
+                'size': count,
+                'modified': path.getmtime(file_path),
+                'block_size': self.MAX_BLOCK_SIZE,
+            })
+
+            # Blocks recorded by an earlier attempt are only skipped if the 
+            # service still holds them
+            if resumed:
+                checkpoint.retain(_get_uncommitted_block_offsets(
+                    self, container_name, blob_name, count, self.MAX_BLOCK_SIZE,
+                    lease_id, timeout))
+
+        try:
+            with open(file_path, 'rb') as stream:
+                self.create_blob_from_stream(
+                    container_name=container_name,
+                    blob_name=blob_name,
+                    stream=stream,
+                    count=count,
+                    content_settings=content_settings,
+                    metadata=metadata,
+                    validate_content=validate_content,
+                    lease_id=lease_id,
+                    progress_callback=progress_callback,
+                    max_connections=max_connections,
+                    if_modified_since=if_modified_since,
+                    if_unmodified_since=if_unmodified_since,
+                    if_match=if_match,
+                    if_none_match=if_none_match,
+                    timeout=timeout,
+                    _checkpoint=checkpoint)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+
+        if checkpoint is not None:
+            checkpoint.remove()
+
+    @_timed_transfer
     def create_blob_from_stream(
         self, container_name, blob_name, stream, count=None,
         content_settings=None, metadata=None, validate_content=False, 
         progress_callback=None, max_connections=2, lease_id=None, 
         if_modified_since=None, if_unmodified_since=None, if_match=None, 
-        if_none_match=None, timeout=None):
+        if_none_match=None, timeout=None, _checkpoint=None):
         '''
         Creates a new blob from a file/stream, or updates the content of
         an existing blob, with automatic chunking and progress
@@ -431,7 +476,8 @@ class BlockBlobService(BaseBlobService):
         :type progress_callback: callback function in format of func(current, total)
         :param int max_connections:
             Maximum number of parallel connections to use when the blob size exceeds 
-            64MB. Note that parallel upload requires the stream to be seekable.
+            64MB. Streams which are not seekable are read in order, ahead of the
+            uploads in flight.
         :param str lease_id:
             Required if the blob has an active lease.
         :param datetime if_modified_since:
@@ -465,12 +511,7 @@ class BlockBlobService(BaseBlobService):
         _validate_not_none('stream', stream)
         _validate_encryption_required(self.require_encryption, self.key_encryption_key)
 
-        # Adjust count to include padding if we are expected to encrypt.
-        adjusted_count = count
-        if (self.key_encryption_key is not None) and (adjusted_count is not None):
-            adjusted_count += (16 - (count % 16))
-
-        if adjusted_count and adjusted_count < self.MAX_SINGLE_PUT_SIZE:
+        if self._is_single_put(count):
             if progress_callback:
                 progress_callback(0, count)
 
@@ -510,7 +551,8 @@ class BlockBlobService(BaseBlobService):
                 uploader_class=_BlockBlobChunkUploader,
                 timeout=timeout,
                 content_encryption_key=cek, 
-                initialization_vector=iv
+                initialization_vector=iv,
+                checkpoint=_checkpoint
             )
 
             self._put_block_list(
@@ -724,6 +766,18 @@ class BlockBlobService(BaseBlobService):
             timeout=timeout)
 
     #-----Helper methods------------------------------------
+    def _is_single_put(self, count):
+        '''
+        Returns whether count bytes of a stream are uploaded with a single put 
+        rather than in blocks.
+        '''
+        # Adjust count to include padding if we are expected to encrypt.
+        adjusted_count = count
+        if (self.key_encryption_key is not None) and (adjusted_count is not None):
+            adjusted_count += (16 - (count % 16))
+
+        return bool(adjusted_count) and adjusted_count < self.MAX_SINGLE_PUT_SIZE
+
     def _put_blob(self, container_name, blob_name, blob, content_settings=None,
                   metadata=None, validate_content=False, lease_id=None, if_modified_since=None,
                   if_unmodified_since=None, if_match=None,  if_none_match=None, 
@@ -845,7 +899,7 @@ class BlockBlobService(BaseBlobService):
             computed_md5 = _get_content_md5(request.body)
             request.headers['Content-MD5'] = _to_str(computed_md5)
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def _put_block_list(
         self, container_name, blob_name, block_list, content_settings=None, 
@@ -379,6 +379,67 @@ class PageBlobProperties(ResourceProperties):
         self.sequence_number = None
 
 
+class HedgePolicy(object):
+
+    '''
+    Hedges the range gets of chunked downloads made by get_blob_to_* methods. 
+    A range which has not completed once a percentile of the time taken by the 
+    ranges before it has passed is requested again, and the range is written 
+    from whichever request completes first. This keeps a single slow request 
+    from holding up the whole download. The request which completes last is 
+    left to finish in the background and its response discarded.
+
+    As either request may complete first, hedged downloads buffer each range 
+    in memory rather than stream it to the destination.
+
+    :ivar int percentile:
+        The percentile of the time per byte of the completed ranges after which 
+        a range is requested again.
+    :ivar int min_samples:
+        The number of ranges which must complete before any is hedged.
+    :ivar float min_delay:
+        The least time, in seconds, a range is given before being hedged.
+    :ivar str location_mode:
+        The location the duplicate requests are sent to, a 
+        :class:`~azure.storage.models.LocationMode`. Sending them to the 
+        secondary requires read-access geo-redundant replication and fails, 
+        leaving the first request to complete, if the secondary does not yet 
+        have the version of the blob being downloaded. If None, duplicates are 
+        sent to the location the download is made from.
+    :ivar function(~azure.storage.blob.models.HedgeStats) callback:
+        Called with the statistics of each chunked download once it completes 
+        or fails.
+    '''
+
+    def __init__(self, percentile=95, min_samples=4, min_delay=0.5, location_mode=None,
+                 callback=None):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.location_mode = location_mode
+        self.callback = callback
+
+
+class HedgeStats(object):
+
+    '''
+    The hedging of the range gets of a chunked download.
+
+    :ivar int ranges:
+        The number of ranges downloaded, not including the first.
+    :ivar int hedged:
+        The number of ranges which were requested again.
+    :ivar int hedges_won:
+        The number of hedged ranges written from the second request, as it 
+        completed before the first.
+    '''
+
+    def __init__(self):
+        self.ranges = 0
+        self.hedged = 0
+        self.hedges_won = 0
+
+
 class PublicAccess(object):
     '''
     Specifies whether data in the container may be accessed publicly and the level of access.
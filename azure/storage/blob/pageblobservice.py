@@ -30,6 +30,7 @@ from .._serialization import (
     _add_metadata_headers,
 )
 from .._http import HTTPRequest
+from .._timing import _timed_transfer
 from ._error import (
     _ERROR_PAGE_BLOB_SIZE_ALIGNMENT,
 )
@@ -788,6 +789,7 @@ class PageBlobService(BaseBlobService):
                 timeout=timeout)
 
 
+    @_timed_transfer
     def create_blob_from_stream(
         self, container_name, blob_name, stream, count, content_settings=None,
         metadata=None, validate_content=False, progress_callback=None,
@@ -824,8 +826,8 @@ class PageBlobService(BaseBlobService):
             size of the blob, or None if the total size is unknown.
         :type progress_callback: callback function in format of func(current, total)
         :param int max_connections:
-            Maximum number of parallel connections to use. Note that parallel upload 
-            requires the stream to be seekable.
+            Maximum number of parallel connections to use. Streams which are not
+            seekable are read in order, ahead of the uploads in flight.
         :param str lease_id:
             Required if the blob has an active lease.
         :param datetime if_modified_since:
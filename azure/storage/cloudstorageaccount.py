@@ -32,7 +32,8 @@ class CloudStorageAccount(object):
     """
     Provides a factory for creating the blob, queue, table, and file services
     with a common account name and account key or sas token.  Users can either 
-    use the factory or can construct the appropriate service directly.
+    use the factory or can construct the appropriate service directly. The 
+    services created share one pool of http connections.
     """
 
     def __init__(self, account_name=None, account_key=None, sas_token=None, is_emulated=None):
@@ -55,6 +56,14 @@ class CloudStorageAccount(object):
         self.account_key = account_key
         self.sas_token = sas_token
         self.is_emulated = is_emulated
+        self._request_session = None
+
+    def _get_request_session(self):
+        if self._request_session is None:
+            from ._constants import MAX_TRANSFER_CONNECTIONS
+            from ._http.connectionpool import _PooledSession
+            self._request_session = _PooledSession(MAX_TRANSFER_CONNECTIONS)
+        return self._request_session
 
     def create_block_blob_service(self):
         '''
@@ -67,7 +76,8 @@ class CloudStorageAccount(object):
         from .blob.blockblobservice import BlockBlobService
         return BlockBlobService(self.account_name, self.account_key, 
                                 sas_token=self.sas_token,
-                                is_emulated=self.is_emulated)
+                                is_emulated=self.is_emulated,
+                                request_session=self._get_request_session())
 
     def create_page_blob_service(self):
         '''
@@ -80,7 +90,8 @@ class CloudStorageAccount(object):
         from .blob.pageblobservice import PageBlobService
         return PageBlobService(self.account_name, self.account_key,
                                sas_token=self.sas_token,
-                               is_emulated=self.is_emulated)
+                               is_emulated=self.is_emulated,
+                               request_session=self._get_request_session())
 
     def create_append_blob_service(self):
         '''
@@ -93,7 +104,8 @@ class CloudStorageAccount(object):
         from .blob.appendblobservice import AppendBlobService
         return AppendBlobService(self.account_name, self.account_key,
                                  sas_token=self.sas_token,
-                                 is_emulated=self.is_emulated)
+                                 is_emulated=self.is_emulated,
+                                 request_session=self._get_request_session())
 
     def create_table_service(self):
         '''
@@ -106,7 +118,8 @@ class CloudStorageAccount(object):
         from .table.tableservice import TableService
         return TableService(self.account_name, self.account_key,
                             sas_token=self.sas_token,
-                            is_emulated=self.is_emulated)
+                            is_emulated=self.is_emulated,
+                            request_session=self._get_request_session())
 
     def create_queue_service(self):
         '''
@@ -119,7 +132,8 @@ class CloudStorageAccount(object):
         from .queue.queueservice import QueueService
         return QueueService(self.account_name, self.account_key,
                             sas_token=self.sas_token,
-                            is_emulated=self.is_emulated)
+                            is_emulated=self.is_emulated,
+                            request_session=self._get_request_session())
 
     def create_file_service(self):
         '''
@@ -131,7 +145,8 @@ class CloudStorageAccount(object):
         '''
         from .file.fileservice import FileService
         return FileService(self.account_name, self.account_key,
-                           sas_token=self.sas_token)
+                           sas_token=self.sas_token,
+                           request_session=self._get_request_session())
 
     def generate_shared_access_signature(self, services, resource_types, 
                                          permission, expiry, start=None, 
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from dateutil import parser
 try:
     from xml.etree import cElementTree as ETree
 except ImportError:
@@ -32,9 +31,13 @@ from ..models import (
 from .._deserialization import (
     _parse_properties,
     _parse_metadata,
+    _write_response_body,
 )
 from .._error import _validate_content_match
-from .._common_conversion import _get_content_md5
+from .._common_conversion import (
+    _get_content_md5,
+    _parse_date,
+)
 
 def _parse_share(response, name):
     if response is None:
@@ -52,13 +55,21 @@ def _parse_directory(response, name):
     props = _parse_properties(response, DirectoryProperties)
     return Directory(name, props, metadata)
 
-def _parse_file(response, name, validate_content=False):
+def _parse_file(response, name, validate_content=False, stream_writer=None):
     if response is None:
         return None
 
     metadata = _parse_metadata(response)
     props = _parse_properties(response, FileProperties)
 
+    if stream_writer is not None:
+        # The body is streamed straight into the user stream so the file is 
+        # returned without content.
+        computed_md5 = _write_response_body(response, stream_writer, validate_content)
+        if validate_content:
+            _validate_content_match(props.content_settings.content_md5, computed_md5)
+        return File(name, None, props, metadata)
+
     if validate_content:
         computed_md5 = _get_content_md5(response.body)
         _validate_content_match(props.content_settings.content_md5, computed_md5)
@@ -114,7 +125,7 @@ def _convert_xml_to_shares(response):
 
         # Properties
         properties_element = share_element.find('Properties')
-        share.properties.last_modified = parser.parse(properties_element.findtext('Last-Modified'))
+        share.properties.last_modified = _parse_date(properties_element.findtext('Last-Modified'))
         share.properties.etag = properties_element.findtext('Etag')
         share.properties.quota = int(properties_element.findtext('Quota'))
         
@@ -14,8 +14,17 @@
 #--------------------------------------------------------------------------
 import threading
 
-from time import sleep
+from time import (
+    sleep,
+    time,
+)
 from .._error import _ERROR_NO_SINGLE_THREAD_CHUNKING
+from .._deserialization import (
+    _RangeStreamWriter,
+    _can_overwrite,
+)
+from .._timing import _timed_cpu
+from .._transfer import _get_chunk_sizer
 
 def _download_file_chunks(file_service, share_name, directory_name, file_name,
                           download_size, block_size, progress, start_range, end_range, 
@@ -41,9 +50,8 @@ def _download_file_chunks(file_service, share_name, directory_name, file_name,
         operation_context,
     )
 
-    import concurrent.futures
-    executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-    result = list(executor.map(downloader.process_chunk, downloader.get_chunk_offsets()))
+    file_service._transfer_executor.map(downloader.process_chunk, downloader.get_chunk_ranges(),
+                                        max_connections)
 
 class _FileChunkDownloader(object):
     def __init__(self, file_service, share_name, directory_name, file_name, 
@@ -68,23 +76,31 @@ class _FileChunkDownloader(object):
         self.validate_content = validate_content
         self.timeout = timeout
         self.operation_context = operation_context
+        self.chunk_sizer = None
+        if file_service.ADAPTIVE_CHUNK_SIZE:
+            self.chunk_sizer = _get_chunk_sizer(chunk_size, validate_content)
 
-    def get_chunk_offsets(self):
+    def get_chunk_ranges(self):
         index = self.start_index
         while index < self.file_end:
-            yield index
-            index += self.chunk_size
-
-    def process_chunk(self, chunk_start):
-        if chunk_start + self.chunk_size > self.file_end:
-            chunk_end = self.file_end
-        else:
-            chunk_end = chunk_start + self.chunk_size
+            # The size is picked as each chunk is submitted, so it follows the 
+            # chunks completed so far
+            chunk_size = self.chunk_sizer.size if self.chunk_sizer else self.chunk_size
+            chunk_end = min(index + chunk_size, self.file_end)
+            yield index, chunk_end
+            index = chunk_end
 
+    def process_chunk(self, chunk_range):
+        chunk_start, chunk_end = chunk_range
+        started = time()
         chunk_data = self._download_chunk(chunk_start, chunk_end).content
         length = chunk_end - chunk_start
+        if self.chunk_sizer is not None:
+            self.chunk_sizer.record(length, time() - started)
         if length > 0:
-            self._write_to_stream(chunk_data, chunk_start)
+            # The content is None if the range was streamed into the stream
+            if chunk_data is not None:
+                self._write_to_stream(chunk_data, chunk_start)
             self._update_progress(length)
 
     def _update_progress(self, length):
@@ -94,11 +110,21 @@ class _FileChunkDownloader(object):
                 total = self.progress_total
                 self.progress_callback(total, self.download_size)
 
+    @_timed_cpu('write')
     def _write_to_stream(self, chunk_data, chunk_start):
         with self.stream_lock:
             self.stream.seek(self.stream_start + (chunk_start - self.start_index))
             self.stream.write(chunk_data)
 
+    def _get_stream_writer(self, chunk_start):
+        # Ranges are buffered and written with _write_to_stream otherwise
+        if not _can_overwrite(self.stream):
+            return None
+
+        return _RangeStreamWriter(self.stream,
+                                  self.stream_start + (chunk_start - self.start_index),
+                                  self.stream_lock)
+
     def _download_chunk(self, chunk_start, chunk_end):
         return self.file_service._get_file(
             self.share_name,
@@ -108,5 +134,6 @@ class _FileChunkDownloader(object):
             end_range=chunk_end - 1,
             validate_content=self.validate_content,
             timeout=self.timeout,
-            _context=self.operation_context
+            _context=self.operation_context,
+            _stream_writer=self._get_stream_writer(chunk_start)
         )
\ No newline at end of file
@@ -15,6 +15,8 @@
 import threading
 
 from time import sleep
+from .._deserialization import _is_seekable
+from .._transfer import _ReadAhead
 
 def _upload_file_chunks(file_service, share_name, directory_name, file_name,
                         file_size, block_size, stream, max_connections,
@@ -36,10 +38,20 @@ def _upload_file_chunks(file_service, share_name, directory_name, file_name,
     if progress_callback is not None:
         progress_callback(0, file_size)
 
-    if max_connections > 1:
-        import concurrent.futures
-        executor = concurrent.futures.ThreadPoolExecutor(max_connections)
-        range_ids = list(executor.map(uploader.process_chunk, uploader.get_chunk_offsets()))
+    if max_connections > 1 and uploader.stream_start is not None:
+        range_ids = file_service._transfer_executor.map(uploader.process_chunk,
+                                                        uploader.get_chunk_offsets(),
+                                                        max_connections)
+    elif max_connections > 1:
+        # The stream can't be read by offset, so it is read in order on a
+        # separate thread, up to max_connections chunks ahead of the ones in flight
+        chunks = _ReadAhead(uploader.get_chunk_streams(), max_connections)
+        try:
+            range_ids = file_service._transfer_executor.map(uploader.process_chunk_data,
+                                                            chunks,
+                                                            max_connections)
+        finally:
+            chunks.close()
     else:
         if file_size is not None:
             range_ids = [uploader.process_chunk(start) for start in uploader.get_chunk_offsets()]
@@ -59,7 +71,7 @@ class _FileChunkUploader(object):
         self.file_size = file_size
         self.chunk_size = chunk_size
         self.stream = stream
-        self.stream_start = stream.tell() if parallel else None
+        self.stream_start = stream.tell() if parallel and _is_seekable(stream) else None
         self.stream_lock = threading.Lock() if parallel else None
         self.progress_callback = progress_callback
         self.progress_total = 0
@@ -83,6 +95,34 @@ class _FileChunkUploader(object):
                 yield index
                 index += self.chunk_size
 
+    def get_chunk_streams(self):
+        index = 0
+        while index < self.file_size:
+            pieces = []
+            length = 0
+            size = min(self.chunk_size, self.file_size - index)
+
+            # Buffer until we either reach the end of the stream or get a whole chunk.
+            while length < size:
+                data = self.stream.read(size - length)
+                if not data:
+                    break
+                pieces.append(data)
+                length += len(data)
+
+            if length == 0:
+                break
+
+            yield index, b''.join(pieces)
+
+            if length < size:
+                break
+
+            index += length
+
+    def process_chunk_data(self, chunk_data):
+        return self._upload_chunk_with_progress(chunk_data[0], chunk_data[1])
+
     def process_chunk(self, chunk_offset):
         size = self.chunk_size
         if self.file_size is not None:
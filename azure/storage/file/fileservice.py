@@ -43,6 +43,8 @@ from .._deserialization import (
     _parse_metadata,
     _parse_properties,
     _parse_length_from_content_range,
+    _can_overwrite,
+    _RangeStreamWriter,
 )
 from ..models import (
     Services,
@@ -54,6 +56,11 @@ from .models import (
     FileProperties,
 )
 from .._http import HTTPRequest
+from .._timing import (
+    _cpu_timer,
+    _get_thread_timing,
+    _timed_transfer,
+)
 from ._upload_chunking import _upload_file_chunks
 from ._download_chunking import _download_file_chunks
 from .._auth import (
@@ -113,6 +120,13 @@ class FileService(StorageClient):
         this. If this is set to larger than 4MB, content_validation will throw an 
         error if enabled. However, if content_validation is not desired a size 
         greater than 4MB may be optimal. Setting this below 4MB is not recommended.
+    :ivar bool ADAPTIVE_CHUNK_SIZE:
+        If set, the range gets performed by get_file_to_* methods after the first 
+        start at MAX_CHUNK_GET_SIZE and are then sized to the time the previous 
+        ones took. Ranges finishing quickly double in size, up to 8 times 
+        MAX_CHUNK_GET_SIZE, or 4MB if validate_content is set. Slow ranges halve 
+        in size, down to an eighth of MAX_CHUNK_GET_SIZE, so less is retried on 
+        lossy links.
     :ivar int MAX_RANGE_SIZE: 
         The size of the ranges put by create_file_from_* methods. Smaller ranges 
         may be put if there is less data provided. The maximum range size the service 
@@ -120,6 +134,7 @@ class FileService(StorageClient):
     '''
     MAX_SINGLE_GET_SIZE = 32 * 1024 * 1024
     MAX_CHUNK_GET_SIZE = 8 * 1024 * 1024
+    ADAPTIVE_CHUNK_SIZE = False
     MAX_RANGE_SIZE = 4 * 1024 * 1024
 
     def __init__(self, account_name=None, account_key=None, sas_token=None, 
@@ -1651,6 +1666,7 @@ class FileService(StorageClient):
             content_settings, metadata, validate_content, progress_callback,
             max_connections, timeout)
 
+    @_timed_transfer
     def create_file_from_stream(
         self, share_name, directory_name, file_name, stream, count,
         content_settings=None, metadata=None, validate_content=False, 
@@ -1688,8 +1704,8 @@ class FileService(StorageClient):
             size of the file, or None if the total size is unknown.
         :type progress_callback: callback function in format of func(current, total)
         :param int max_connections:
-            Maximum number of parallel connections to use. Note that parallel upload 
-            requires the stream to be seekable.
+            Maximum number of parallel connections to use. Streams which are not
+            seekable are read in order, ahead of the uploads in flight.
         :param int timeout:
             The timeout parameter is expressed in seconds. This method may make 
             multiple calls to the Azure service and the timeout will apply to 
@@ -1729,7 +1745,7 @@ class FileService(StorageClient):
 
     def _get_file(self, share_name, directory_name, file_name,
                  start_range=None, end_range=None, validate_content=False, 
-                 timeout=None, _context=None):
+                 timeout=None, _context=None, _stream_writer=None):
         '''
         Downloads a file's content, metadata, and properties. You can specify a
         range if you don't need to download the file in its entirety. If no range
@@ -1779,8 +1795,9 @@ class FileService(StorageClient):
             check_content_md5=validate_content)
 
         return self._perform_request(request, _parse_file, 
-                                     [file_name, validate_content],
-                                     operation_context=_context)
+                                     [file_name, validate_content, _stream_writer],
+                                     operation_context=_context,
+                                     stream=_stream_writer is not None)
 
     def get_file_to_path(self, share_name, directory_name, file_name, file_path,
                          open_mode='wb', start_range=None, end_range=None,
@@ -1864,6 +1881,7 @@ class FileService(StorageClient):
 
         return file
 
+    @_timed_transfer
     def get_file_to_stream(
         self, share_name, directory_name, file_name, stream,
         start_range=None, end_range=None, validate_content=False,
@@ -1933,13 +1951,18 @@ class FileService(StorageClient):
 
         # If the user explicitly sets max_connections to 1, do a single shot download
         if max_connections == 1:
+            # Stream the body straight into the user stream if it can be 
+            # overwritten, as a retry must be able to rewrite what a failed 
+            # attempt wrote. Otherwise the content is buffered and written out below.
+            stream_writer = _RangeStreamWriter(stream, stream.tell()) if _can_overwrite(stream) else None
             file = self._get_file(share_name,
                                   directory_name,
                                   file_name,
                                   start_range=start_range,
                                   end_range=end_range,
                                   validate_content=validate_content,
-                                  timeout=timeout)
+                                  timeout=timeout,
+                                  _stream_writer=stream_writer)
 
             # Set the download size
             download_size = file.properties.content_length
@@ -1964,6 +1987,7 @@ class FileService(StorageClient):
 
             # Send a context object to make sure we always retry to the initial location
             operation_context = _OperationContext(location_lock=True)
+            stream_writer = _RangeStreamWriter(stream, stream.tell()) if _can_overwrite(stream) else None
             try:
                 file = self._get_file(share_name,
                                       directory_name,
@@ -1972,7 +1996,8 @@ class FileService(StorageClient):
                                       end_range=initial_request_end,
                                       validate_content=validate_content,
                                       timeout=timeout,
-                                      _context=operation_context)
+                                      _context=operation_context,
+                                      _stream_writer=stream_writer)
 
                 # Parse the total file size and adjust the download size if ranges 
                 # were specified
@@ -1994,7 +2019,8 @@ class FileService(StorageClient):
                                           file_name,
                                           validate_content=validate_content,
                                           timeout=timeout,
-                                          _context=operation_context)
+                                          _context=operation_context,
+                                          _stream_writer=stream_writer)
 
                     # Set the download size to empty
                     download_size = 0
@@ -2006,10 +2032,11 @@ class FileService(StorageClient):
         if progress_callback:
             progress_callback(file.properties.content_length, download_size)
 
-        # Write the content to the user stream  
-        # Clear file content since output has been written to user stream   
+        # Write the content to the user stream if it was not streamed there 
+        # directly. Clear file content since output has been written to user stream   
         if file.content is not None:
-            stream.write(file.content)
+            with _cpu_timer(_get_thread_timing(), 'write'):
+                stream.write(file.content)
             file.content = None
 
         # If the file is small or single shot download was used, the download is 
@@ -2046,8 +2073,10 @@ class FileService(StorageClient):
             # the last range
             file.properties.content_length = download_size
 
-            # Overwrite the content range to the user requested range
-            file.properties.content_range = 'bytes {0}-{1}/{2}'.format(start_range, end_range, file_size)
+            # Overwrite the content range to the range downloaded
+            range_start = start_range or 0
+            file.properties.content_range = 'bytes {0}-{1}/{2}'.format(
+                range_start, range_start + download_size - 1, file_size)
 
             # Overwrite the content MD5 as it is the MD5 for the last range instead 
             # of the stored MD5
@@ -24,18 +24,6 @@ from ._error import (
     _validate_not_none,
     _ERROR_UNKNOWN_KEY_WRAP_ALGORITHM
 )
-from cryptography.hazmat.primitives.keywrap import(
-    aes_key_wrap,
-    aes_key_unwrap,
-)
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
-from cryptography.hazmat.primitives.asymmetric.padding import (
-    OAEP,
-    MGF1,
-)
-from cryptography.hazmat.primitives.hashes import SHA1
-from os import urandom
 
 class _HeaderDict(dict):
 
@@ -136,6 +124,213 @@ class RetryContext(object):
         self.response = None
         self.location_mode = None
 
+class ConnectionPoolStats(object):
+    '''
+    Statistics of the connections used by the http session a service client 
+    creates when no request_session is given. The session is shared by the 
+    services created by the same CloudStorageAccount.
+
+    :ivar int requests:
+        The number of times a connection was taken from the pool to send a 
+        request.
+    :ivar int opens:
+        The number of requests which had to open a connection, as the pool had 
+        no connection for the host or the connection had been dropped or left 
+        idle for too long.
+    :ivar int exhausted:
+        The number of requests which found every pooled connection for the host 
+        in use. Rather than wait, such a request opens a connection of its own.
+    :ivar int discards:
+        The number of connections closed when returned because the pool was 
+        already full. If this grows steadily the pool is too small for the 
+        number of concurrent requests.
+    '''
+
+    def __init__(self, requests=0, opens=0, exhausted=0, discards=0):
+        self.requests = requests
+        self.opens = opens
+        self.exhausted = exhausted
+        self.discards = discards
+
+    @property
+    def reuses(self):
+        ''' The number of requests sent on a connection already open. '''
+        return self.requests - self.opens
+
+    @property
+    def reuse_rate(self):
+        ''' The fraction of requests sent on a connection already open. '''
+        return float(self.reuses) / self.requests if self.requests else 0.0
+
+class OperationMetrics(object):
+    '''
+    Metrics of the operations with the same name recorded by a
+    :class:`~azure.storage.StorageMetrics`.
+
+    :ivar int count:
+        The number of operations which completed, successfully or not.
+    :ivar int errors:
+        The number of operations which failed after any retries.
+    :ivar float latency_sum:
+        The total time the operations took, in seconds, including retries.
+    :ivar list(tuple(float, int)) latency_buckets:
+        The latency histogram, as the upper bound of each bucket in seconds
+        with the number of operations which took at most that long. The last
+        bound is infinity, with the count of every operation.
+    :ivar int bytes_sent:
+        The bytes of the request bodies sent, including retries.
+    :ivar int bytes_received:
+        The bytes of the response bodies received, including retries.
+    :ivar dict(str, int) retries:
+        The number of retries by their cause, the status code of the failed
+        response or 'error' if no response was received.
+    :ivar int throttled:
+        The number of responses throttling a request.
+    '''
+
+    def __init__(self, count=0, errors=0, latency_sum=0.0, latency_buckets=None, bytes_sent=0,
+                 bytes_received=0, retries=None, throttled=0):
+        self.count = count
+        self.errors = errors
+        self.latency_sum = latency_sum
+        self.latency_buckets = latency_buckets or []
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries or {}
+        self.throttled = throttled
+
+    @property
+    def latency_average(self):
+        ''' The average time the operations took, in seconds. '''
+        return self.latency_sum / self.count if self.count else 0.0
+
+    def get_latency_percentile(self, percentile):
+        '''
+        Estimates a latency percentile as the upper bound of the histogram
+        bucket it falls in.
+
+        :param float percentile:
+            The percentile, between 0 and 100.
+        :return: The upper bound in seconds, infinity if the percentile falls
+            in the last bucket, or None if no operation completed.
+        :rtype: float
+        '''
+        if not self.count:
+            return None
+        rank = self.count * percentile / 100.0
+        for bound, count in self.latency_buckets:
+            if count >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsSnapshot(object):
+    '''
+    The metrics recorded by a :class:`~azure.storage.StorageMetrics` at the
+    time the snapshot was taken.
+
+    :ivar dict(str, OperationMetrics) operations:
+        The metrics of each operation, by the name of the service method, such
+        as put_message or get_blob.
+    :ivar int in_flight:
+        The number of operations in flight.
+    '''
+
+    def __init__(self, operations=None, in_flight=0):
+        self.operations = operations or {}
+        self.in_flight = in_flight
+
+
+class RequestTiming(object):
+    '''
+    The time a request sent for a call timed by a service client's 
+    timing_callback took, split into phases, and the client CPU time spent 
+    while it was in progress. Each attempt of a retried request has its own 
+    timing. The connect, tls, first_byte and body phases are measured by the 
+    default transport; they are None for other transports, and connect and 
+    tls are also None when the request reused an open connection.
+
+    :ivar str operation:
+        The name of the service method which sent the request, such as 
+        put_block or get_blob.
+    :ivar int status:
+        The status code of the response, or None if none was received.
+    :ivar float elapsed:
+        The seconds from signing the request to parsing its response.
+    :ivar float connect:
+        The seconds spent opening a connection, including name resolution.
+    :ivar float tls:
+        The seconds spent on the TLS handshake of a new connection.
+    :ivar float first_byte:
+        The seconds from sending the request on a connection to receiving the 
+        headers of the response, which includes sending the request body.
+    :ivar float body:
+        The seconds spent reading the body of the response.
+    :ivar dict(str, float) cpu:
+        The client CPU seconds spent on the request by kind of work, as for 
+        :class:`~azure.storage.models.TimingReport`.
+    '''
+
+    def __init__(self, operation=None, status=None, elapsed=None, connect=None, tls=None,
+                 first_byte=None, body=None, cpu=None):
+        self.operation = operation
+        self.status = status
+        self.elapsed = elapsed
+        self.connect = connect
+        self.tls = tls
+        self.first_byte = first_byte
+        self.body = body
+        self.cpu = cpu or {}
+
+
+class TimingReport(object):
+    '''
+    The timing of a call to a service client method, given to the client's 
+    timing_callback once the call ends. A chunked upload or download is 
+    reported once, with the requests of all its chunks, and the CPU time of 
+    every thread which worked on it.
+
+    :ivar str operation:
+        The name of the method called, such as put_message. Chunked transfers 
+        are named after the method the others of their kind go through, such 
+        as create_blob_from_stream for create_blob_from_path.
+    :ivar float elapsed:
+        The seconds the call took.
+    :ivar list(RequestTiming) requests:
+        The timing of each request sent, including retries, in the order they 
+        completed.
+    :ivar dict(str, float) cpu:
+        The client CPU seconds spent by kind of work: sign for authentication, 
+        serialize for preparing requests, transport for the http stack and 
+        TLS, parse for reading responses, hash for MD5 computation, encrypt 
+        and decrypt for client-side encryption, and write for writing 
+        downloaded data to the stream. Each second is counted in one kind only.
+    '''
+
+    def __init__(self, operation=None, elapsed=None, requests=None, cpu=None):
+        self.operation = operation
+        self.elapsed = elapsed
+        self.requests = requests or []
+        self.cpu = cpu or {}
+
+    @property
+    def cpu_total(self):
+        ''' The client CPU seconds spent on the call. '''
+        return sum(self.cpu.values())
+
+    def get_phase_total(self, phase):
+        '''
+        Returns the seconds the requests spent in a phase, summed over the 
+        requests which measured it. Requests sent in parallel add up to more 
+        than the elapsed time of the call.
+
+        :param str phase:
+            One of connect, tls, first_byte, body or elapsed.
+        :rtype: float
+        '''
+        return sum(getattr(request, phase) or 0.0 for request in self.requests)
+
+
 class LocationMode(object):
     '''
     Specifies the location the request should be sent to. This mode only applies 
@@ -20,3 +20,14 @@ from .models import (
 )
 
 from .queueservice import QueueService
+
+import sys
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # The async service is imported on first use, as it imports asyncio
+        if name == 'AsyncQueueService':
+            from .asyncqueueservice import AsyncQueueService
+            return AsyncQueueService
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+elif sys.version_info >= (3, 5):
+    from .asyncqueueservice import AsyncQueueService
@@ -12,7 +12,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from dateutil import parser
 try:
     from xml.etree import cElementTree as ETree
 except ImportError:
@@ -25,6 +24,7 @@ from .models import (
 from ..models import (
     _list,
 )
+from .._common_conversion import _parse_date
 from .._deserialization import (
     _int_to_str,
     _parse_metadata,
@@ -33,6 +33,12 @@ from ._encryption import (
     _decrypt_queue_message,
 )
 
+def _return_response(response):
+    '''
+    Returns the response itself, for operations which inspect its status.
+    '''
+    return response
+
 def _parse_metadata_and_message_count(response):
     '''
     Extracts approximate messages count header.
@@ -48,7 +54,7 @@ def _parse_queue_message_from_headers(response):
     '''
     message = QueueMessage()
     message.pop_receipt = response.headers.get('x-ms-popreceipt')
-    message.time_next_visible = parser.parse(response.headers.get('x-ms-time-next-visible'))
+    message.time_next_visible = _parse_date(response.headers.get('x-ms-time-next-visible'))
     
     return message
 
@@ -131,14 +137,14 @@ def _convert_xml_to_queue_messages(response, decode_function, require_encryption
                                                         key_encryption_key, resolver)
         message.content = decode_function(message.content)
 
-        message.insertion_time = parser.parse(message_element.findtext('InsertionTime'))
-        message.expiration_time = parser.parse(message_element.findtext('ExpirationTime'))
+        message.insertion_time = _parse_date(message_element.findtext('InsertionTime'))
+        message.expiration_time = _parse_date(message_element.findtext('ExpirationTime'))
         
         message.pop_receipt = message_element.findtext('PopReceipt')
 
         time_next_visible = message_element.find('TimeNextVisible')
         if time_next_visible is not None:
-            message.time_next_visible = parser.parse(time_next_visible.text)
+            message.time_next_visible = _parse_date(time_next_visible.text)
 
         # Add message to list
         messages.append(message)
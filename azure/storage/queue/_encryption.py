@@ -20,6 +20,8 @@ from .._constants import (
     _ENCRYPTION_PROTOCOL_V1,
 )
 from .._encryption import (
+    _get_PKCS7_padder,
+    _get_PKCS7_unpadder,
     _generate_encryption_data_dict,
     _dict_to_encryption_data,
     _generate_AES_CBC_cipher,
@@ -49,9 +51,10 @@ from .._common_conversion import (
     _encode_base64,
     _decode_base64_to_bytes
 )
-from cryptography.hazmat.primitives.padding import PKCS7
+from .._timing import _timed_cpu
 import os
 
+@_timed_cpu('encrypt')
 def _encrypt_queue_message(message, key_encryption_key):
     '''
     Encrypts the given plain text message using AES256 in CBC mode with 128 bit padding.
@@ -84,7 +87,7 @@ def _encrypt_queue_message(message, key_encryption_key):
     cipher = _generate_AES_CBC_cipher(content_encryption_key, initialization_vector)
 
     # PKCS7 with 16 byte blocks ensures compatibility with AES.
-    padder = PKCS7(128).padder()
+    padder = _get_PKCS7_padder()
     padded_data = padder.update(message) + padder.finalize()
 
     # Encrypt the data.
@@ -100,6 +103,7 @@ def _encrypt_queue_message(message, key_encryption_key):
 
     return dumps(queue_message)
 
+@_timed_cpu('decrypt')
 def _decrypt_queue_message(message, require_encryption, key_encryption_key, resolver):
     '''
     Returns the decrypted message contents from an EncryptedQueueMessage.
@@ -167,7 +171,7 @@ def _decrypt(message, encryption_data, key_encryption_key=None, resolver=None):
     decrypted_data = (decryptor.update(decrypted_data) + decryptor.finalize())
 
     #unpad data
-    unpadder = PKCS7(128).unpadder()
+    unpadder = _get_PKCS7_unpadder()
     decrypted_data = (unpadder.update(decrypted_data) + unpadder.finalize())
 
     return decrypted_data
\ No newline at end of file
@@ -12,23 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-import sys
-if sys.version_info >= (3,):
-    from io import BytesIO
-else:
-    try:
-        from cStringIO import StringIO as BytesIO
-    except:
-        from StringIO import StringIO as BytesIO
-
-try:
-    from xml.etree import cElementTree as ETree
-except ImportError:
-    from xml.etree import ElementTree as ETree
-
-from xml.sax.saxutils import escape as xml_escape
 from .._common_conversion import (
     _str,
+    _xml_escape,
 )
 from ._encryption import (
     _encrypt_queue_message,
@@ -55,6 +41,9 @@ def _get_path(queue_name=None, include_messages=None, message_id=None):
         return '/'
 
 
+_QUEUE_MESSAGE_XML = u"<?xml version='1.0' encoding='utf-8'?>\n" \
+                     u'<QueueMessage><MessageText>{0}</MessageText></QueueMessage>'
+
 def _convert_queue_message_xml(message_text, encode_function, key_encryption_key):
     '''
     <?xml version="1.0" encoding="utf-8"?>
@@ -62,20 +51,11 @@ def _convert_queue_message_xml(message_text, encode_function, key_encryption_key
         <MessageText></MessageText>
     </QueueMessage>
     '''
-    queue_message_element = ETree.Element('QueueMessage');
-
     # Enabled
     message_text = encode_function(message_text)
     if key_encryption_key is not None:
             message_text = _encrypt_queue_message(message_text, key_encryption_key)
-    ETree.SubElement(queue_message_element, 'MessageText').text = message_text
-
-    # Add xml declaration and serialize
-    try:
-        stream = BytesIO()
-        ETree.ElementTree(queue_message_element).write(stream, xml_declaration=True, encoding='utf-8', method='xml')
-        output = stream.getvalue()
-    finally:
-        stream.close()
 
-    return output
+    # The document only varies by its text, so fill it in rather than build and 
+    # serialize a tree. This gives the same bytes as ElementTree.
+    return _QUEUE_MESSAGE_XML.format(_xml_escape(message_text)).encode('utf-8', 'xmlcharrefreplace')
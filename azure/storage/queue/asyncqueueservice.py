@@ -0,0 +1,147 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+from azure.common import (
+    AzureConflictHttpError,
+    AzureHttpError,
+)
+from .._constants import (
+    SERVICE_HOST_BASE,
+    DEFAULT_PROTOCOL,
+)
+from .._error import (
+    _dont_fail_not_exist,
+    _dont_fail_on_exist,
+    _ERROR_CONFLICT,
+)
+from ..models import _OperationContext
+from ..asyncstorageclient import (
+    AsyncStorageClient,
+    AsyncListGenerator,
+)
+from ._deserialization import _return_response
+from .queueservice import (
+    QueueService,
+    _HTTP_RESPONSE_NO_CONTENT,
+)
+
+
+class AsyncQueueService(AsyncStorageClient, QueueService):
+
+    '''
+    The asyncio version of :class:`~azure.storage.queue.queueservice.QueueService`.
+    Every operation which calls the service is a coroutine taking the same
+    parameters and returning the same values as its synchronous counterpart.
+    list_queues returns an :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+    to be used with async for. Requires the aiohttp package.
+    '''
+
+    def __init__(self, account_name=None, account_key=None, sas_token=None,
+                 is_emulated=False, protocol=DEFAULT_PROTOCOL, endpoint_suffix=SERVICE_HOST_BASE,
+                 request_session=None, connection_string=None):
+        '''
+        Takes the same parameters as QueueService, except for request_session.
+
+        :param aiohttp.ClientSession request_session:
+            The session object to use for http requests. If not specified, one
+            is created on first use and closed by close.
+        '''
+        super(AsyncQueueService, self).__init__(
+            account_name=account_name,
+            account_key=account_key,
+            sas_token=sas_token,
+            is_emulated=is_emulated,
+            protocol=protocol,
+            endpoint_suffix=endpoint_suffix,
+            connection_string=connection_string)
+
+        self._use_async_transport(request_session)
+
+    async def list_queues(self, prefix=None, num_results=None, include_metadata=False,
+                          marker=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.queue.queueservice.QueueService.list_queues`.
+
+        :return: An async iterator which produces :class:`~azure.storage.queue.models.Queue` objects.
+        :rtype: :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+        '''
+        include = 'metadata' if include_metadata else None
+        operation_context = _OperationContext(location_lock=True)
+        kwargs = {'prefix': prefix, 'max_results': num_results, 'include': include,
+                  'marker': marker, 'timeout': timeout, '_context': operation_context}
+        resp = await self._list_queues(**kwargs)
+
+        return AsyncListGenerator(resp, self._list_queues, (), kwargs)
+
+    async def create_queue(self, queue_name, metadata=None, fail_on_exist=False, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.queue.queueservice.QueueService.create_queue`.
+
+        :return:
+            A boolean indicating whether the queue was created. If fail_on_exist
+            was set to True, this will throw instead of returning false.
+        :rtype: bool
+        '''
+        request = self._create_queue_request(queue_name, metadata, timeout)
+
+        if not fail_on_exist:
+            try:
+                response = await self._perform_request(request, parser=_return_response)
+                if response.status == _HTTP_RESPONSE_NO_CONTENT:
+                    return False
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_on_exist(ex)
+                return False
+        else:
+            response = await self._perform_request(request, parser=_return_response)
+            if response.status == _HTTP_RESPONSE_NO_CONTENT:
+                raise AzureConflictHttpError(
+                    _ERROR_CONFLICT.format(response.message), response.status)
+            return True
+
+    async def delete_queue(self, queue_name, fail_not_exist=False, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.queue.queueservice.QueueService.delete_queue`.
+
+        :return:
+            A boolean indicating whether the queue was deleted. If fail_not_exist
+            was set to True, this will throw instead of returning false.
+        :rtype: bool
+        '''
+        request = self._delete_queue_request(queue_name, timeout)
+        if not fail_not_exist:
+            try:
+                await self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_not_exist(ex)
+                return False
+        else:
+            await self._perform_request(request)
+            return True
+
+    async def exists(self, queue_name, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.queue.queueservice.QueueService.exists`.
+
+        :return: A boolean indicating whether the queue exists.
+        :rtype: bool
+        '''
+        try:
+            await self.get_queue_metadata(queue_name, timeout=timeout)
+            return True
+        except AzureHttpError as ex:
+            _dont_fail_not_exist(ex)
+            return False
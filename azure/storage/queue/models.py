@@ -12,12 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
-from xml.sax.saxutils import escape as xml_escape
-from xml.sax.saxutils import unescape as xml_unescape
 from base64 import (
     b64encode,
     b64decode,
 )
+from .._common_conversion import (
+    _xml_escape,
+    _xml_unescape,
+)
 from ._error import (
     _validate_message_type_bytes,
     _validate_message_type_text,
@@ -155,7 +157,7 @@ class QueueMessageFormat:
         :rtype: str
         '''
         _validate_message_type_text(data)
-        return xml_escape(data)
+        return _xml_escape(data)
        
     @staticmethod 
     def text_xmldecode(data):
@@ -166,7 +168,7 @@ class QueueMessageFormat:
         :return: XML decoded data.
         :rtype: str
         '''
-        return xml_unescape(data)
+        return _xml_unescape(data)
 
     @staticmethod
     def noencode(data):
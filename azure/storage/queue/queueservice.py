@@ -72,6 +72,7 @@ from ._deserialization import (
     _convert_xml_to_queue_messages,
     _parse_queue_message_from_headers,
     _parse_metadata_and_message_count,
+    _return_response,
 )
 from ..sharedaccesssignature import (
     SharedAccessSignature,
@@ -399,7 +400,7 @@ class QueueService(StorageClient):
         }
         request.body = _get_request_body(
             _convert_service_properties_to_xml(logging, hour_metrics, minute_metrics, cors))
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def list_queues(self, prefix=None, num_results=None, include_metadata=False, 
                     marker=None, timeout=None):
@@ -505,20 +506,11 @@ class QueueService(StorageClient):
             was set to True, this will throw instead of returning false.
         :rtype: bool
         '''
-        _validate_not_none('queue_name', queue_name)
-        request = HTTPRequest()
-        request.method = 'PUT'
-        request.host_locations = self._get_host_locations()
-        request.path = _get_path(queue_name)
-        request.query = {'timeout': _int_to_str(timeout)}
-        _add_metadata_headers(metadata, request)
-
-        def _return_request(request):
-            return request
+        request = self._create_queue_request(queue_name, metadata, timeout)
 
         if not fail_on_exist:
             try:
-                response = self._perform_request(request, parser=_return_request)
+                response = self._perform_request(request, parser=_return_response)
                 if response.status == _HTTP_RESPONSE_NO_CONTENT:
                     return False
                 return True
@@ -526,7 +518,7 @@ class QueueService(StorageClient):
                 _dont_fail_on_exist(ex)
                 return False
         else:
-            response = self._perform_request(request, parser=_return_request)
+            response = self._perform_request(request, parser=_return_response)
             if response.status == _HTTP_RESPONSE_NO_CONTENT:
                 raise AzureConflictHttpError(
                     _ERROR_CONFLICT.format(response.message), response.status)
@@ -555,12 +547,7 @@ class QueueService(StorageClient):
             was set to True, this will throw instead of returning false.
         :rtype: bool
         '''
-        _validate_not_none('queue_name', queue_name)
-        request = HTTPRequest()
-        request.method = 'DELETE'
-        request.host_locations = self._get_host_locations()
-        request.path = _get_path(queue_name)
-        request.query = {'timeout': _int_to_str(timeout)}
+        request = self._delete_queue_request(queue_name, timeout)
         if not fail_not_exist:
             try:
                 self._perform_request(request)
@@ -572,6 +559,31 @@ class QueueService(StorageClient):
             self._perform_request(request)
             return True
 
+    def _create_queue_request(self, queue_name, metadata=None, timeout=None):
+        '''
+        Builds the request of create_queue. Shared with the async client.
+        '''
+        _validate_not_none('queue_name', queue_name)
+        request = HTTPRequest()
+        request.method = 'PUT'
+        request.host_locations = self._get_host_locations()
+        request.path = _get_path(queue_name)
+        request.query = {'timeout': _int_to_str(timeout)}
+        _add_metadata_headers(metadata, request)
+        return request
+
+    def _delete_queue_request(self, queue_name, timeout=None):
+        '''
+        Builds the request of delete_queue. Shared with the async client.
+        '''
+        _validate_not_none('queue_name', queue_name)
+        request = HTTPRequest()
+        request.method = 'DELETE'
+        request.host_locations = self._get_host_locations()
+        request.path = _get_path(queue_name)
+        request.query = {'timeout': _int_to_str(timeout)}
+        return request
+
     def get_queue_metadata(self, queue_name, timeout=None):
         '''
         Retrieves user-defined metadata and queue properties on the specified
@@ -623,7 +635,7 @@ class QueueService(StorageClient):
         }
         _add_metadata_headers(metadata, request)
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def exists(self, queue_name, timeout=None):
         '''
@@ -705,7 +717,7 @@ class QueueService(StorageClient):
         }
         request.body = _get_request_body(
             _convert_signed_identifiers_to_xml(signed_identifiers))
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def put_message(self, queue_name, content, visibility_timeout=None,
                     time_to_live=None, timeout=None):
@@ -760,7 +772,7 @@ class QueueService(StorageClient):
 
         request.body = _get_request_body(_convert_queue_message_xml(content, self.encode_function,
                                                                     self.key_encryption_key))
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def get_messages(self, queue_name, num_messages=None,
                      visibility_timeout=None, timeout=None):
@@ -895,7 +907,7 @@ class QueueService(StorageClient):
             'popreceipt': _to_str(pop_receipt),
             'timeout': _int_to_str(timeout)
         }
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def clear_messages(self, queue_name, timeout=None):
         '''
@@ -912,7 +924,7 @@ class QueueService(StorageClient):
         request.host_locations = self._get_host_locations()
         request.path = _get_path(queue_name, True)
         request.query = {'timeout': _int_to_str(timeout)}
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def update_message(self, queue_name, message_id, pop_receipt, visibility_timeout, 
                        content=None, timeout=None):
@@ -12,18 +12,97 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import random
+import threading
 from math import pow
 from abc import ABCMeta
+from email.utils import (
+    mktime_tz,
+    parsedate_tz,
+)
+from time import time
 
 from .models import LocationMode
 
+
+class RetryBudget(object):
+    '''
+    A token bucket limiting the retries of the policies it is given to. Each 
+    retry takes a token and tokens are added back at a steady rate up to 
+    max_tokens. Once the bucket is empty requests fail rather than retry, so 
+    a failing partition or a network outage does not multiply the requests 
+    sent. A budget may be shared by the retry policies of several service 
+    clients, or by every client of a process.
+
+    :ivar int retries:
+        The number of retries the budget allowed.
+    :ivar int exhausted:
+        The number of retries refused because the budget was empty.
+    '''
+
+    def __init__(self, max_tokens=10, tokens_per_second=1):
+        '''
+        :param int max_tokens:
+            The most tokens the bucket holds, which is the number of retries 
+            allowed in a burst. The bucket starts full.
+        :param float tokens_per_second:
+            The rate at which tokens are added back.
+        '''
+        self.max_tokens = max_tokens
+        self.tokens_per_second = tokens_per_second
+        self.retries = 0
+        self.exhausted = 0
+        self._tokens = float(max_tokens)
+        self._updated = time()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        '''
+        Takes a token for a retry.
+
+        :return: True if the retry may be performed, False if the budget is empty.
+        :rtype: bool
+        '''
+        with self._lock:
+            now = time()
+            self._tokens = min(self.max_tokens, 
+                               self._tokens + (now - self._updated) * self.tokens_per_second)
+            self._updated = now
+
+            if self._tokens < 1:
+                self.exhausted += 1
+                return False
+
+            self._tokens -= 1
+            self.retries += 1
+            return True
+
+
+def _get_retry_after(response):
+    '''
+    Returns the number of seconds a Retry-After header of the response asks to 
+    wait, or None if it has none. The header may give either a number of 
+    seconds or a date.
+    '''
+    value = response.headers.get('retry-after') if response and response.headers else None
+    if not value:
+        return None
+
+    try:
+        return max(0, int(value))
+    except ValueError:
+        date = parsedate_tz(value)
+        if date is None:
+            return None
+        return max(0, mktime_tz(date) - time())
+
 class _Retry(object):
     '''
     The base class for Exponential and Linear retries containing shared code.
     '''
     __metaclass__ = ABCMeta
 
-    def __init__(self, max_attempts, retry_to_secondary):
+    def __init__(self, max_attempts, retry_to_secondary, retry_budget=None):
         '''
         Constructs a base retry object.
 
@@ -33,9 +112,12 @@ class _Retry(object):
             Whether the request should be retried to secondary, if able. This should 
             only be enabled of RA-GRS accounts are used and potentially stale data 
             can be handled.
+        :param RetryBudget retry_budget:
+            If given, a retry is only performed if the budget allows it.
         '''
         self.max_attempts = max_attempts
         self.retry_to_secondary = retry_to_secondary
+        self.retry_budget = retry_budget
 
     def _should_retry(self, context):
         '''
@@ -132,14 +214,24 @@ class _Retry(object):
         # Determine whether to retry, and if so increment the count, modify the 
         # request as desired, and return the backoff.
         if self._should_retry(context):
+            if self.retry_budget is not None and not self.retry_budget.try_acquire():
+                return None
+
             context.count += 1
             
             # If retry to secondary is enabled, attempt to change the host if the 
             # request allows it
+            location_mode = context.location_mode
             if self.retry_to_secondary:
                 self._set_next_host_location(context)
 
-            return backoff(context)
+            # Wait at least as long as the server asked, unless the retry goes 
+            # to the other location
+            interval = backoff(context)
+            retry_after = _get_retry_after(context.response)
+            if retry_after is not None and context.location_mode == location_mode:
+                interval = max(interval, retry_after)
+            return interval
 
         return None
 
@@ -150,7 +242,7 @@ class ExponentialRetry(_Retry):
     '''
 
     def __init__(self, initial_backoff=15, increment_power=3, max_attempts=3, 
-                 retry_to_secondary=False):
+                 retry_to_secondary=False, retry_budget=None):
         '''
         Constructs an Exponential retry object. The initial_backoff is used for 
         the first retry. Subsequent retries are retried after initial_backoff + 
@@ -169,10 +261,12 @@ class ExponentialRetry(_Retry):
             Whether the request should be retried to secondary, if able. This should 
             only be enabled of RA-GRS accounts are used and potentially stale data 
             can be handled.
+        :param RetryBudget retry_budget:
+            If given, a retry is only performed if the budget allows it.
         '''
         self.initial_backoff = initial_backoff
         self.increment_power = increment_power
-        super(ExponentialRetry, self).__init__(max_attempts, retry_to_secondary)
+        super(ExponentialRetry, self).__init__(max_attempts, retry_to_secondary, retry_budget)
 
     '''
     A function which determines whether and how to retry.
@@ -204,7 +298,7 @@ class LinearRetry(_Retry):
     Linear retry.
     '''
 
-    def __init__(self, backoff=15, max_attempts=3, retry_to_secondary=False):
+    def __init__(self, backoff=15, max_attempts=3, retry_to_secondary=False, retry_budget=None):
         '''
         Constructs a Linear retry object.
 
@@ -216,10 +310,12 @@ class LinearRetry(_Retry):
             Whether the request should be retried to secondary, if able. This should 
             only be enabled of RA-GRS accounts are used and potentially stale data 
             can be handled.
+        :param RetryBudget retry_budget:
+            If given, a retry is only performed if the budget allows it.
         '''
         self.backoff = backoff
         self.max_attempts = max_attempts
-        super(LinearRetry, self).__init__(max_attempts, retry_to_secondary)
+        super(LinearRetry, self).__init__(max_attempts, retry_to_secondary, retry_budget)
 
     '''
     A function which determines whether and how to retry.
@@ -246,6 +342,62 @@ class LinearRetry(_Retry):
     def _backoff(self, context):
         return self.backoff
 
+class DecorrelatedJitterRetry(_Retry):
+    '''
+    Exponential retry with decorrelated jitter. Each backoff is drawn at random 
+    between initial_backoff and three times the previous backoff, and capped at 
+    max_backoff. Clients failing at the same time so spread their retries out 
+    instead of retrying together.
+    '''
+
+    def __init__(self, initial_backoff=1, max_backoff=60, max_attempts=3, 
+                 retry_to_secondary=False, retry_budget=None):
+        '''
+        Constructs a decorrelated jitter retry object.
+
+        :param int initial_backoff: 
+            The shortest backoff interval, in seconds.
+        :param int max_backoff:
+            The longest backoff interval, in seconds.
+        :param int max_attempts: 
+            The maximum number of retry attempts.
+        :param bool retry_to_secondary:
+            Whether the request should be retried to secondary, if able. This should 
+            only be enabled of RA-GRS accounts are used and potentially stale data 
+            can be handled.
+        :param RetryBudget retry_budget:
+            If given, a retry is only performed if the budget allows it.
+        '''
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        super(DecorrelatedJitterRetry, self).__init__(max_attempts, retry_to_secondary, retry_budget)
+
+    '''
+    A function which determines whether and how to retry.
+
+    :param ~azure.storage.models.RetryContext context: 
+        The retry context. This contains the request, response, and other data 
+        which can be used to determine whether or not to retry.
+    :return: 
+        A number indicating how long to wait before retrying the request, 
+        or None to indicate no retry should be performed.
+    :rtype: float or None
+    '''
+    def retry(self, context):
+        return self._retry(context, self._backoff)
+
+    '''
+    Calculates how long to sleep before retrying.
+
+    :return: 
+        A number indicating how long to wait before retrying the request.
+    :rtype: float
+    '''
+    def _backoff(self, context):
+        previous = getattr(context, 'backoff', self.initial_backoff)
+        context.backoff = min(self.max_backoff, random.uniform(self.initial_backoff, previous * 3))
+        return context.backoff
+
 def no_retry(context):
     '''
     Specifies never to retry.
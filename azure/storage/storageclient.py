@@ -15,8 +15,10 @@
 import os
 import sys
 import copy
-import requests
-from time import sleep
+from time import (
+    sleep,
+    time,
+)
 from abc import ABCMeta
 
 from azure.common import (
@@ -29,10 +31,18 @@ from .models import (
 )
 from .retry import ExponentialRetry
 from ._constants import (
-    SOCKET_TIMEOUT
+    SOCKET_TIMEOUT,
+    MAX_TRANSFER_CONNECTIONS,
 )
 from ._http import HTTPError
 from ._http.httpclient import _HTTPClient
+from ._http.connectionpool import _PooledSession
+from ._transfer import _TransferExecutor
+from ._metrics import _get_operation_name
+from ._timing import (
+    _OperationTiming,
+    _cpu_timer,
+)
 from ._serialization import (
     _update_request,
     _add_date_header,
@@ -83,7 +93,48 @@ class StorageClient(object):
     :ivar str protocol:
         The protocol to use for requests. Defaults to https.
     :ivar requests.Session request_session:
-        The session object to use for http requests.
+        The session object to use for http requests. If none is given, the 
+        client creates a session keeping as many connections per host as 
+        max_transfer_connections, so the threads of chunked transfers reuse 
+        their connections. Services created by the same CloudStorageAccount 
+        share one such session.
+    :ivar HTTPTransport transport:
+        The transport sending the requests of the client, which defaults to 
+        one based on requests. It may be set to an 
+        :class:`~azure.storage.HTTP2Transport`, to multiplex requests over a 
+        few HTTP/2 connections, or to another implementation of 
+        :class:`~azure.storage.HTTPTransport`. A transport set without a 
+        protocol or timeout takes those of the client.
+    :ivar int max_transfer_connections:
+        The number of threads shared by all the chunked uploads and downloads 
+        of this client. This caps the number of ranges in flight across all 
+        concurrent calls, whatever max_connections each call asks for. A change 
+        takes effect when the pool is next created, which is on first use or 
+        after close is called. Raising it also grows the connection pool of a 
+        session created by the client. Defaults to 64.
+    :ivar ~azure.storage.AdaptiveConcurrencyLimiter concurrency_limiter:
+        If set, each request waits until the limiter allows another request in 
+        flight to its host, and the limiter adjusts its limits to the responses. 
+        A slot is held until the response is received, which for a streamed 
+        download is before its body is read. Not used by the asyncio clients. 
+        Defaults to None.
+    :ivar ~azure.storage.EndpointHealthTracker health_tracker:
+        If set, the outcome of each request is recorded by the tracker, and 
+        operations which may be sent to either location go to the other 
+        location while the tracker has opened the circuit of the location_mode. 
+        Defaults to None.
+    :ivar ~azure.storage.StorageMetrics metrics:
+        If set, the latency, bytes, retries and throttled responses of each 
+        operation are recorded by the metrics, which may be shared by several 
+        clients. Defaults to None.
+    :ivar function(report) timing_callback:
+        If set, calls to the methods of the client are timed, and this 
+        function is called with a :class:`~azure.storage.models.TimingReport` 
+        once each completes. The report splits the time of each request into 
+        phases, and the client CPU time into signing, serialization, transport, 
+        parsing, hashing, encryption and stream writes. A chunked upload or 
+        download, including the work of its threads, is reported once. Not 
+        used by the asyncio clients. Defaults to None.
     :ivar function(request) request_callback:
         A function called immediately before each request is sent. This function 
         takes as a parameter the request object and returns nothing. It may be 
@@ -112,15 +163,21 @@ class StorageClient(object):
         self.secondary_endpoint = connection_params.secondary_endpoint
 
         protocol = connection_params.protocol
-        request_session = connection_params.request_session or requests.Session()
+        request_session = connection_params.request_session or _PooledSession(MAX_TRANSFER_CONNECTIONS)
         self._httpclient = _HTTPClient(
             protocol=protocol,
             session=request_session,
             timeout=SOCKET_TIMEOUT,
         )
 
+        self._transfer_executor = _TransferExecutor(MAX_TRANSFER_CONNECTIONS)
+
         self.retry = ExponentialRetry().retry
         self.location_mode = LocationMode.PRIMARY
+        self.concurrency_limiter = None
+        self.health_tracker = None
+        self.metrics = None
+        self.timing_callback = None
 
         self.request_callback = None
         self.response_callback = None
@@ -134,6 +191,18 @@ class StorageClient(object):
     def protocol(self, value):
         self._httpclient.protocol = value
 
+    @property
+    def transport(self):
+        return self._httpclient
+
+    @transport.setter
+    def transport(self, value):
+        if value.protocol is None:
+            value.protocol = self._httpclient.protocol
+        if value.timeout is None:
+            value.timeout = self._httpclient.timeout
+        self._httpclient = value
+
     @property
     def request_session(self):
         return self._httpclient.session
@@ -142,6 +211,39 @@ class StorageClient(object):
     def request_session(self, value):
         self._httpclient.session = value
 
+    @property
+    def max_transfer_connections(self):
+        return self._transfer_executor.max_workers
+
+    @max_transfer_connections.setter
+    def max_transfer_connections(self, value):
+        self._transfer_executor.max_workers = value
+        if isinstance(self.request_session, _PooledSession):
+            self.request_session.reserve(value)
+
+    @property
+    def connection_pool_stats(self):
+        '''
+        The statistics of the connections used by the session this client 
+        created, or that its CloudStorageAccount created, or by its transport. 
+        None if a request_session was given.
+
+        :rtype: :class:`~azure.storage.models.ConnectionPoolStats`
+        '''
+        return self._httpclient.get_stats()
+
+    def close(self):
+        '''
+        Shuts down the thread pool used for chunked uploads and downloads. 
+        Transfers running in other threads are not interrupted: the pool is 
+        shut down once the last of them completes, without close waiting for 
+        them. The client may still be used afterward; a new pool is created 
+        when needed. The connections of the transport are also released, 
+        unless the session is shared.
+        '''
+        self._transfer_executor.shutdown()
+        self._httpclient.close()
+
     def set_proxy(self, host, port, user=None, password=None):
         '''
         Sets the proxy server host and port for the HTTP CONNECT Tunnelling.
@@ -173,15 +275,72 @@ class StorageClient(object):
             request.host = list(request.host_locations.values())[0]
             retry_context.location_mode = list(request.host_locations.keys())[0]
         else:
-            # If multiple locations are possible, choose based on the location mode.
-            request.host = request.host_locations.get(self.location_mode)
-            retry_context.location_mode = self.location_mode
+            # If multiple locations are possible, choose based on the location mode, 
+            # unless the circuit of that location is open.
+            location_mode = self.location_mode
+            if self.health_tracker is not None and not self.health_tracker._is_available(location_mode):
+                if location_mode == LocationMode.PRIMARY:
+                    location_mode = LocationMode.SECONDARY
+                else:
+                    location_mode = LocationMode.PRIMARY
+
+            request.host = request.host_locations.get(location_mode)
+            retry_context.location_mode = location_mode
+
+    def _send_request(self, request, stream, location_mode):
+        limiter = self.concurrency_limiter
+        tracker = self.health_tracker
+        if limiter is None and tracker is None:
+            return self._httpclient.perform_request(request, stream=stream)
 
-    def _perform_request(self, request, parser=None, parser_args=None, operation_context=None):
+        slot = limiter.acquire(request.host) if limiter is not None else None
+        started = time()
+        status = None
+        try:
+            response = self._httpclient.perform_request(request, stream=stream)
+            status = response.status
+            return response
+        finally:
+            if slot is not None:
+                slot.release(status)
+            self._record_health(location_mode, status, started)
+
+    def _record_health(self, location_mode, status, started):
+        if self.health_tracker is not None:
+            self.health_tracker._record(location_mode, status, time() - started)
+
+    def _perform_request(self, request, parser=None, parser_args=None, operation_context=None, 
+                         stream=False):
         '''
         Sends the request and return response. Catches HTTPError and hands it
-        to error handler
+        to error handler. If stream is True, the response body is not buffered 
+        and the parser is responsible for reading it. Failures while the parser 
+        reads the body are retried like any other failure.
         '''
+        metrics = self.metrics
+        timing_callback = self.timing_callback
+        if metrics is None and timing_callback is None:
+            return self._perform_request_with_retries(request, parser, parser_args, operation_context, stream)
+
+        # The operation is named after the service method sending the request
+        name = _get_operation_name()
+        recorder = metrics._start(name) if metrics is not None else None
+        timing = _OperationTiming(name, timing_callback) if timing_callback is not None else None
+        succeeded = False
+        try:
+            result = self._perform_request_with_retries(request, parser, parser_args, operation_context,
+                                                        stream, recorder,
+                                                        timing.thread_timing if timing is not None else None)
+            succeeded = True
+            return result
+        finally:
+            if recorder is not None:
+                recorder.end(succeeded)
+            if timing is not None:
+                timing.end()
+
+    def _perform_request_with_retries(self, request, parser, parser_args, operation_context, stream,
+                                      metrics_recorder=None, thread_timing=None):
         operation_context = operation_context or _OperationContext()
         retry_context = RetryContext()
 
@@ -189,9 +348,12 @@ class StorageClient(object):
         self._apply_host(request, operation_context, retry_context)
 
         # Apply common settings to the request
-        _update_request(request)
+        with _cpu_timer(thread_timing, 'serialize'):
+            _update_request(request)
 
         while(True):
+            request_started = thread_timing.start_request() if thread_timing is not None else None
+            status = None
             try:
                 try:
                     # Execute the request callback 
@@ -202,14 +364,20 @@ class StorageClient(object):
                     # authentication is still correct if signed headers are added in the request 
                     # callback. This also ensures retry policies with long back offs 
                     # will work as it resets the time sensitive headers.
-                    _add_date_header(request)
-                    self.authentication.sign_request(request)
+                    with _cpu_timer(thread_timing, 'serialize'):
+                        _add_date_header(request)
+                    with _cpu_timer(thread_timing, 'sign'):
+                        self.authentication.sign_request(request)
 
                     # Set the request context
                     retry_context.request = request
 
                     # Perform the request
-                    response = self._httpclient.perform_request(request)
+                    with _cpu_timer(thread_timing, 'transport'):
+                        response = self._send_request(request, stream, retry_context.location_mode)
+                    status = response.status
+                    if metrics_recorder is not None:
+                        metrics_recorder.record_response(request, response)
 
                     # Execute the response callback
                     if self.response_callback:
@@ -225,15 +393,20 @@ class StorageClient(object):
                         _http_error_handler(HTTPError(response.status, response.message, response.headers, response.body))
 
                     # Parse the response
-                    if parser:
-                        if parser_args:
-                            args = [response]
-                            args.extend(parser_args)
-                            return parser(*args)
-                        else:
-                            return parser(response)
-                    else:
-                        return
+                    try:
+                        with _cpu_timer(thread_timing, 'parse'):
+                            if parser:
+                                if parser_args:
+                                    args = [response]
+                                    args.extend(parser_args)
+                                    return parser(*args)
+                                else:
+                                    return parser(response)
+                            else:
+                                return
+                    finally:
+                        # Release the connection of a streamed response
+                        response.close()
                 except AzureException as ex:
                     raise ex
                 except Exception as ex:
@@ -246,6 +419,9 @@ class StorageClient(object):
                         # However, we can keep the previous error type and message
                         # TODO: In the future we will log the trace
                         raise AzureException('{}: {}'.format(ex.__class__.__name__, ex.args[0]))
+                finally:
+                    if thread_timing is not None:
+                        thread_timing.end_request(request_started, status)
 
             except AzureException as ex:
                 # Decryption failures (invalid objects, invalid algorithms, data unencrypted in strict mode, etc)
@@ -256,6 +432,9 @@ class StorageClient(object):
                 # long to wait before performing retry.
                 retry_interval = self.retry(retry_context)
                 if retry_interval is not None:
+                    if metrics_recorder is not None:
+                        metrics_recorder.record_retry(ex)
+
                     # Execute the callback
                     if self.retry_callback:
                         self.retry_callback(retry_context)
@@ -269,4 +448,7 @@ class StorageClient(object):
                 # this is the first request of that operation. Set the location to 
                 # be used for subsequent requests in the operation.
                 if operation_context.location_lock and not operation_context.host_location:
-                    operation_context.host_location = {retry_context.location_mode: request.host}
\ No newline at end of file
+                    # The request host no longer has the path of a path style
+                    # endpoint, such as the emulator's, so take the unmodified one
+                    location = retry_context.location_mode
+                    operation_context.host_location = {location: request.host_locations[location]}
\ No newline at end of file
@@ -24,3 +24,14 @@ from .models import (
 )
 from .tablebatch import TableBatch
 from .tableservice import TableService
+
+import sys
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # The async service is imported on first use, as it imports asyncio
+        if name == 'AsyncTableService':
+            from .asynctableservice import AsyncTableService
+            return AsyncTableService
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+elif sys.version_info >= (3, 5):
+    from .asynctableservice import AsyncTableService
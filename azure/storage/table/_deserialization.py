@@ -14,7 +14,6 @@
 #--------------------------------------------------------------------------
 import sys
 
-from dateutil import parser
 if sys.version_info < (3,):
     from urllib2 import quote as url_quote
 else:
@@ -28,6 +27,7 @@ from azure.common import (
 )
 from .._common_conversion import (
     _decode_base64_to_bytes,
+    _parse_date,
 )
 from .._error import (
     _ERROR_DECRYPTION_FAILURE,
@@ -73,9 +73,9 @@ def _from_entity_int32(value):
 
 
 def _from_entity_datetime(value):
-    # Note that Azure always returns UTC datetime, and dateutil parser
-    # will set the tzinfo on the date it returns
-    return parser.parse(value)
+    # Note that Azure always returns UTC datetime, and the date returned
+    # has its tzinfo set
+    return _parse_date(value)
 
 
 _EDM_TYPES = [EdmType.BINARY, EdmType.INT64, EdmType.GUID, EdmType.DATETIME,
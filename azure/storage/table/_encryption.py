@@ -29,7 +29,10 @@ from .._constants import(
 from .._common_conversion import(
     _decode_base64_to_bytes,
 )
+from .._timing import _timed_cpu
 from .._encryption import(
+    _get_PKCS7_padder,
+    _get_PKCS7_unpadder,
     _generate_encryption_data_dict,
     _dict_to_encryption_data,
     _generate_AES_CBC_cipher,
@@ -53,13 +56,8 @@ from json import(
 )
 import os
 from copy import deepcopy
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.padding import PKCS7
-from cryptography.hazmat.primitives.hashes import(
-    Hash,
-    SHA256,
-)
 
+@_timed_cpu('encrypt')
 def _encrypt_entity(entity, key_encryption_key, encryption_resolver):
     '''
     Encrypts the given entity using AES256 in CBC mode with 128 bit padding.
@@ -124,7 +122,7 @@ def _encrypt_entity(entity, key_encryption_key, encryption_resolver):
             cipher = _generate_AES_CBC_cipher(content_encryption_key, propertyIV)
 
             # PKCS7 with 16 byte blocks ensures compatibility with AES.
-            padder = PKCS7(128).padder()
+            padder = _get_PKCS7_padder()
             padded_data = padder.update(value) + padder.finalize()
 
             # Encrypt the data.
@@ -147,7 +145,7 @@ def _encrypt_entity(entity, key_encryption_key, encryption_resolver):
 
     cipher = _generate_AES_CBC_cipher(content_encryption_key, metadataIV)
 
-    padder = PKCS7(128).padder()
+    padder = _get_PKCS7_padder()
     padded_data = padder.update(encrypted_properties) + padder.finalize()
 
     encryptor = cipher.encryptor()
@@ -161,6 +159,7 @@ def _encrypt_entity(entity, key_encryption_key, encryption_resolver):
     encrypted_entity['_ClientEncryptionMetadata1'] = dumps(encryption_data)
     return encrypted_entity
 
+@_timed_cpu('decrypt')
 def _decrypt_entity(entity, encrypted_properties_list, content_encryption_key, entityIV, isJavaV1):
     '''
     Decrypts the specified entity using AES256 in CBC mode with 128 bit padding. Unwraps the CEK 
@@ -199,7 +198,7 @@ def _decrypt_entity(entity, encrypted_properties_list, content_encryption_key, e
                 decrypted_data = (decryptor.update(value.value) + decryptor.finalize())
         
                 # Unpad the data.
-                unpadder = PKCS7(128).unpadder()
+                unpadder = _get_PKCS7_unpadder()
                 decrypted_data = (unpadder.update(decrypted_data) + unpadder.finalize())
 
                 decrypted_data = decrypted_data.decode('utf-8')
@@ -269,7 +268,7 @@ def _extract_encryption_metadata(entity, require_encryption, key_encryption_key,
     encrypted_properties_list = decryptor.update(encrypted_properties_list) + decryptor.finalize()
 
     # Unpad the data.
-    unpadder = PKCS7(128).unpadder()
+    unpadder = _get_PKCS7_unpadder()
     encrypted_properties_list = unpadder.update(encrypted_properties_list) + unpadder.finalize()
 
     encrypted_properties_list = encrypted_properties_list.decode('utf-8')
@@ -288,6 +287,12 @@ def _generate_property_iv(entity_iv, pk, rk, property_name, isJavaV1):
     Uses the entity_iv, partition key, and row key to generate and return
     the iv for the specified property.
     '''
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.hashes import (
+        Hash,
+        SHA256,
+    )
+
     digest = Hash(SHA256(), default_backend())
     if not isJavaV1:
         digest.update(entity_iv +
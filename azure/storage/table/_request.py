@@ -16,6 +16,7 @@ from .._http import HTTPRequest
 from .._common_conversion import (
     _to_str,
 )
+from .models import TablePayloadFormat
 from .._error import (
     _validate_not_none,
     _validate_encryption_required,
@@ -29,6 +30,7 @@ from ._error import (
 )
 from ._serialization import (
     _convert_entity_to_json,
+    _convert_table_to_json,
     _DEFAULT_ACCEPT_HEADER,
     _DEFAULT_CONTENT_TYPE_HEADER,
     _DEFAULT_PREFER_HEADER,
@@ -37,6 +39,47 @@ from ._encryption import (
     _encrypt_entity,
 )
 
+def _create_table(table_name):
+    '''
+    Constructs a create table request.
+    '''
+    _validate_not_none('table', table_name)
+    request = HTTPRequest()
+    request.method = 'POST'
+    request.path = '/Tables'
+    request.headers = {
+        _DEFAULT_CONTENT_TYPE_HEADER[0]: _DEFAULT_CONTENT_TYPE_HEADER[1],
+        _DEFAULT_PREFER_HEADER[0]: _DEFAULT_PREFER_HEADER[1],
+        _DEFAULT_ACCEPT_HEADER[0]: _DEFAULT_ACCEPT_HEADER[1]
+    }
+    request.body = _get_request_body(_convert_table_to_json(table_name))
+
+    return request
+
+def _get_table(table_name):
+    '''
+    Constructs a get table request, used to check the table exists.
+    '''
+    _validate_not_none('table_name', table_name)
+    request = HTTPRequest()
+    request.method = 'GET'
+    request.path = '/Tables' + "('" + table_name + "')"
+    request.headers = {'Accept': TablePayloadFormat.JSON_NO_METADATA}
+
+    return request
+
+def _delete_table(table_name):
+    '''
+    Constructs a delete table request.
+    '''
+    _validate_not_none('table_name', table_name)
+    request = HTTPRequest()
+    request.method = 'DELETE'
+    request.path = '/Tables(\'' + _to_str(table_name) + '\')'
+    request.headers = {_DEFAULT_ACCEPT_HEADER[0]: _DEFAULT_ACCEPT_HEADER[1]}
+
+    return request
+
 def _get_entity(partition_key, row_key, select, accept):
     '''
     Constructs a get entity request.
@@ -0,0 +1,210 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+from azure.common import (
+    AzureHttpError,
+)
+from .._common_conversion import _int_to_str
+from .._constants import (
+    SERVICE_HOST_BASE,
+    DEFAULT_PROTOCOL,
+)
+from .._error import (
+    _dont_fail_not_exist,
+    _dont_fail_on_exist,
+)
+from ..models import _OperationContext
+from ..asyncstorageclient import (
+    AsyncStorageClient,
+    AsyncListGenerator,
+)
+from ._request import (
+    _create_table,
+    _get_table,
+    _delete_table,
+)
+from ._serialization import _update_storage_table_header
+from .models import TablePayloadFormat
+from .tablebatch import TableBatch
+from .tableservice import TableService
+
+
+class AsyncTableService(AsyncStorageClient, TableService):
+
+    '''
+    The asyncio version of :class:`~azure.storage.table.tableservice.TableService`.
+    Every operation which calls the service is a coroutine taking the same
+    parameters and returning the same values as its synchronous counterpart.
+    list_tables and query_entities return an
+    :class:`~azure.storage.asyncstorageclient.AsyncListGenerator` to be used
+    with async for, and batch returns an async context manager. Requires the
+    aiohttp package.
+    '''
+
+    def __init__(self, account_name=None, account_key=None, sas_token=None,
+                 is_emulated=False, protocol=DEFAULT_PROTOCOL, endpoint_suffix=SERVICE_HOST_BASE,
+                 request_session=None, connection_string=None):
+        '''
+        Takes the same parameters as TableService, except for request_session.
+
+        :param aiohttp.ClientSession request_session:
+            The session object to use for http requests. If not specified, one
+            is created on first use and closed by close.
+        '''
+        super(AsyncTableService, self).__init__(
+            account_name=account_name,
+            account_key=account_key,
+            sas_token=sas_token,
+            is_emulated=is_emulated,
+            protocol=protocol,
+            endpoint_suffix=endpoint_suffix,
+            connection_string=connection_string)
+
+        self._use_async_transport(request_session)
+
+    async def list_tables(self, num_results=None, marker=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.table.tableservice.TableService.list_tables`.
+
+        :return: An async iterator which produces :class:`~azure.storage.table.models.Table` objects.
+        :rtype: :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+        '''
+        operation_context = _OperationContext(location_lock=True)
+        kwargs = {'max_results': num_results, 'marker': marker, 'timeout': timeout,
+                  '_context': operation_context}
+        resp = await self._list_tables(**kwargs)
+
+        return AsyncListGenerator(resp, self._list_tables, (), kwargs)
+
+    async def create_table(self, table_name, fail_on_exist=False, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.table.tableservice.TableService.create_table`.
+
+        :return:
+            A boolean indicating whether the table was created. If fail_on_exist
+            was set to True, this will throw instead of returning false.
+        :rtype: bool
+        '''
+        request = _create_table(table_name)
+        request.host_locations = self._get_host_locations()
+        request.query = {'timeout': _int_to_str(timeout)}
+
+        if not fail_on_exist:
+            try:
+                await self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_on_exist(ex)
+                return False
+        else:
+            await self._perform_request(request)
+            return True
+
+    async def exists(self, table_name, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.table.tableservice.TableService.exists`.
+
+        :return: A boolean indicating whether the table exists.
+        :rtype: bool
+        '''
+        request = _get_table(table_name)
+        request.host_locations = self._get_host_locations(secondary=True)
+        request.query = {'timeout': _int_to_str(timeout)}
+
+        try:
+            await self._perform_request(request)
+            return True
+        except AzureHttpError as ex:
+            _dont_fail_not_exist(ex)
+            return False
+
+    async def delete_table(self, table_name, fail_not_exist=False, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.table.tableservice.TableService.delete_table`.
+
+        :return:
+            A boolean indicating whether the table was deleted. If fail_not_exist
+            was set to True, this will throw instead of returning false.
+        :rtype: bool
+        '''
+        request = _delete_table(table_name)
+        request.host_locations = self._get_host_locations()
+        request.query = {'timeout': _int_to_str(timeout)}
+
+        if not fail_not_exist:
+            try:
+                await self._perform_request(request)
+                return True
+            except AzureHttpError as ex:
+                _dont_fail_not_exist(ex)
+                return False
+        else:
+            await self._perform_request(request)
+            return True
+
+    async def query_entities(self, table_name, filter=None, select=None, num_results=None,
+                             marker=None, accept=TablePayloadFormat.JSON_MINIMAL_METADATA,
+                             property_resolver=None, timeout=None):
+        '''
+        Async version of :func:`~azure.storage.table.tableservice.TableService.query_entities`.
+
+        :return: An async iterator which produces :class:`~azure.storage.table.models.Entity` objects.
+        :rtype: :class:`~azure.storage.asyncstorageclient.AsyncListGenerator`
+        '''
+        operation_context = _OperationContext(location_lock=True)
+        if self.key_encryption_key is not None or self.key_resolver_function is not None:
+            # If query already requests all properties, no need to add the metadata columns
+            if select is not None and select != '*':
+                select += ',_ClientEncryptionMetadata1,_ClientEncryptionMetadata2'
+
+        args = (table_name,)
+        kwargs = {'filter': filter, 'select': select, 'max_results': num_results, 'marker': marker,
+                  'accept': accept, 'property_resolver': property_resolver, 'timeout': timeout,
+                  '_context': operation_context}
+        resp = await self._query_entities(*args, **kwargs)
+
+        return AsyncListGenerator(resp, self._query_entities, args, kwargs)
+
+    def batch(self, table_name, timeout=None):
+        '''
+        Creates a batch object which can be used as an async context manager.
+        Commits the batch on exit.
+
+        :param str table_name:
+            The name of the table to commit the batch to.
+        :param int timeout:
+            The server timeout, expressed in seconds.
+        '''
+        return _AsyncBatchContext(self, table_name, timeout)
+
+    def _perform_request(self, request, parser=None, parser_args=None, operation_context=None):
+        _update_storage_table_header(request)
+        return super(AsyncTableService, self)._perform_request(request, parser, parser_args, operation_context)
+
+
+class _AsyncBatchContext(object):
+    def __init__(self, service, table_name, timeout):
+        self._service = service
+        self._table_name = table_name
+        self._timeout = timeout
+        self._batch = TableBatch(service.require_encryption, service.key_encryption_key,
+                                 service.encryption_resolver_function)
+
+    async def __aenter__(self):
+        return self._batch
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # As with the synchronous batch, nothing is sent if the block raised
+        if exc_type is None:
+            await self._service.commit_batch(self._table_name, self._batch, timeout=self._timeout)
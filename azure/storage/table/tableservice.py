@@ -51,13 +51,9 @@ from .._deserialization import (
     _convert_xml_to_service_stats,
 )
 from ._serialization import (
-    _convert_table_to_json,
     _convert_batch_to_json,
     _update_storage_table_header,
     _get_entity_path,
-    _DEFAULT_ACCEPT_HEADER,
-    _DEFAULT_CONTENT_TYPE_HEADER,
-    _DEFAULT_PREFER_HEADER,
 )
 from ._deserialization import (
     _convert_json_response_to_entity,
@@ -71,6 +67,9 @@ from .._constants import (
     DEFAULT_PROTOCOL,
 )
 from ._request import (
+    _create_table,
+    _get_table,
+    _delete_table,
     _get_entity,
     _insert_entity,
     _update_entity,
@@ -415,7 +414,7 @@ class TableService(StorageClient):
         request.body = _get_request_body(
             _convert_service_properties_to_xml(logging, hour_metrics, minute_metrics, cors))
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def list_tables(self, num_results=None, marker=None, timeout=None):
         '''
@@ -504,18 +503,9 @@ class TableService(StorageClient):
             was set to True, this will throw instead of returning false.
         :rtype: bool
         '''
-        _validate_not_none('table', table_name)
-        request = HTTPRequest()
-        request.method = 'POST'
+        request = _create_table(table_name)
         request.host_locations = self._get_host_locations()
-        request.path = '/Tables'
         request.query = {'timeout': _int_to_str(timeout)}
-        request.headers = {
-            _DEFAULT_CONTENT_TYPE_HEADER[0]: _DEFAULT_CONTENT_TYPE_HEADER[1],
-            _DEFAULT_PREFER_HEADER[0]: _DEFAULT_PREFER_HEADER[1],
-            _DEFAULT_ACCEPT_HEADER[0]: _DEFAULT_ACCEPT_HEADER[1]
-        }
-        request.body = _get_request_body(_convert_table_to_json(table_name))
 
         if not fail_on_exist:
             try:
@@ -539,12 +529,8 @@ class TableService(StorageClient):
         :return: A boolean indicating whether the table exists.
         :rtype: bool
         '''
-        _validate_not_none('table_name', table_name)
-        request = HTTPRequest()
-        request.method = 'GET'
+        request = _get_table(table_name)
         request.host_locations = self._get_host_locations(secondary=True)
-        request.path = '/Tables' + "('" + table_name + "')"
-        request.headers = {'Accept': TablePayloadFormat.JSON_NO_METADATA}
         request.query = {'timeout': _int_to_str(timeout)}
 
         try:
@@ -577,13 +563,9 @@ class TableService(StorageClient):
             was set to True, this will throw instead of returning false.
         :rtype: bool
         '''
-        _validate_not_none('table_name', table_name)
-        request = HTTPRequest()
-        request.method = 'DELETE'
+        request = _delete_table(table_name)
         request.host_locations = self._get_host_locations()
-        request.path = '/Tables(\'' + _to_str(table_name) + '\')'
         request.query = {'timeout': _int_to_str(timeout)}
-        request.headers = {_DEFAULT_ACCEPT_HEADER[0]: _DEFAULT_ACCEPT_HEADER[1]}
 
         if not fail_not_exist:
             try:
@@ -659,7 +641,7 @@ class TableService(StorageClient):
         request.body = _get_request_body(
             _convert_signed_identifiers_to_xml(signed_identifiers))
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def query_entities(self, table_name, filter=None, select=None, num_results=None,
                        marker=None, accept=TablePayloadFormat.JSON_MINIMAL_METADATA,
@@ -1022,7 +1004,7 @@ class TableService(StorageClient):
         request.query['timeout'] = _int_to_str(timeout)
         request.path = _get_entity_path(table_name, partition_key, row_key)
 
-        self._perform_request(request)
+        return self._perform_request(request)
 
     def insert_or_replace_entity(self, table_name, entity, timeout=None):
         '''
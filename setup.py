@@ -70,4 +70,8 @@ setup(
         'python-dateutil',
         'requests',
     ] + (['futures'] if sys.version_info < (3,0) else []),
+    extras_require={
+        'async': ['aiohttp'],
+        'http2': ['httpx[http2]>=0.26'],
+    },
 )
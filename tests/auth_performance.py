@@ -0,0 +1,95 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import sys
+import timeit
+
+from azure.storage._auth import (
+    _StorageSharedKeyAuthentication,
+    _StorageTableSharedKeyAuthentication,
+)
+from azure.storage._common_conversion import _sign_string
+from azure.storage._constants import (
+    DEV_ACCOUNT_KEY,
+    DEV_ACCOUNT_NAME,
+)
+from azure.storage._http import HTTPRequest
+
+# Measures, on a single core, the requests signed per second with shared key
+# authentication for small queue and table requests, along with the rate of
+# signing a string with the key decoded on every call as _sign_string does.
+
+REPEAT = 5
+NUMBER = 20000
+
+
+def queue_request():
+    request = HTTPRequest()
+    request.method = 'POST'
+    request.path = '/devstoreaccount1/myqueue/messages'
+    request.query = {'visibilitytimeout': None, 'messagettl': None, 'timeout': '30'}
+    request.headers = {
+        'Content-Length': '88',
+        'x-ms-version': '2015-07-08',
+        'User-Agent': 'Azure-Storage/0.34.0 (Python CPython 3.6.0; Linux 4.4.0)',
+        'x-ms-client-request-id': '5c4f1d6e-5d3a-11e6-9d2a-0242ac110002',
+        'x-ms-date': 'Mon, 01 Aug 2016 00:00:00 GMT',
+    }
+    return request
+
+
+def table_request():
+    request = HTTPRequest()
+    request.method = 'POST'
+    request.path = '/devstoreaccount1/mytable'
+    request.headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json;odata=minimalmetadata',
+        'Prefer': 'return-no-content',
+        'Content-Length': '64',
+        'DataServiceVersion': '3.0;NetFx',
+        'MaxDataServiceVersion': '3.0',
+        'x-ms-version': '2015-07-08',
+        'User-Agent': 'Azure-Storage/0.34.0 (Python CPython 3.6.0; Linux 4.4.0)',
+        'x-ms-client-request-id': '5c4f1d6e-5d3a-11e6-9d2a-0242ac110002',
+        'x-ms-date': 'Mon, 01 Aug 2016 00:00:00 GMT',
+    }
+    return request
+
+
+def rate(function):
+    # The best of several runs, to discount other work on the machine
+    seconds = min(timeit.repeat(function, repeat=REPEAT, number=NUMBER))
+    return NUMBER / seconds
+
+
+def report(name, per_second):
+    sys.stdout.write('{0:<40}{1:>12,.0f} /s\n'.format(name, per_second))
+
+
+def main():
+    authentication = _StorageSharedKeyAuthentication(DEV_ACCOUNT_NAME, DEV_ACCOUNT_KEY)
+    table_authentication = _StorageTableSharedKeyAuthentication(DEV_ACCOUNT_NAME, DEV_ACCOUNT_KEY)
+    queue = queue_request()
+    table = table_request()
+    string_to_sign = 'POST\n\n\n88\n\n\n\n\n\n\n\n\nx-ms-date:Mon, 01 Aug 2016 00:00:00 GMT\n' \
+                     'x-ms-version:2015-07-08\n/devstoreaccount1/devstoreaccount1/myqueue/messages\ntimeout:30'
+
+    report('queue requests signed', rate(lambda: authentication.sign_request(queue)))
+    report('table requests signed', rate(lambda: table_authentication.sign_request(table)))
+    report('strings signed, key decoded per call', rate(lambda: _sign_string(DEV_ACCOUNT_KEY, string_to_sign)))
+    report('strings signed, key decoded once', rate(lambda: authentication._sign(string_to_sign)))
+
+if __name__ == '__main__':
+    main()
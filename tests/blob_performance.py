@@ -21,12 +21,19 @@ from azure.storage.blob import (
     PageBlobService,
     AppendBlobService,
 )
-import tests.settings_real as settings
+from tests.localstorage import LocalStorageServer
+
+try:
+    import tests.settings_real as settings
+except ImportError:
+    settings = None
 
 # Warning:
 # This script will take a while to run with everything enabled.
 # Edit the lists below to enable only the blob sizes and connection
 # counts that you are interested in.
+# Without tests/settings_real.py, the blobs are transferred to an in-process
+# stand-in for the service, listening on the ports of the storage emulator.
 
 # NAME, SIZE (MB), +ADD SIZE (B)
 LOCAL_BLOCK_BLOB_FILES = [
@@ -140,15 +147,22 @@ def process(service, blobs, counts):
             print('')
         print('')
 
-def main():
-    bbs = BlockBlobService(settings.STORAGE_ACCOUNT_NAME, settings.STORAGE_ACCOUNT_KEY)
-    pbs = PageBlobService(settings.STORAGE_ACCOUNT_NAME, settings.STORAGE_ACCOUNT_KEY)
-    abs = AppendBlobService(settings.STORAGE_ACCOUNT_NAME, settings.STORAGE_ACCOUNT_KEY)
-    service.create_container(CONTAINER_NAME)
+def run(create_service):
+    bbs = create_service(BlockBlobService)
+    pbs = create_service(PageBlobService)
+    abs = create_service(AppendBlobService)
+    bbs.create_container(CONTAINER_NAME)
 
     process(bbs, LOCAL_BLOCK_BLOB_FILES, CONNECTION_COUNTS)
     process(pbs, LOCAL_PAGE_BLOB_FILES, CONNECTION_COUNTS)
     process(abs, LOCAL_APPEND_BLOB_FILES, CONNECTION_COUNTS)
 
+def main():
+    if settings is None:
+        with LocalStorageServer():
+            run(lambda service_class: service_class(is_emulated=True))
+    else:
+        run(lambda service_class: service_class(settings.STORAGE_ACCOUNT_NAME, settings.STORAGE_ACCOUNT_KEY))
+
 if __name__ == '__main__':
     main()
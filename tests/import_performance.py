@@ -0,0 +1,77 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import os
+import subprocess
+import sys
+
+# Measures the time taken to import each service package in a new process, as
+# paid by short lived processes on every start, excluding the start of the
+# interpreter. Exits with an error if an import loads one of the modules which
+# are only loaded on first use, so it can guard against regressions.
+
+REPEAT = 10
+
+PACKAGES = ('azure.storage.blob', 'azure.storage.file', 'azure.storage.queue', 'azure.storage.table')
+
+# The modules loaded on first use: cryptography for client-side encryption,
+# asyncio for the async services and the HTTP/2 transport, and xml.sax, which
+# imports urllib.request and its dependencies, for escaping queue messages.
+DEFERRED_MODULES = ('cryptography', 'asyncio', 'xml.sax')
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT = '''
+import sys, time
+start = time.time()
+{0}
+seconds = time.time() - start
+loaded = [name for name in {1!r} if name in sys.modules]
+sys.stdout.write('{{0}} {{1}}'.format(seconds, ','.join(loaded)))
+'''
+
+
+def get_import_time(package):
+    '''
+    Returns the best time taken to import package in a new process, and the
+    deferred modules the import loaded.
+    '''
+    script = _SCRIPT.format('import ' + package, DEFERRED_MODULES)
+    env = dict(os.environ, PYTHONPATH=_ROOT)
+
+    best = None
+    loaded = []
+    for _ in range(REPEAT):
+        output = subprocess.check_output([sys.executable, '-c', script], env=env, cwd=_ROOT)
+        seconds, _, modules = output.decode('utf-8').partition(' ')
+        best = float(seconds) if best is None else min(best, float(seconds))
+        loaded = modules.split(',') if modules else []
+    return best, loaded
+
+
+def main():
+    failed = False
+    for package in PACKAGES:
+        seconds, loaded = get_import_time(package)
+        sys.stdout.write('{0:<30}{1:>10.1f} ms'.format(package, seconds * 1000))
+        if loaded:
+            failed = True
+            sys.stdout.write('  loaded {0}'.format(', '.join(loaded)))
+        sys.stdout.write('\n')
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1205 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+'''
+An in-process stand-in for the Blob, Queue and Table services, implementing
+the subset of the REST API the service clients of this package call, so
+transfers, retries and concurrency can be exercised without a network or an
+account. By default it listens on the ports of the storage emulator, so that
+services created with is_emulated=True use it:
+
+    with LocalStorageServer():
+        service = BlockBlobService(is_emulated=True)
+
+Tests should rather pass port 0 for each service, so that free ports are
+chosen, and create services from the server's connection string:
+
+    with LocalStorageServer(0, 0, 0) as server:
+        service = server.create_service(BlockBlobService)
+
+Authentication, leases, snapshots, copies, ACLs and service properties are
+not implemented. Requests for them fail with 501 Not Implemented.
+'''
+import base64
+import calendar
+import hashlib
+import json
+import re
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from xml.etree import ElementTree as ETree
+from xml.sax.saxutils import escape
+
+if sys.version_info >= (3,):
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, quote, unquote, urlparse
+else:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib import quote, unquote
+    from urlparse import parse_qsl, urlparse
+
+from azure.storage._constants import (
+    DEV_ACCOUNT_KEY,
+    DEV_ACCOUNT_NAME,
+    DEV_BLOB_HOST,
+    DEV_QUEUE_HOST,
+    DEV_TABLE_HOST,
+)
+
+_PAGE_SIZE = 512
+_DEFAULT_MESSAGE_TTL = 7 * 24 * 60 * 60
+_RANGE_HEADER = re.compile(r'bytes=(\d+)-(\d*)$')
+_ENTITY_PATH = re.compile(r"^(\w+)\(PartitionKey='(.*)',RowKey='(.*)'\)$")
+_TABLE_PATH = re.compile(r"^Tables(?:\('(\w+)'\))?$")
+_FILTER_TERM = re.compile(r"(\w+)\s+(eq|ne|gt|ge|lt|le)\s+"
+                          r"((?:datetime|guid|X)?'(?:[^']|'')*'|[^\s()]+)")
+_FILTER_REST = re.compile(r'^[\s()]*(?:and[\s()]*)*$')
+
+_BLOB_CONTENT_HEADERS = OrderedDict([
+    ('x-ms-blob-content-type', 'Content-Type'),
+    ('x-ms-blob-content-encoding', 'Content-Encoding'),
+    ('x-ms-blob-content-language', 'Content-Language'),
+    ('x-ms-blob-content-disposition', 'Content-Disposition'),
+    ('x-ms-blob-cache-control', 'Cache-Control'),
+    ('x-ms-blob-content-md5', 'Content-MD5'),
+])
+
+
+def _port(host):
+    return int(host.split(':')[1])
+
+
+def _to_rfc1123(value):
+    return formatdate(calendar.timegm(value.utctimetuple()), usegmt=True)
+
+
+def _to_iso8601(value):
+    # The table service keeps seven digits of fractional seconds
+    return value.strftime('%Y-%m-%dT%H:%M:%S.%f') + '0Z'
+
+
+def _md5(data):
+    return base64.b64encode(hashlib.md5(data).digest()).decode('utf-8')
+
+
+class _StorageError(Exception):
+    def __init__(self, status, code, message=None):
+        self.status = status
+        self.code = code
+        self.message = message or code
+        super(_StorageError, self).__init__(self.message)
+
+
+class _Clock(object):
+    '''
+    Hands out strictly increasing times, so two writes in the same microsecond
+    still get different ETags.
+    '''
+
+    def __init__(self):
+        self._last = datetime.utcnow()
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            now = datetime.utcnow()
+            if now <= self._last:
+                now = self._last + timedelta(microseconds=1)
+            self._last = now
+            return now
+
+
+class _Backend(object):
+    '''
+    The state of one service. dispatch is called for each request with the
+    path below the account and returns the status, headers and body of the
+    response.
+    '''
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.lock = threading.RLock()
+        self._etag = 0
+
+    def new_etag(self):
+        self._etag += 1
+        return '"0x{0:X}"'.format(0x8D3C0000000000 + self._etag)
+
+    def dispatch(self, method, path, query, headers, body):
+        raise NotImplementedError()
+
+    def error_response(self, error):
+        if error.status == 304:
+            return 304, {}, b''
+        body = '<?xml version="1.0" encoding="utf-8"?><Error><Code>{0}</Code><Message>{1}</Message></Error>' \
+            .format(error.code, escape(error.message)).encode('utf-8')
+        return error.status, {'Content-Type': 'application/xml', 'x-ms-error-code': error.code}, body
+
+
+#--Blob service----------------------------------------------------------------
+
+class _Blob(object):
+    def __init__(self, blob_type):
+        self.blob_type = blob_type
+        self.exists = False
+        self.content = bytearray()
+        self.metadata = {}
+        self.properties = {}
+        self.etag = None
+        self.last_modified = None
+
+        # Block blobs keep the id, offset and size of each committed block
+        self.committed = []
+        self.uncommitted = OrderedDict()
+
+        # Page blobs keep the indices of the pages written
+        self.pages = set()
+        self.sequence_number = 0
+
+        # Append blobs count the blocks appended
+        self.block_count = 0
+
+
+class _BlobBackend(_Backend):
+    def __init__(self, clock):
+        _Backend.__init__(self, clock)
+        self.containers = {}
+
+    def dispatch(self, method, path, query, headers, body):
+        container_name, _, blob_name = path.partition('/')
+        if 'snapshot' in query:
+            raise _StorageError(501, 'NotImplemented', 'Snapshots are not supported.')
+
+        with self.lock:
+            if not container_name:
+                raise _StorageError(501, 'NotImplemented')
+            if not blob_name:
+                return self._container_operation(method, container_name, query, headers)
+            return self._blob_operation(method, container_name, blob_name, query, headers, body)
+
+    #--Containers--------------------------------------------------------------
+    def _get_container(self, name):
+        container = self.containers.get(name)
+        if container is None:
+            raise _StorageError(404, 'ContainerNotFound', 'The specified container does not exist.')
+        return container
+
+    def _container_operation(self, method, name, query, headers):
+        if query.get('restype') != 'container':
+            raise _StorageError(501, 'NotImplemented')
+        comp = query.get('comp')
+
+        if method == 'PUT' and comp is None:
+            if name in self.containers:
+                raise _StorageError(409, 'ContainerAlreadyExists', 'The specified container already exists.')
+            self.containers[name] = {
+                'blobs': {},
+                'metadata': _get_metadata(headers),
+                'etag': self.new_etag(),
+                'last_modified': self.clock.now(),
+            }
+            return 201, self._container_headers(self.containers[name]), b''
+
+        container = self._get_container(name)
+        if method == 'DELETE' and comp is None:
+            del self.containers[name]
+            return 202, {}, b''
+        if method in ('GET', 'HEAD') and comp in (None, 'metadata'):
+            response_headers = self._container_headers(container)
+            response_headers.update(_metadata_headers(container['metadata']))
+            return 200, response_headers, b''
+        if method == 'PUT' and comp == 'metadata':
+            container['metadata'] = _get_metadata(headers)
+            container['etag'] = self.new_etag()
+            container['last_modified'] = self.clock.now()
+            return 200, self._container_headers(container), b''
+        if method == 'GET' and comp == 'list':
+            return self._list_blobs(name, container, query)
+        raise _StorageError(501, 'NotImplemented')
+
+    def _container_headers(self, container):
+        return {'ETag': container['etag'], 'Last-Modified': _to_rfc1123(container['last_modified'])}
+
+    def _list_blobs(self, container_name, container, query):
+        prefix = query.get('prefix', '')
+        marker = query.get('marker', '')
+        max_results = int(query.get('maxresults', 5000))
+        include_metadata = 'metadata' in query.get('include', '').split(',')
+
+        names = sorted(name for name, blob in container['blobs'].items()
+                       if blob.exists and name.startswith(prefix) and name >= marker)
+        next_marker = names[max_results] if len(names) > max_results else ''
+
+        parts = ['<?xml version="1.0" encoding="utf-8"?>',
+                 '<EnumerationResults ContainerName="{0}">'.format(escape(container_name)),
+                 '<Prefix>{0}</Prefix><Marker>{1}</Marker><MaxResults>{2}</MaxResults><Blobs>'
+                     .format(escape(prefix), escape(marker), max_results)]
+        for name in names[:max_results]:
+            blob = container['blobs'][name]
+            parts.append('<Blob><Name>{0}</Name><Properties>'.format(escape(name)))
+            parts.append('<Last-Modified>{0}</Last-Modified><Etag>{1}</Etag>'
+                         '<Content-Length>{2}</Content-Length><BlobType>{3}</BlobType>'
+                         .format(_to_rfc1123(blob.last_modified), blob.etag, len(blob.content), blob.blob_type))
+            for header, value in blob.properties.items():
+                parts.append('<{0}>{1}</{0}>'.format(header, escape(value)))
+            parts.append('</Properties>')
+            if include_metadata:
+                parts.append('<Metadata>')
+                for key, value in blob.metadata.items():
+                    parts.append('<{0}>{1}</{0}>'.format(key, escape(value)))
+                parts.append('</Metadata>')
+            parts.append('</Blob>')
+        parts.append('</Blobs><NextMarker>{0}</NextMarker></EnumerationResults>'.format(escape(next_marker)))
+        return 200, {'Content-Type': 'application/xml'}, ''.join(parts).encode('utf-8')
+
+    #--Blobs-------------------------------------------------------------------
+    def _get_blob(self, container, name):
+        blob = container['blobs'].get(name)
+        if blob is None or not blob.exists:
+            raise _StorageError(404, 'BlobNotFound', 'The specified blob does not exist.')
+        return blob
+
+    def _blob_operation(self, method, container_name, name, query, headers, body):
+        container = self._get_container(container_name)
+        comp = query.get('comp')
+        blob = container['blobs'].get(name)
+
+        if method in ('GET', 'HEAD'):
+            if comp == 'blocklist':
+                return self._get_block_list(blob, query)
+            blob = self._get_blob(container, name)
+            _check_conditions(blob, headers, read=True)
+            if comp == 'pagelist':
+                return self._get_page_ranges(blob, headers)
+            if comp == 'metadata':
+                response_headers = self._blob_headers(blob)
+                response_headers.update(_metadata_headers(blob.metadata))
+                return 200, response_headers, b''
+            if comp is None:
+                return self._get_blob_content(method, blob, headers)
+
+        elif method == 'PUT':
+            _validate_md5(headers, body)
+            if comp is None:
+                return self._put_blob(container, name, blob, headers, body)
+            if comp == 'block':
+                return self._put_block(container, name, blob, query, body)
+            if comp == 'blocklist':
+                return self._put_block_list(container, name, blob, headers, body)
+
+            blob = self._get_blob(container, name)
+            _check_conditions(blob, headers)
+            if comp == 'page':
+                return self._put_page(blob, headers, body)
+            if comp == 'appendblock':
+                return self._append_block(blob, headers, body)
+            if comp == 'metadata':
+                blob.metadata = _get_metadata(headers)
+                return 200, self._touch(blob), b''
+            if comp == 'properties':
+                return self._set_properties(blob, headers)
+
+        elif method == 'DELETE' and comp is None:
+            blob = self._get_blob(container, name)
+            _check_conditions(blob, headers)
+            del container['blobs'][name]
+            return 202, {}, b''
+
+        raise _StorageError(501, 'NotImplemented')
+
+    def _touch(self, blob):
+        blob.etag = self.new_etag()
+        blob.last_modified = self.clock.now()
+        return self._blob_headers(blob)
+
+    def _blob_headers(self, blob):
+        response_headers = {
+            'ETag': blob.etag,
+            'Last-Modified': _to_rfc1123(blob.last_modified),
+            'x-ms-blob-type': blob.blob_type,
+        }
+        if blob.blob_type == 'PageBlob':
+            response_headers['x-ms-blob-sequence-number'] = str(blob.sequence_number)
+        elif blob.blob_type == 'AppendBlob':
+            response_headers['x-ms-blob-committed-block-count'] = str(blob.block_count)
+        return response_headers
+
+    def _put_blob(self, container, name, blob, headers, body):
+        _check_conditions(blob if blob is not None and blob.exists else None, headers)
+
+        blob_type = headers.get('x-ms-blob-type')
+        if blob_type not in ('BlockBlob', 'PageBlob', 'AppendBlob'):
+            raise _StorageError(400, 'InvalidHeaderValue', 'x-ms-blob-type is invalid.')
+
+        blob = _Blob(blob_type)
+        if blob_type == 'BlockBlob':
+            blob.content = bytearray(body)
+            blob.properties['Content-MD5'] = _md5(body)
+        elif blob_type == 'PageBlob':
+            size = int(headers.get('x-ms-blob-content-length', 0))
+            if size % _PAGE_SIZE:
+                raise _StorageError(400, 'InvalidHeaderValue', 'The page blob size must be a multiple of 512.')
+            blob.content = bytearray(size)
+            blob.sequence_number = int(headers.get('x-ms-blob-sequence-number', 0))
+
+        blob.exists = True
+        blob.metadata = _get_metadata(headers)
+        blob.properties.update(_get_content_settings(headers))
+        container['blobs'][name] = blob
+        return 201, self._touch(blob), b''
+
+    def _set_properties(self, blob, headers):
+        # Content settings which are not given are cleared, as by the service
+        content_md5 = blob.properties.get('Content-MD5')
+        blob.properties = _get_content_settings(headers)
+        if blob.blob_type == 'BlockBlob' and 'Content-MD5' not in blob.properties and content_md5:
+            blob.properties['Content-MD5'] = content_md5
+
+        if blob.blob_type == 'PageBlob' and 'x-ms-blob-content-length' in headers:
+            size = int(headers['x-ms-blob-content-length'])
+            if size % _PAGE_SIZE:
+                raise _StorageError(400, 'InvalidHeaderValue', 'The page blob size must be a multiple of 512.')
+            if size < len(blob.content):
+                del blob.content[size:]
+                blob.pages = set(page for page in blob.pages if page < size // _PAGE_SIZE)
+            else:
+                blob.content.extend(bytearray(size - len(blob.content)))
+        return 200, self._touch(blob), b''
+
+    def _get_blob_content(self, method, blob, headers):
+        response_headers = self._blob_headers(blob)
+        response_headers.update(_metadata_headers(blob.metadata))
+        response_headers.update(blob.properties)
+        response_headers.setdefault('Content-Type', 'application/octet-stream')
+        response_headers['Accept-Ranges'] = 'bytes'
+
+        size = len(blob.content)
+        blob_range = _get_range(headers)
+        if blob_range is None:
+            response_headers['Content-Length'] = str(size)
+            body = bytes(blob.content) if method == 'GET' else b''
+            return 200, response_headers, body
+
+        start, end = blob_range
+        if start >= size:
+            raise _StorageError(416, 'InvalidRange', 'The range specified is invalid for the current size of the resource.')
+        end = size - 1 if end is None else min(end, size - 1)
+        body = bytes(blob.content[start:end + 1])
+
+        # The MD5 of the whole blob is not returned for a range, only that of
+        # the range when it is asked for
+        response_headers.pop('Content-MD5', None)
+        if headers.get('x-ms-range-get-content-md5') == 'true':
+            response_headers['Content-MD5'] = _md5(body)
+        response_headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(start, end, size)
+        response_headers['Content-Length'] = str(len(body))
+        return 206, response_headers, body if method == 'GET' else b''
+
+    #--Block blobs-------------------------------------------------------------
+    def _put_block(self, container, name, blob, query, body):
+        block_id = query.get('blockid')
+        if not block_id:
+            raise _StorageError(400, 'InvalidQueryParameterValue', 'The block id is missing.')
+
+        # Blocks may be staged before the blob exists
+        if blob is None:
+            blob = container['blobs'][name] = _Blob('BlockBlob')
+        elif blob.blob_type != 'BlockBlob':
+            raise _StorageError(409, 'InvalidBlobType', 'The blob type is invalid for this operation.')
+        blob.uncommitted[block_id] = bytes(body)
+        return 201, {}, b''
+
+    def _put_block_list(self, container, name, blob, headers, body):
+        if blob is not None and blob.blob_type != 'BlockBlob':
+            raise _StorageError(409, 'InvalidBlobType', 'The blob type is invalid for this operation.')
+        _check_conditions(blob if blob is not None and blob.exists else None, headers)
+        if blob is None:
+            blob = container['blobs'][name] = _Blob('BlockBlob')
+
+        committed = dict((block_id, (offset, size)) for block_id, offset, size in blob.committed)
+        content = bytearray()
+        blocks = []
+        for element in ETree.fromstring(body):
+            block_id = element.text
+            data = None
+            if element.tag in ('Uncommitted', 'Latest'):
+                data = blob.uncommitted.get(block_id)
+            if data is None and element.tag in ('Committed', 'Latest') and block_id in committed:
+                offset, size = committed[block_id]
+                data = blob.content[offset:offset + size]
+            if data is None:
+                raise _StorageError(400, 'InvalidBlockList', 'The specified block list is invalid.')
+
+            blocks.append((block_id, len(content), len(data)))
+            content.extend(data)
+
+        blob.exists = True
+        blob.content = content
+        blob.committed = blocks
+        blob.uncommitted = OrderedDict()
+        blob.metadata = _get_metadata(headers)
+        blob.properties = _get_content_settings(headers)
+        return 201, self._touch(blob), b''
+
+    def _get_block_list(self, blob, query):
+        if blob is None or blob.blob_type != 'BlockBlob':
+            raise _StorageError(404, 'BlobNotFound', 'The specified blob does not exist.')
+
+        # Both lists are returned, the one not asked for empty
+        list_type = query.get('blocklisttype', 'committed')
+        parts = ['<?xml version="1.0" encoding="utf-8"?><BlockList><CommittedBlocks>']
+        if list_type in ('committed', 'all'):
+            for block_id, offset, size in blob.committed:
+                parts.append('<Block><Name>{0}</Name><Size>{1}</Size></Block>'.format(block_id, size))
+        parts.append('</CommittedBlocks><UncommittedBlocks>')
+        if list_type in ('uncommitted', 'all'):
+            for block_id, data in blob.uncommitted.items():
+                parts.append('<Block><Name>{0}</Name><Size>{1}</Size></Block>'.format(block_id, len(data)))
+        parts.append('</UncommittedBlocks></BlockList>')
+
+        response_headers = {'Content-Type': 'application/xml'}
+        if blob.exists:
+            response_headers.update(self._blob_headers(blob))
+        return 200, response_headers, ''.join(parts).encode('utf-8')
+
+    #--Page blobs--------------------------------------------------------------
+    def _put_page(self, blob, headers, body):
+        if blob.blob_type != 'PageBlob':
+            raise _StorageError(409, 'InvalidBlobType', 'The blob type is invalid for this operation.')
+
+        blob_range = _get_range(headers)
+        if blob_range is None or blob_range[1] is None:
+            raise _StorageError(400, 'MissingRequiredHeader', 'A range is required.')
+        start, end = blob_range
+        if start % _PAGE_SIZE or (end + 1) % _PAGE_SIZE:
+            raise _StorageError(400, 'InvalidPageRange', 'The page range specified is invalid.')
+        if end >= len(blob.content):
+            raise _StorageError(416, 'InvalidPageRange', 'The page range specified is invalid.')
+
+        pages = range(start // _PAGE_SIZE, (end + 1) // _PAGE_SIZE)
+        if headers.get('x-ms-page-write') == 'clear':
+            blob.content[start:end + 1] = bytearray(end + 1 - start)
+            blob.pages.difference_update(pages)
+        else:
+            if len(body) != end + 1 - start:
+                raise _StorageError(400, 'InvalidHeaderValue', 'The body does not match the range.')
+            blob.content[start:end + 1] = body
+            blob.pages.update(pages)
+        return 201, self._touch(blob), b''
+
+    def _get_page_ranges(self, blob, headers):
+        if blob.blob_type != 'PageBlob':
+            raise _StorageError(409, 'InvalidBlobType', 'The blob type is invalid for this operation.')
+
+        first, last = 0, len(blob.content) // _PAGE_SIZE - 1
+        blob_range = _get_range(headers)
+        if blob_range is not None:
+            first = blob_range[0] // _PAGE_SIZE
+            if blob_range[1] is not None:
+                last = min(last, blob_range[1] // _PAGE_SIZE)
+
+        # Merge the pages written into contiguous ranges
+        ranges = []
+        for page in sorted(page for page in blob.pages if first <= page <= last):
+            if ranges and ranges[-1][1] == page - 1:
+                ranges[-1][1] = page
+            else:
+                ranges.append([page, page])
+
+        parts = ['<?xml version="1.0" encoding="utf-8"?><PageList>']
+        for start, end in ranges:
+            parts.append('<PageRange><Start>{0}</Start><End>{1}</End></PageRange>'
+                         .format(start * _PAGE_SIZE, (end + 1) * _PAGE_SIZE - 1))
+        parts.append('</PageList>')
+
+        response_headers = self._blob_headers(blob)
+        response_headers['Content-Type'] = 'application/xml'
+        response_headers['x-ms-blob-content-length'] = str(len(blob.content))
+        return 200, response_headers, ''.join(parts).encode('utf-8')
+
+    #--Append blobs------------------------------------------------------------
+    def _append_block(self, blob, headers, body):
+        if blob.blob_type != 'AppendBlob':
+            raise _StorageError(409, 'InvalidBlobType', 'The blob type is invalid for this operation.')
+
+        offset = len(blob.content)
+        max_size = headers.get('x-ms-blob-condition-maxsize')
+        if max_size is not None and offset + len(body) > int(max_size):
+            raise _StorageError(412, 'MaxBlobSizeConditionNotMet', 'The max blob size condition specified was not met.')
+        append_position = headers.get('x-ms-blob-condition-appendpos')
+        if append_position is not None and int(append_position) != offset:
+            raise _StorageError(412, 'AppendPositionConditionNotMet', 'The append position condition specified was not met.')
+
+        blob.content.extend(body)
+        blob.block_count += 1
+        response_headers = self._touch(blob)
+        response_headers['x-ms-blob-append-offset'] = str(offset)
+        return 201, response_headers, b''
+
+
+def _get_metadata(headers):
+    return dict((name[len('x-ms-meta-'):], value) for name, value in headers.items()
+                if name.startswith('x-ms-meta-'))
+
+
+def _metadata_headers(metadata):
+    return dict(('x-ms-meta-' + name, value) for name, value in metadata.items())
+
+
+def _get_content_settings(headers):
+    return dict((header, headers[name]) for name, header in _BLOB_CONTENT_HEADERS.items() if name in headers)
+
+
+def _get_range(headers):
+    value = headers.get('x-ms-range') or headers.get('range')
+    if value is None:
+        return None
+    match = _RANGE_HEADER.match(value)
+    if match is None:
+        raise _StorageError(400, 'InvalidHeaderValue', 'The range header is invalid.')
+    start, end = match.groups()
+    return int(start), int(end) if end else None
+
+
+def _validate_md5(headers, body):
+    expected = headers.get('content-md5')
+    if expected is not None and expected != _md5(body):
+        raise _StorageError(400, 'Md5Mismatch', 'The MD5 value specified in the request did not match the MD5 value calculated by the server.')
+
+
+def _check_conditions(resource, headers, read=False):
+    etag = resource.etag if resource is not None else None
+
+    if_match = headers.get('if-match')
+    if if_match is not None and (etag is None or if_match not in ('*', etag)):
+        raise _StorageError(412, 'ConditionNotMet', 'The condition specified using HTTP conditional header(s) is not met.')
+
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None and etag is not None and if_none_match in ('*', etag):
+        if read:
+            raise _StorageError(304, 'ConditionNotMet', 'The condition specified using HTTP conditional header(s) is not met.')
+        if if_none_match == '*':
+            raise _StorageError(409, 'BlobAlreadyExists', 'The specified blob already exists.')
+        raise _StorageError(412, 'ConditionNotMet', 'The condition specified using HTTP conditional header(s) is not met.')
+
+
+#--Queue service---------------------------------------------------------------
+
+class _Message(object):
+    def __init__(self, text, insertion_time, ttl, visibility_timeout):
+        self.id = str(uuid.uuid4())
+        self.text = text
+        self.insertion_time = insertion_time
+        self.expiration_time = insertion_time + timedelta(seconds=ttl)
+        self.time_next_visible = insertion_time + timedelta(seconds=visibility_timeout)
+        self.pop_receipt = None
+        self.dequeue_count = 0
+
+
+class _QueueBackend(_Backend):
+    def __init__(self, clock):
+        _Backend.__init__(self, clock)
+        self.queues = {}
+
+    def dispatch(self, method, path, query, headers, body):
+        parts = path.split('/')
+        if not parts[0] or len(parts) > 3 or (len(parts) > 1 and parts[1] != 'messages'):
+            raise _StorageError(501, 'NotImplemented')
+
+        with self.lock:
+            if len(parts) == 1:
+                return self._queue_operation(method, parts[0], query, headers)
+
+            messages = self._get_queue(parts[0])['messages']
+            self._remove_expired(messages)
+            if len(parts) == 2:
+                return self._messages_operation(method, messages, query, body)
+            return self._message_operation(method, messages, parts[2], query, body)
+
+    def _get_queue(self, name):
+        queue = self.queues.get(name)
+        if queue is None:
+            raise _StorageError(404, 'QueueNotFound', 'The specified queue does not exist.')
+        return queue
+
+    def _remove_expired(self, messages):
+        now = self.clock.now()
+        for message_id in [message.id for message in messages.values() if message.expiration_time <= now]:
+            del messages[message_id]
+
+    def _queue_operation(self, method, name, query, headers):
+        comp = query.get('comp')
+        if method == 'PUT' and comp is None:
+            metadata = _get_metadata(headers)
+            queue = self.queues.get(name)
+            if queue is not None:
+                if queue['metadata'] != metadata:
+                    raise _StorageError(409, 'QueueAlreadyExists', 'The specified queue already exists.')
+                return 204, {}, b''
+            self.queues[name] = {'metadata': metadata, 'messages': OrderedDict()}
+            return 201, {}, b''
+
+        queue = self._get_queue(name)
+        if method == 'DELETE' and comp is None:
+            del self.queues[name]
+            return 204, {}, b''
+        if method in ('GET', 'HEAD') and comp == 'metadata':
+            self._remove_expired(queue['messages'])
+            response_headers = _metadata_headers(queue['metadata'])
+            response_headers['x-ms-approximate-messages-count'] = str(len(queue['messages']))
+            return 200, response_headers, b''
+        if method == 'PUT' and comp == 'metadata':
+            queue['metadata'] = _get_metadata(headers)
+            return 204, {}, b''
+        raise _StorageError(501, 'NotImplemented')
+
+    def _messages_operation(self, method, messages, query, body):
+        now = self.clock.now()
+        if method == 'POST':
+            ttl = int(query.get('messagettl') or _DEFAULT_MESSAGE_TTL)
+            if ttl <= 0:
+                ttl = 100 * 365 * 24 * 60 * 60
+            message = _Message(_get_message_text(body), now, ttl, int(query.get('visibilitytimeout') or 0))
+            messages[message.id] = message
+            return 201, {}, b''
+
+        if method == 'DELETE':
+            messages.clear()
+            return 204, {}, b''
+
+        if method == 'GET':
+            count = int(query.get('numofmessages') or 1)
+            if not 1 <= count <= 32:
+                raise _StorageError(400, 'OutOfRangeQueryParameterValue', 'numofmessages must be between 1 and 32.')
+
+            visible = [message for message in messages.values() if message.time_next_visible <= now][:count]
+            peek = query.get('peekonly') == 'true'
+            if not peek:
+                visibility_timeout = int(query.get('visibilitytimeout') or 30)
+                for message in visible:
+                    message.pop_receipt = _new_pop_receipt()
+                    message.time_next_visible = now + timedelta(seconds=visibility_timeout)
+                    message.dequeue_count += 1
+
+            parts = ['<?xml version="1.0" encoding="utf-8"?><QueueMessagesList>']
+            for message in visible:
+                parts.append('<QueueMessage><MessageId>{0}</MessageId><InsertionTime>{1}</InsertionTime>'
+                             '<ExpirationTime>{2}</ExpirationTime>'
+                             .format(message.id, _to_rfc1123(message.insertion_time),
+                                     _to_rfc1123(message.expiration_time)))
+                if not peek:
+                    parts.append('<PopReceipt>{0}</PopReceipt><TimeNextVisible>{1}</TimeNextVisible>'
+                                 .format(message.pop_receipt, _to_rfc1123(message.time_next_visible)))
+                parts.append('<DequeueCount>{0}</DequeueCount><MessageText>{1}</MessageText></QueueMessage>'
+                             .format(message.dequeue_count, escape(message.text)))
+            parts.append('</QueueMessagesList>')
+            return 200, {'Content-Type': 'application/xml'}, ''.join(parts).encode('utf-8')
+
+        raise _StorageError(501, 'NotImplemented')
+
+    def _message_operation(self, method, messages, message_id, query, body):
+        message = messages.get(message_id)
+        if message is None:
+            raise _StorageError(404, 'MessageNotFound', 'The specified message does not exist.')
+        if query.get('popreceipt') != message.pop_receipt:
+            raise _StorageError(400, 'PopReceiptMismatch', 'The specified pop receipt did not match the pop receipt for a dequeued message.')
+
+        if method == 'DELETE':
+            del messages[message_id]
+            return 204, {}, b''
+
+        if method == 'PUT':
+            if body:
+                message.text = _get_message_text(body)
+            message.pop_receipt = _new_pop_receipt()
+            message.time_next_visible = self.clock.now() + timedelta(seconds=int(query.get('visibilitytimeout') or 0))
+            return 204, {'x-ms-popreceipt': message.pop_receipt,
+                         'x-ms-time-next-visible': _to_rfc1123(message.time_next_visible)}, b''
+
+        raise _StorageError(501, 'NotImplemented')
+
+
+def _get_message_text(body):
+    return ETree.fromstring(body).findtext('MessageText') or ''
+
+
+def _new_pop_receipt():
+    return base64.b64encode(uuid.uuid4().bytes).decode('utf-8')
+
+
+#--Table service---------------------------------------------------------------
+
+class _TableBackend(_Backend):
+    def __init__(self, clock, account_name):
+        _Backend.__init__(self, clock)
+        self.account_name = account_name
+        self.tables = {}
+
+    def error_response(self, error):
+        body = json.dumps({'odata.error': {'code': error.code,
+                                           'message': {'lang': 'en-US', 'value': error.message}}})
+        return error.status, {'Content-Type': 'application/json', 'x-ms-error-code': error.code}, body.encode('utf-8')
+
+    def dispatch(self, method, path, query, headers, body):
+        with self.lock:
+            if path == '$batch' and method == 'POST':
+                return self._batch(headers, body)
+
+            match = _TABLE_PATH.match(path)
+            if match is not None:
+                return self._table_operation(method, match.group(1), query, headers, body)
+
+            match = _ENTITY_PATH.match(path)
+            if match is not None:
+                table_name, partition_key, row_key = match.groups()
+                return self._entity_operation(method, table_name, (partition_key, row_key), query, headers, body)
+
+            table_name = path[:-2] if path.endswith('()') else path
+            if method == 'GET':
+                return self._query_entities(self._get_table(table_name), query, headers)
+            if method == 'POST':
+                return self._insert_entity(self._get_table(table_name), headers, body)
+            raise _StorageError(501, 'NotImplemented')
+
+    def _get_table(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            raise _StorageError(404, 'TableNotFound', 'The table specified does not exist.')
+        return table
+
+    #--Tables------------------------------------------------------------------
+    def _table_operation(self, method, name, query, headers, body):
+        if method == 'POST' and name is None:
+            name = json.loads(body.decode('utf-8'))['TableName']
+            if name in self.tables:
+                raise _StorageError(409, 'TableAlreadyExists', 'The table specified already exists.')
+            self.tables[name] = {}
+            return self._respond_with(201, {'TableName': name}, {}, headers)
+
+        if method == 'GET' and name is None:
+            names = sorted(table for table in self.tables if table >= query.get('NextTableName', ''))
+            top = int(query.get('$top') or 1000)
+            response_headers = {'Content-Type': 'application/json'}
+            if len(names) > top:
+                response_headers['x-ms-continuation-NextTableName'] = names[top]
+            body = {'value': [{'TableName': table} for table in names[:top]]}
+            return 200, response_headers, json.dumps(body).encode('utf-8')
+
+        self._get_table(name)
+        if method == 'GET':
+            return 200, {'Content-Type': 'application/json'}, json.dumps({'TableName': name}).encode('utf-8')
+        if method == 'DELETE':
+            del self.tables[name]
+            return 204, {}, b''
+        raise _StorageError(501, 'NotImplemented')
+
+    def _respond_with(self, status, content, response_headers, headers):
+        if headers.get('prefer') == 'return-no-content':
+            response_headers['Preference-Applied'] = 'return-no-content'
+            return 204, response_headers, b''
+        response_headers['Content-Type'] = 'application/json'
+        return status, response_headers, json.dumps(content).encode('utf-8')
+
+    #--Entities----------------------------------------------------------------
+    def _write(self, table, key, entity):
+        timestamp = _to_iso8601(self.clock.now())
+        entity = dict(entity)
+        entity['Timestamp'] = timestamp
+        entity['Timestamp@odata.type'] = 'Edm.DateTime'
+        entity['odata.etag'] = 'W/"datetime\'' + quote(timestamp) + '\'"'
+        table[key] = entity
+        return entity
+
+    def _insert_entity(self, table, headers, body):
+        entity = _parse_entity(body)
+        key = (entity.get('PartitionKey'), entity.get('RowKey'))
+        if key in table:
+            raise _StorageError(409, 'EntityAlreadyExists', 'The specified entity already exists.')
+        entity = self._write(table, key, entity)
+        return self._respond_with(201, entity, {'ETag': entity['odata.etag']}, headers)
+
+    def _entity_operation(self, method, table_name, key, query, headers, body):
+        table = self._get_table(table_name)
+        current = table.get(key)
+
+        if method == 'GET':
+            if current is None:
+                raise _StorageError(404, 'ResourceNotFound', 'The specified resource does not exist.')
+            entity = _format_entity(current, query.get('$select'), headers)
+            return 200, {'Content-Type': 'application/json', 'ETag': current['odata.etag']}, \
+                json.dumps(entity).encode('utf-8')
+
+        if_match = headers.get('if-match')
+        if if_match is not None:
+            if current is None:
+                raise _StorageError(404, 'ResourceNotFound', 'The specified resource does not exist.')
+            if if_match not in ('*', current['odata.etag']):
+                raise _StorageError(412, 'UpdateConditionNotSatisfied', 'The update condition specified in the request was not satisfied.')
+
+        if method == 'DELETE':
+            if if_match is None:
+                raise _StorageError(400, 'MissingRequiredHeader', 'If-Match is required.')
+            del table[key]
+            return 204, {}, b''
+
+        if method in ('PUT', 'MERGE'):
+            entity = _parse_entity(body)
+            entity['PartitionKey'], entity['RowKey'] = key
+            if method == 'MERGE' and current is not None:
+                merged = dict((name, value) for name, value in current.items() if not name.startswith('odata.'))
+                for name in [name for name in entity if name.endswith('@odata.type')]:
+                    merged.pop(name, None)
+                merged.update(entity)
+                entity = merged
+            entity = self._write(table, key, entity)
+            return 204, {'ETag': entity['odata.etag']}, b''
+
+        raise _StorageError(501, 'NotImplemented')
+
+    def _query_entities(self, table, query, headers):
+        conditions = _parse_filter(query.get('$filter'))
+        top = int(query.get('$top') or 1000)
+        start = (query.get('NextPartitionKey', ''), query.get('NextRowKey', ''))
+
+        keys = [key for key in sorted(table) if key >= start and _matches(table[key], conditions)]
+        response_headers = {'Content-Type': 'application/json'}
+        if len(keys) > top:
+            response_headers['x-ms-continuation-NextPartitionKey'] = keys[top][0]
+            response_headers['x-ms-continuation-NextRowKey'] = keys[top][1]
+
+        body = {'value': [_format_entity(table[key], query.get('$select'), headers) for key in keys[:top]]}
+        return 200, response_headers, json.dumps(body).encode('utf-8')
+
+    #--Batches-----------------------------------------------------------------
+    def _batch(self, headers, body):
+        operations = _parse_batch(body)
+
+        # A batch either succeeds as a whole or changes nothing
+        snapshot = dict((name, dict(table)) for name, table in self.tables.items())
+        responses = []
+        for index, (content_id, method, path, sub_headers, sub_body) in enumerate(operations):
+            path = unquote(path).lstrip('/')
+            if path.startswith(self.account_name + '/'):
+                path = path[len(self.account_name) + 1:]
+            try:
+                status, response_headers, response_body = \
+                    self.dispatch(method, path, {}, sub_headers, sub_body)
+            except _StorageError as error:
+                self.tables = snapshot
+                error.message = '{0}:{1}'.format(index, error.message)
+                status, response_headers, response_body = self.error_response(error)
+                responses = [(content_id, status, response_headers, response_body)]
+                break
+            responses.append((content_id, status, response_headers, response_body))
+
+        batch_boundary = 'batchresponse_' + str(uuid.uuid4())
+        changeset_boundary = 'changesetresponse_' + str(uuid.uuid4())
+        parts = ['--{0}\r\nContent-Type: multipart/mixed; boundary={1}\r\n\r\n'
+                     .format(batch_boundary, changeset_boundary)]
+        for content_id, status, response_headers, response_body in responses:
+            parts.append('--{0}\r\nContent-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n'
+                         .format(changeset_boundary))
+            parts.append('HTTP/1.1 {0} {1}\r\n'.format(status, BaseHTTPRequestHandler.responses[status][0]))
+            if content_id is not None:
+                parts.append('Content-ID: {0}\r\n'.format(content_id))
+            for name, value in response_headers.items():
+                parts.append('{0}: {1}\r\n'.format(name, value))
+            parts.append('\r\n' + response_body.decode('utf-8') + '\r\n')
+        parts.append('--{0}--\r\n--{1}--\r\n'.format(changeset_boundary, batch_boundary))
+
+        response_headers = {'Content-Type': 'multipart/mixed; boundary=' + batch_boundary}
+        return 202, response_headers, ''.join(parts).encode('utf-8')
+
+
+def _parse_entity(body):
+    return dict((name, value) for name, value in json.loads(body.decode('utf-8')).items()
+                if not name.startswith('odata.'))
+
+
+def _format_entity(entity, select, headers):
+    no_metadata = 'nometadata' in headers.get('accept', '')
+    names = set(select.split(',')) if select else None
+
+    formatted = {}
+    for name, value in entity.items():
+        base_name = name.split('@', 1)[0]
+        if names is not None and base_name not in names and not name.startswith('odata.'):
+            continue
+        if no_metadata and (name.startswith('odata.') or name.endswith('@odata.type')):
+            continue
+        formatted[name] = value
+    return formatted
+
+
+def _parse_batch(body):
+    '''
+    Returns the content id, method, path, headers and body of each operation
+    of a changeset, as serialized by _convert_batch_to_json.
+    '''
+    text = body.decode('utf-8').replace('\r\n', '\n')
+    changeset_boundary = re.search(r'boundary=(changeset_[^\s;]+)', text).group(1)
+
+    operations = []
+    for part in text.split('--' + changeset_boundary)[1:]:
+        if part.startswith('--'):
+            break
+
+        # The part's own headers, then the request line, headers and body
+        _, _, request = part.lstrip('\n').partition('\n\n')
+        head, _, sub_body = request.partition('\n\n')
+        lines = head.split('\n')
+        method, path, _ = lines[0].split(' ')
+
+        sub_headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            sub_headers[name.strip().lower()] = value.strip()
+        operations.append((sub_headers.pop('content-id', None), method, path, sub_headers,
+                           sub_body.strip('\n').encode('utf-8')))
+    return operations
+
+
+def _parse_filter(text):
+    '''
+    Parses a filter made of comparisons joined by and. Other operators are
+    not supported.
+    '''
+    if not text:
+        return []
+
+    conditions = []
+    for match in _FILTER_TERM.finditer(text):
+        conditions.append((match.group(1), match.group(2), _parse_literal(match.group(3))))
+    if not _FILTER_REST.match(_FILTER_TERM.sub('', text)):
+        raise _StorageError(501, 'NotImplemented', 'Only comparisons joined by and are supported.')
+    return conditions
+
+
+def _parse_literal(text):
+    if text.endswith("'"):
+        return text[text.index("'") + 1:-1].replace("''", "'")
+    if text in ('true', 'false'):
+        return text == 'true'
+    if text.endswith('L'):
+        return int(text[:-1])
+    return float(text) if '.' in text else int(text)
+
+
+_COMPARISONS = {
+    'eq': lambda a, b: a == b,
+    'ne': lambda a, b: a != b,
+    'gt': lambda a, b: a > b,
+    'ge': lambda a, b: a >= b,
+    'lt': lambda a, b: a < b,
+    'le': lambda a, b: a <= b,
+}
+
+
+def _matches(entity, conditions):
+    for name, operator, literal in conditions:
+        if name not in entity:
+            return False
+        value = entity[name]
+        if entity.get(name + '@odata.type') == 'Edm.Int64':
+            value = int(value)
+
+        # Values of different types never compare equal, nor are ordered
+        if isinstance(value, bool) != isinstance(literal, bool) or \
+                isinstance(value, (int, float)) != isinstance(literal, (int, float)):
+            return False
+        if not _COMPARISONS[operator](value, literal):
+            return False
+    return True
+
+
+#--Server----------------------------------------------------------------------
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        headers = dict((name.lower(), value) for name, value in self.headers.items())
+
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        status, response_headers, response_body = \
+            self.server.storage._dispatch(self.server.service, self.command, unquote(url.path), query,
+                                          headers, body)
+
+        self.send_response(status)
+        self.send_header('x-ms-request-id', str(uuid.uuid4()))
+        self.send_header('x-ms-version', headers.get('x-ms-version', ''))
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        if 'Content-Length' not in response_headers:
+            self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+
+        if self.command != 'HEAD':
+            self.wfile.write(response_body)
+
+    do_GET = do_HEAD = do_PUT = do_POST = do_DELETE = do_MERGE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalStorageServer(object):
+    '''
+    Serves the Blob, Queue and Table services from memory on localhost, in
+    the path style of the storage emulator. See the module docstring.
+
+    :ivar dict request_counts:
+        The number of requests received by each service, keyed by blob, queue
+        and table.
+    '''
+
+    def __init__(self, blob_port=_port(DEV_BLOB_HOST), queue_port=_port(DEV_QUEUE_HOST),
+                 table_port=_port(DEV_TABLE_HOST), host='127.0.0.1'):
+        '''
+        :param int blob_port:
+            The port of the blob service. 0 picks a free port.
+        :param int queue_port:
+            The port of the queue service. 0 picks a free port.
+        :param int table_port:
+            The port of the table service. 0 picks a free port.
+        :param str host:
+            The address listened on.
+        '''
+        self.host = host
+        self.account_name = DEV_ACCOUNT_NAME
+        self.request_counts = {'blob': 0, 'queue': 0, 'table': 0}
+
+        clock = _Clock()
+        self._backends = {
+            'blob': _BlobBackend(clock),
+            'queue': _QueueBackend(clock),
+            'table': _TableBackend(clock, self.account_name),
+        }
+        self._ports = {'blob': blob_port, 'queue': queue_port, 'table': table_port}
+        self._servers = {}
+        self._failures = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        for service, port in self._ports.items():
+            server = _ThreadingHTTPServer((self.host, port), _RequestHandler)
+            server.storage = self
+            server.service = service
+            self._ports[service] = server.server_address[1]
+            self._servers[service] = server
+
+            thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def stop(self):
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers = {}
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def get_endpoint(self, service):
+        '''
+        :param str service:
+            blob, queue or table.
+        :return: The endpoint of the service, including the account name.
+        :rtype: str
+        '''
+        return 'http://{0}:{1}/{2}'.format(self.host, self._ports[service], self.account_name)
+
+    @property
+    def connection_string(self):
+        '''
+        A connection string for the development storage account at the ports
+        the server listens on.
+        '''
+        return 'DefaultEndpointsProtocol=http;AccountName={0};AccountKey={1};' \
+               'BlobEndpoint={2};QueueEndpoint={3};TableEndpoint={4};'.format(
+                   self.account_name, DEV_ACCOUNT_KEY, self.get_endpoint('blob'),
+                   self.get_endpoint('queue'), self.get_endpoint('table'))
+
+    def create_service(self, service_class, **kwargs):
+        '''
+        Creates a service client for the server.
+
+        :param type service_class:
+            The class of the service, for example BlockBlobService.
+        :param kwargs:
+            Other arguments of the service's constructor.
+        '''
+        return service_class(connection_string=self.connection_string, **kwargs)
+
+    def fail_requests(self, count, status=503, service=None):
+        '''
+        Fails the next requests without processing them, to exercise retries.
+
+        :param int count:
+            The number of requests to fail.
+        :param int status:
+            The status of the failed responses. 503 is returned with the
+            ServerBusy error code, other statuses with InternalError.
+        :param str service:
+            Only fail requests to this service, or to any if None.
+        '''
+        with self._lock:
+            self._failures.extend([(status, service)] * count)
+
+    def _take_failure(self, service):
+        with self._lock:
+            for index, (status, failed_service) in enumerate(self._failures):
+                if failed_service in (None, service):
+                    del self._failures[index]
+                    return status
+        return None
+
+    def _dispatch(self, service, method, path, query, headers, body):
+        with self._lock:
+            self.request_counts[service] += 1
+
+        backend = self._backends[service]
+        status = self._take_failure(service)
+        if status is not None:
+            code = 'ServerBusy' if status == 503 else 'InternalError'
+            return backend.error_response(_StorageError(status, code))
+
+        # The secondary endpoint of the emulator serves the same data
+        account, _, path = path.lstrip('/').partition('/')
+        if account not in (self.account_name, self.account_name + '-secondary'):
+            return backend.error_response(_StorageError(400, 'InvalidUri', 'The account name is not valid.'))
+
+        try:
+            return backend.dispatch(method, path, query, headers, body)
+        except _StorageError as error:
+            return backend.error_response(error)
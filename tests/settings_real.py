@@ -0,0 +1,44 @@
+﻿#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+
+# NOTE: these keys are fake, but valid base-64 data, they were generated using:
+# base64.b64encode(os.urandom(64))
+
+STORAGE_ACCOUNT_NAME = "storagename"
+STORAGE_ACCOUNT_KEY = "NzhL3hKZbJBuJ2484dPTR+xF30kYaWSSCbs2BzLgVVI1woqeST/1IgqaLm6QAOTxtGvxctSNbIR/1hW8yH+bJg=="
+REMOTE_STORAGE_ACCOUNT_NAME = "remotestoragename"
+REMOTE_STORAGE_ACCOUNT_KEY = "3pJwX7wjxoQEW2nKAhJZARpQWpKvPOUN9JwoV/HhlMmJlS1pORhzzHpPfQqgFcwGsriu6dwYqnugWOjGShC5VQ=="
+
+# Use instead of STORAGE_ACCOUNT_NAME and STORAGE_ACCOUNT_KEY if custom settings are needed
+CONNECTION_STRING = ""
+
+# Use 'https' or 'http' protocol for sending requests, 'https' highly recommended
+PROTOCOL = "https"
+
+# Set to true to target the development storage emulator
+IS_EMULATED = False
+
+# Decide which test mode to run against. Possible options:
+#   - Playback: run against stored recordings
+#   - Record: run tests against live storage and update recordings
+#   - RunLiveNoRecord: run tests against live storage without altering recordings
+TEST_MODE = 'Playback'
+
+# Set up proxy support
+USE_PROXY = False
+PROXY_HOST = "192.168.15.116"
+PROXY_PORT = "8118"
+PROXY_USER = ""
+PROXY_PASSWORD = ""
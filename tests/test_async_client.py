@@ -0,0 +1,262 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import sys
+import unittest
+
+from azure.common import AzureHttpError
+from azure.storage._http import (
+    HTTPRequest,
+    HTTPResponse,
+)
+from azure.storage.retry import LinearRetry
+from tests.testcase import StorageTestCase
+from tests.test_streamed_download import (
+    _ScriptedServer,
+    _blob_response,
+)
+
+try:
+    import asyncio
+    import aiohttp
+    from azure.storage._http.aiohttpclient import _AsyncHTTPClient
+    from azure.storage.blob import AsyncBlockBlobService
+    from azure.storage.queue import AsyncQueueService
+    from azure.storage.table import AsyncTableService
+except (ImportError, SyntaxError):
+    aiohttp = None
+
+#------------------------------------------------------------------------------
+
+_QUEUES_PAGE = b'''<?xml version="1.0" encoding="utf-8"?>
+<EnumerationResults ServiceEndpoint="https://account.queue.core.windows.net/">
+  <Queues><Queue><Name>{0}</Name></Queue></Queues>
+  <NextMarker>{1}</NextMarker>
+</EnumerationResults>'''
+
+
+class _FakeTransport(object):
+    '''
+    Stands in for the aiohttp transport, returning canned responses.
+    '''
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def perform_request(self, request, stream=False):
+        self.requests.append(request)
+        future = asyncio.Future()
+        future.set_result(self.responses.pop(0))
+        return future
+
+    def close(self):
+        future = asyncio.Future()
+        future.set_result(None)
+        return future
+
+
+@unittest.skipIf(aiohttp is None, 'The async clients require aiohttp and Python 3.5')
+class StorageAsyncClientTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageAsyncClientTest, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        return super(StorageAsyncClientTest, self).tearDown()
+
+    #--Helpers-----------------------------------------------------------------
+    def _create_service(self, service_class, responses):
+        service = service_class(self.settings.STORAGE_ACCOUNT_NAME, self.settings.STORAGE_ACCOUNT_KEY)
+        service._httpclient = _FakeTransport(responses)
+        return service
+
+    def _run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    #--Test cases -------------------------------------------------------------
+    def test_create_queue(self):
+        # Arrange
+        service = self._create_service(AsyncQueueService, [
+            HTTPResponse(201, 'Created', {}, b''),
+            HTTPResponse(204, 'No Content', {}, b''),
+        ])
+
+        # Act
+        created = self._run(service.create_queue('queue'))
+        created_again = self._run(service.create_queue('queue'))
+
+        # Assert
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(service._httpclient.requests[0].method, 'PUT')
+        self.assertEqual(service._httpclient.requests[0].path, '/queue')
+
+    def test_delete_queue_not_exist(self):
+        # Arrange
+        service = self._create_service(AsyncQueueService, [
+            HTTPResponse(404, 'Not Found', {}, b''),
+        ])
+
+        # Act
+        deleted = self._run(service.delete_queue('queue'))
+
+        # Assert
+        self.assertFalse(deleted)
+
+    def test_request_without_return_value_is_sent(self):
+        # Arrange
+        service = self._create_service(AsyncQueueService, [
+            HTTPResponse(204, 'No Content', {}, b''),
+        ])
+
+        # Act
+        self._run(service.clear_messages('queue'))
+
+        # Assert
+        self.assertEqual(len(service._httpclient.requests), 1)
+        self.assertEqual(service._httpclient.requests[0].method, 'DELETE')
+
+    def test_retry_waits_on_loop(self):
+        # Arrange
+        service = self._create_service(AsyncTableService, [
+            HTTPResponse(500, 'Internal Server Error', {}, b''),
+            HTTPResponse(200, 'OK', {}, b''),
+        ])
+        service.retry = LinearRetry(backoff=0, max_attempts=1).retry
+        retries = []
+        service.retry_callback = lambda context: retries.append(context.count)
+
+        # Act
+        exists = self._run(service.exists('table'))
+
+        # Assert
+        self.assertTrue(exists)
+        self.assertEqual(retries, [1])
+        self.assertEqual(len(service._httpclient.requests), 2)
+
+    def test_http_error_is_raised(self):
+        # Arrange
+        service = self._create_service(AsyncBlockBlobService, [
+            HTTPResponse(412, 'Precondition Failed', {}, b''),
+        ])
+
+        # Act
+        with self.assertRaises(AzureHttpError):
+            self._run(service.get_blob_properties('container', 'blob'))
+
+    def test_list_follows_continuation(self):
+        # Arrange
+        service = self._create_service(AsyncQueueService, [
+            HTTPResponse(200, 'OK', {}, _QUEUES_PAGE.replace(b'{0}', b'a').replace(b'{1}', b'marker')),
+            HTTPResponse(200, 'OK', {}, _QUEUES_PAGE.replace(b'{0}', b'b').replace(b'{1}', b'')),
+        ])
+
+        def collect(generator):
+            names = []
+            iterator = generator.__aiter__()
+            while True:
+                try:
+                    names.append(self._run(iterator.__anext__()).name)
+                except StopAsyncIteration:
+                    return names
+
+        # Act
+        names = collect(self._run(service.list_queues()))
+
+        # Assert
+        self.assertEqual(names, ['a', 'b'])
+        self.assertEqual(service._httpclient.requests[1].query['marker'], 'marker')
+
+    def test_run_chunks_limits_calls_in_flight(self):
+        # Arrange
+        service = self._create_service(AsyncBlockBlobService, [])
+        state = {'running': 0, 'max': 0}
+
+        def call(item):
+            state['running'] += 1
+            state['max'] = max(state['max'], state['running'])
+            future = asyncio.Future()
+
+            def complete():
+                state['running'] -= 1
+                future.set_result(item * 2)
+
+            self.loop.call_later(0.001, complete)
+            return future
+
+        # Act
+        results = self._run(service._run_chunks(call, range(20), 3))
+
+        # Assert
+        self.assertEqual(results, [i * 2 for i in range(20)])
+        self.assertEqual(state['max'], 3)
+
+    def _start_server(self, responses):
+        server = _ScriptedServer(responses)
+        server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def _create_request(self, server, method, body=b''):
+        request = HTTPRequest()
+        request.method = method
+        request.host = '127.0.0.1:{0}'.format(server.server_port)
+        request.path = '/container/blob'
+        request.query = {'comp': 'block', 'timeout': None}
+        request.headers = {'x-ms-version': '2015-07-08', 'x-ms-lease-id': None}
+        request.body = body
+        return request
+
+    def test_http_client_sends_request(self):
+        # Arrange
+        server = self._start_server([_blob_response(b'response', [('x-ms-Request-Id', 'id')])])
+        client = _AsyncHTTPClient('http', timeout=10)
+        request = self._create_request(server, 'PUT', memoryview(b'xxblockxx')[2:7])
+
+        # Act
+        response = self._run(client.perform_request(request))
+        self._run(client.close())
+
+        # Assert
+        method, path, headers, body = server.requests[0]
+        self.assertEqual(method, 'PUT')
+        self.assertEqual(path, '/container/blob?comp=block')
+        self.assertEqual(headers['x-ms-version'], '2015-07-08')
+        self.assertNotIn('x-ms-lease-id', headers)
+        self.assertEqual(body, b'block')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers['x-ms-request-id'], 'id')
+        self.assertEqual(response.body, b'response')
+
+    def test_http_client_timeout_applies_to_each_read(self):
+        # Arrange
+        data = b'x' * 4000
+        server = self._start_server([_blob_response(data, pause=0.4)])
+        client = _AsyncHTTPClient('http', timeout=1)
+
+        # Act
+        response = self._run(client.perform_request(self._create_request(server, 'GET')))
+        self._run(client.close())
+
+        # Assert
+        self.assertEqual(response.body, data)
+
+#------------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -50,6 +50,12 @@ from azure.storage._encryption import(
     _dict_to_encryption_data,
     _validate_and_unwrap_cek,
     _generate_AES_CBC_cipher,
+    _ExpiringCache,
+)
+from azure.storage._http import HTTPResponse
+from azure.storage.blob._encryption import(
+    _encrypt_blob,
+    _decrypt_blob,
 )
 from cryptography.hazmat.primitives.padding import PKCS7
 from azure.storage._common_conversion import _decode_base64_to_bytes
@@ -60,6 +66,16 @@ TEST_BLOB_PREFIXES = {'block_blob':'encryption_block_blob',
 FILE_PATH = 'blob_input.temp.dat'
 #------------------------------------------------------------------------------
 
+class _CountingKeyWrapper(KeyWrapper):
+    def __init__(self, kid='local:key1'):
+        KeyWrapper.__init__(self, kid)
+        self.unwrap_count = 0
+
+    def unwrap_key(self, key, algorithm):
+        self.unwrap_count += 1
+        return KeyWrapper.unwrap_key(self, key, algorithm)
+#------------------------------------------------------------------------------
+
 class StorageBlobEncryptionTest(StorageTestCase):
 
     def setUp(self):
@@ -705,6 +721,45 @@ class StorageBlobEncryptionTest(StorageTestCase):
         with open(FILE_PATH, 'rb') as stream:
             self.assertEqual(self.bytes, stream.read()) 
 
+    def test_decrypt_blob_unwraps_key_once(self):
+        # Arrange
+        kek = _CountingKeyWrapper('key1')
+        other_kek = _CountingKeyWrapper('key1')
+        encryption_data, encrypted = _encrypt_blob(self.bytes, kek)
+        headers = {'x-ms-meta-encryptiondata': encryption_data, 'x-ms-blob-type': 'BlockBlob'}
+        response = HTTPResponse(200, 'OK', headers, encrypted)
+
+        # Act
+        contents = [_decrypt_blob(True, kek, None, response, 0, 0) for i in range(3)]
+        other_content = _decrypt_blob(True, other_kek, None, response, 0, 0)
+        kek.kid = 'Invalid'
+        with self.assertRaises(ValueError):
+            _decrypt_blob(True, kek, None, response, 0, 0)
+
+        # Assert
+        self.assertEqual(contents, [self.bytes] * 3)
+        self.assertEqual(other_content, self.bytes)
+        self.assertEqual(kek.unwrap_count, 1)
+        self.assertEqual(other_kek.unwrap_count, 1)
+
+    def test_expiring_cache(self):
+        # Arrange
+        cache = _ExpiringCache(2, 60)
+        expired = _ExpiringCache(2, 0)
+
+        # Act
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        expired.put('a', 1)
+
+        # Assert
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertIsNone(expired.get('a'))
+
 #------------------------------------------------------------------------------
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
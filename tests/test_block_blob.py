@@ -15,9 +15,13 @@
 # limitations under the License.
 #--------------------------------------------------------------------------
 import os
+import threading
 import unittest
+from io import BytesIO
 
 from azure.common import AzureHttpError
+from azure.storage._common_conversion import _encode_base64
+from azure.storage._serialization import url_quote
 from azure.storage.blob import (
     BlobBlock,
     BlobBlockList,
@@ -459,6 +463,36 @@ class StorageBlockBlobTest(StorageTestCase):
         self.assertBlobEqual(self.container_name, blob_name, data)
         self.assert_upload_progress(len(data), self.bs.MAX_BLOCK_SIZE, progress)
 
+    def test_create_blob_from_path_reads_into_recycled_buffers(self):
+        # Arrange
+        blob_name = self._get_blob_reference()
+        data = self.get_random_bytes(LARGE_BLOB_SIZE)
+        with open(FILE_PATH, 'wb') as stream:
+            stream.write(data)
+
+        blocks = {}
+        buffers = set()
+        committed = []
+
+        def put_block(container_name, blob_name, block, block_id, **kwargs):
+            self.assertIsInstance(block, memoryview)
+            buffers.add(id(block.obj))
+            blocks[block_id] = block.tobytes()
+
+        def put_block_list(container_name, blob_name, block_list, **kwargs):
+            committed.extend(block_list)
+
+        self.bs._put_block = put_block
+        self.bs._put_block_list = put_block_list
+
+        # Act
+        self.bs.create_blob_from_path(self.container_name, blob_name, FILE_PATH,
+                                      max_connections=2)
+
+        # Assert
+        self.assertEqual(b''.join(blocks[block.id] for block in committed), data)
+        self.assertLessEqual(len(buffers), 2)
+
     def test_create_blob_from_path_with_properties(self):
         # parallel tests introduce random order of requests, can only run live
         if TestMode.need_recording_file(self.test_mode):
@@ -500,6 +534,119 @@ class StorageBlockBlobTest(StorageTestCase):
         # Assert
         self.assertBlobEqual(self.container_name, blob_name, data)
 
+    def test_create_blob_from_stream_parallel_reads_by_offset(self):
+        # Arrange
+        blob_name = self._get_blob_reference()
+        data = self.get_random_bytes(LARGE_BLOB_SIZE)
+        stream = BytesIO(b'skip' + data)
+        stream.seek(4)
+
+        readers = set()
+        readinto = stream.readinto
+
+        def record_reader(buffer):
+            readers.add(threading.current_thread())
+            return readinto(buffer)
+
+        stream.readinto = record_reader
+
+        blocks = {}
+        committed = []
+
+        def put_block(container_name, blob_name, block, block_id, **kwargs):
+            blocks[block_id] = bytes(block)
+
+        def put_block_list(container_name, blob_name, block_list, **kwargs):
+            committed.extend(block_list)
+
+        self.bs._put_block = put_block
+        self.bs._put_block_list = put_block_list
+
+        # Act
+        self.bs.create_blob_from_stream(self.container_name, blob_name, stream,
+                                        count=len(data), max_connections=2)
+
+        # Assert
+        self.assertEqual(b''.join(blocks[block.id] for block in committed), data)
+        self.assertNotIn(threading.current_thread(), readers)
+
+    def test_create_blob_from_stream_non_seekable_parallel_upload(self):
+        # Arrange
+        blob_name = self._get_blob_reference()
+        data = self.get_random_bytes(LARGE_BLOB_SIZE)
+        blocks = {}
+        committed = []
+
+        def put_block(container_name, blob_name, block, block_id, **kwargs):
+            blocks[block_id] = bytes(block)
+
+        def put_block_list(container_name, blob_name, block_list, **kwargs):
+            committed.extend(block_list)
+
+        self.bs._put_block = put_block
+        self.bs._put_block_list = put_block_list
+
+        # Act
+        non_seekable_file = StorageBlockBlobTest.NonSeekableFile(BytesIO(data))
+        self.bs.create_blob_from_stream(self.container_name, blob_name, non_seekable_file,
+                                        max_connections=3)
+
+        # Assert
+        self.assertEqual(b''.join(blocks[block.id] for block in committed), data)
+
+    def test_create_blob_from_path_resumes_from_checkpoint(self):
+        # Arrange
+        blob_name = self._get_blob_reference()
+        checkpoint_path = FILE_PATH + '.checkpoint'
+        data = self.get_random_bytes(LARGE_BLOB_SIZE)
+        with open(FILE_PATH, 'wb') as stream:
+            stream.write(data)
+
+        offsets = dict((url_quote(_encode_base64('{0:032d}'.format(offset))), offset)
+                       for offset in range(0, len(data), self.bs.MAX_BLOCK_SIZE))
+        uploaded = {}
+        puts = []
+        failing = [8 * self.bs.MAX_BLOCK_SIZE]
+        committed = []
+
+        def put_block(container_name, blob_name, block, block_id, **kwargs):
+            offset = offsets[block_id]
+            puts.append(offset)
+            if offset in failing:
+                failing.remove(offset)
+                raise AzureHttpError('Server busy', 503)
+            uploaded[offset] = bytes(block)
+
+        def get_block_list(container_name, blob_name, block_list_type=None, **kwargs):
+            block_list = BlobBlockList()
+            for offset, block in uploaded.items():
+                uncommitted = BlobBlock('{0:032d}'.format(offset))
+                uncommitted._set_size(len(block))
+                block_list.uncommitted_blocks.append(uncommitted)
+            return block_list
+
+        def put_block_list(container_name, blob_name, block_list, **kwargs):
+            committed.extend(offsets[block.id] for block in block_list)
+
+        self.bs._put_block = put_block
+        self.bs.get_block_list = get_block_list
+        self.bs._put_block_list = put_block_list
+
+        # Act
+        with self.assertRaises(AzureHttpError):
+            self.bs.create_blob_from_path(self.container_name, blob_name, FILE_PATH,
+                                          checkpoint_path=checkpoint_path)
+        first_attempt = set(uploaded)
+        del puts[:]
+        self.bs.create_blob_from_path(self.container_name, blob_name, FILE_PATH,
+                                      checkpoint_path=checkpoint_path)
+
+        # Assert
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assertTrue(first_attempt)
+        self.assertEqual(set(puts), set(offsets.values()) - first_attempt)
+        self.assertEqual(b''.join(uploaded[offset] for offset in committed), data)
+
     def test_create_blob_from_stream_non_seekable_chunked_upload_known_size(self):
         # parallel tests introduce random order of requests, can only run live
         if TestMode.need_recording_file(self.test_mode):
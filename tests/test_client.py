@@ -12,15 +12,62 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #--------------------------------------------------------------------------
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
 import unittest
+from datetime import datetime
+
+import requests
+from dateutil.tz import (
+    tzoffset,
+    tzutc,
+)
+
+from azure.storage import (
+    AdaptiveConcurrencyLimiter,
+    CloudStorageAccount,
+    EndpointHealthTracker,
+    LocationMode,
+    OperationMetrics,
+    RetryContext,
+    StorageMetrics,
+)
+from azure.storage.models import _OperationContext
 from azure.storage.blob import (
     BlockBlobService,
     PageBlobService,
     AppendBlobService,
+    HedgePolicy,
+    HedgeStats,
 )
 from azure.storage.queue import QueueService
 from azure.storage.table import TableService
 from azure.storage.file import FileService
+from azure.storage._auth import (
+    _StorageSharedKeyAuthentication,
+    _StorageTableSharedKeyAuthentication,
+)
+from azure.storage._common_conversion import (
+    _parse_date,
+    _sign_string,
+)
+from azure.storage._constants import DEV_ACCOUNT_KEY
+from azure.storage._http import HTTPRequest
+from azure.storage._serialization import (
+    _get_client_request_id,
+    _update_request,
+)
+from azure.storage._transfer import (
+    _BufferPool,
+    _ChunkSizer,
+    _RangeHedger,
+    _ReadAhead,
+    _get_chunk_sizer,
+)
 from tests.testcase import (
     StorageTestCase,
     record,
@@ -322,6 +369,487 @@ class StorageClientTest(StorageTestCase):
         exists = service.exists(name)
         self.assertTrue(exists)
 
+    def test_transfer_executor_limits_calls_in_flight(self):
+        # Arrange
+        service = BlockBlobService(self.account_name, self.account_key)
+        lock = threading.Lock()
+        counts = {'running': 0, 'max': 0}
+
+        def process(item):
+            with lock:
+                counts['running'] += 1
+                counts['max'] = max(counts['max'], counts['running'])
+            time.sleep(0.01)
+            with lock:
+                counts['running'] -= 1
+            return item * 2
+
+        # Act
+        results = service._transfer_executor.map(process, range(20), 3)
+        service.close()
+
+        # Assert
+        self.assertEqual(results, [i * 2 for i in range(20)])
+        self.assertLessEqual(counts['max'], 3)
+        self.assertIsNone(service._transfer_executor._executor)
+
+    def test_transfer_executor_stops_on_failure(self):
+        # Arrange
+        service = BlockBlobService(self.account_name, self.account_key)
+        processed = []
+
+        def process(item):
+            if item == 2:
+                raise ValueError('failed')
+            processed.append(item)
+
+        # Act
+        with self.assertRaises(ValueError):
+            service._transfer_executor.map(process, range(100), 2)
+        service.close()
+
+        # Assert
+        self.assertLess(len(processed), 99)
+
+    def test_close_during_transfer_in_other_thread(self):
+        # Arrange
+        service = BlockBlobService(self.account_name, self.account_key)
+        started = threading.Event()
+        results = []
+
+        def process(item):
+            started.set()
+            time.sleep(0.01)
+            return item
+
+        def transfer():
+            results.extend(service._transfer_executor.map(process, range(10), 2))
+
+        # Act
+        thread = threading.Thread(target=transfer)
+        thread.start()
+        started.wait()
+        service.close()
+        thread.join()
+
+        # Assert
+        self.assertEqual(results, list(range(10)))
+        self.assertIsNone(service._transfer_executor._executor)
+
+    def test_max_transfer_connections(self):
+        # Arrange
+        service = BlockBlobService(self.account_name, self.account_key)
+
+        # Act
+        service.max_transfer_connections = 5
+        service._transfer_executor.map(lambda item: item, range(10), 2)
+
+        # Assert
+        self.assertEqual(service._transfer_executor._executor._max_workers, 5)
+        service.close()
+
+    def test_account_services_share_connection_pool(self):
+        # Arrange
+        account = CloudStorageAccount(self.account_name, self.account_key)
+
+        # Act
+        block_blob_service = account.create_block_blob_service()
+        page_blob_service = account.create_page_blob_service()
+        file_service = account.create_file_service()
+        other_service = BlockBlobService(self.account_name, self.account_key)
+        session_service = BlockBlobService(self.account_name, self.account_key,
+                                           request_session=requests.Session())
+
+        # Assert
+        self.assertIs(page_blob_service.request_session, block_blob_service.request_session)
+        self.assertIs(file_service.request_session, block_blob_service.request_session)
+        self.assertIsNot(other_service.request_session, block_blob_service.request_session)
+        self.assertEqual(block_blob_service.connection_pool_stats.requests, 0)
+        self.assertIsNone(session_service.connection_pool_stats)
+
+    def test_max_transfer_connections_grows_connection_pool(self):
+        # Arrange
+        service = BlockBlobService(self.account_name, self.account_key)
+        adapter = service.request_session.get_adapter('https://')
+
+        # Act
+        service.max_transfer_connections = 100
+        service.max_transfer_connections = 8
+
+        # Assert
+        self.assertEqual(service.request_session.maxsize, 100)
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 100)
+
+    def test_buffer_pool_recycles_buffers(self):
+        # Arrange
+        pool = _BufferPool(16, 2)
+        first = pool.acquire()
+        second = pool.acquire()
+        acquired = []
+
+        # Act
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+        blocked = not acquired
+        pool.release(first)
+        waiter.join()
+
+        # Assert
+        self.assertTrue(blocked)
+        self.assertIs(acquired[0], first)
+        self.assertEqual(len(second), 16)
+
+    def test_read_ahead_limits_items_read(self):
+        # Arrange
+        read = []
+
+        def items():
+            for i in range(20):
+                read.append(i)
+                yield i
+
+        # Act
+        read_ahead = _ReadAhead(items(), 3)
+        iterator = iter(read_ahead)
+        first = next(iterator)
+        time.sleep(0.05)
+        read_early = len(read)
+        rest = list(iterator)
+        read_ahead.close()
+
+        # Assert
+        self.assertEqual([first] + rest, list(range(20)))
+        self.assertLessEqual(read_early, 5)
+
+    def test_read_ahead_close_discards_unread_items(self):
+        # Arrange
+        discarded = []
+
+        def items():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        # Act
+        read_ahead = _ReadAhead(items(), 2, discarded.append)
+        first = next(iter(read_ahead))
+        read_ahead.close()
+
+        # Assert
+        self.assertEqual(first, 0)
+        self.assertFalse(read_ahead._thread.is_alive())
+        self.assertEqual(discarded, list(range(1, len(discarded) + 1)))
+
+    def test_read_ahead_raises_reader_error(self):
+        # Arrange
+        def items():
+            yield 1
+            raise ValueError('failed')
+
+        # Act
+        read_ahead = _ReadAhead(items(), 2)
+        with self.assertRaises(ValueError):
+            list(read_ahead)
+        read_ahead.close()
+
+    def test_chunk_sizer_grows_and_shrinks_within_bounds(self):
+        # Arrange
+        sizer = _ChunkSizer(1024, 4096)
+
+        # Act
+        sizes = []
+        for seconds in [0.1, 0.1, 0.1, 2, 10, 10, 10, 10]:
+            sizer.record(sizer.size, seconds)
+            sizes.append(sizer.size)
+
+        # Assert
+        self.assertEqual(sizes, [2048, 4096, 4096, 4096, 2048, 1024, 512, 256])
+        sizer.record(256, 10)
+        self.assertEqual(sizer.size, 128)
+
+    def test_chunk_sizer_ignores_chunks_of_other_sizes(self):
+        # Arrange
+        sizer = _ChunkSizer(1024, 4096)
+
+        # Act
+        sizer.record(1024, 0.1)
+        sizer.record(1024, 0.1)
+        sizer.record(100, 10)
+
+        # Assert
+        self.assertEqual(sizer.size, 2048)
+
+    def test_chunk_sizer_limited_when_validating_content(self):
+        # Act
+        sizer = _get_chunk_sizer(4 * 1024 * 1024, True)
+        sizer.record(sizer.size, 0.1)
+
+        # Assert
+        self.assertEqual(sizer.size, 4 * 1024 * 1024)
+        self.assertEqual(_get_chunk_sizer(1024, False).max_size, 8 * 1024)
+
+    def test_range_hedger(self):
+        # Arrange
+        hedger = _RangeHedger(HedgePolicy(percentile=50, min_samples=2, min_delay=0.01), HedgeStats())
+        calls = []
+
+        def get_range(hedge):
+            calls.append(hedge)
+            if not hedge and len(calls) > 2:
+                # A straggler, slower than the ranges before it
+                time.sleep(1)
+            return hedge
+
+        # Act
+        first_delay = hedger.get_delay(1024)
+        results = [hedger.call(get_range, 1024) for _ in range(3)]
+
+        # Assert
+        self.assertIsNone(first_delay)
+        self.assertEqual(results, [False, False, True])
+        self.assertEqual(calls, [False, False, False, True])
+        self.assertLess(hedger.get_delay(1024), 1)
+        self.assertEqual((hedger.stats.ranges, hedger.stats.hedged, hedger.stats.hedges_won), (3, 1, 1))
+
+    def test_range_hedger_failures(self):
+        # Arrange
+        hedger = _RangeHedger(HedgePolicy(min_samples=1, min_delay=0.01), HedgeStats())
+        hedger.call(lambda hedge: None, 1024)
+
+        def get_range(hedge):
+            if not hedge:
+                time.sleep(0.1)
+                raise ValueError('first')
+            return 'second'
+
+        def fail(hedge):
+            time.sleep(0.05)
+            raise ValueError('second' if hedge else 'first')
+
+        # Act
+        result = hedger.call(get_range, 1024)
+        with self.assertRaises(ValueError) as context:
+            hedger.call(fail, 1024)
+
+        # Assert
+        self.assertEqual(result, 'second')
+        self.assertEqual(str(context.exception), 'first')
+
+    def test_concurrency_limiter(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=5)
+        host = 'account.blob.core.windows.net'
+
+        # Act
+        slots = [limiter.acquire(host) for _ in range(4)]
+        for slot in slots:
+            slot.release(503)
+        throttled_limit = limiter.get_limit(host)
+        for _ in range(20):
+            limiter.acquire(host).release(200)
+        for _ in range(3):
+            limiter.acquire(host).release(404)
+
+        # Assert
+        # The requests in flight when the limit was cut only cut it once
+        self.assertEqual(throttled_limit, 2)
+        self.assertEqual(limiter.get_limit(host), 5)
+        self.assertEqual(limiter.get_throttled(host), 4)
+        self.assertEqual(limiter.get_limit('other.blob.core.windows.net'), 4)
+
+    def test_concurrency_limiter_waits(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        host = 'account.blob.core.windows.net'
+        slot = limiter.acquire(host)
+        acquired = threading.Event()
+
+        def acquire():
+            limiter.acquire(host).release(200)
+            acquired.set()
+        thread = threading.Thread(target=acquire)
+        thread.start()
+
+        # Act
+        waited = not acquired.wait(0.2)
+        slot.release(200)
+        thread.join(5)
+
+        # Assert
+        self.assertTrue(waited)
+        self.assertTrue(acquired.is_set())
+
+    def test_health_tracker(self):
+        # Arrange
+        tracker = EndpointHealthTracker(min_requests=4, max_error_rate=0.5, max_latency=1, open_seconds=0.1)
+        primary, secondary = LocationMode.PRIMARY, LocationMode.SECONDARY
+
+        # Act
+        for status in (200, 503, None):
+            tracker._record(primary, status, 0.1)
+        opened_early = tracker.is_open(primary)
+        tracker._record(primary, 200, 2)
+        error_rate = tracker.get_error_rate(primary)
+        for status in (200, 200, 200, 500):
+            tracker._record(secondary, status, 0.1)
+
+        # Assert
+        self.assertFalse(opened_early)
+        self.assertEqual(error_rate, 0)
+        self.assertTrue(tracker.is_open(primary))
+        self.assertFalse(tracker.is_open(secondary))
+        self.assertEqual(tracker.get_error_rate(secondary), 0.25)
+        self.assertAlmostEqual(tracker.get_latency(secondary), 0.1)
+
+    def test_health_tracker_routes_reads(self):
+        # Arrange
+        service = BlockBlobService(self.settings.STORAGE_ACCOUNT_NAME, self.settings.STORAGE_ACCOUNT_KEY)
+        service.health_tracker = EndpointHealthTracker(min_requests=1, open_seconds=0.2)
+        service.health_tracker._record(LocationMode.PRIMARY, 503, 0.1)
+
+        def apply_host(secondary):
+            request = HTTPRequest()
+            request.host_locations = service._get_host_locations(secondary=secondary)
+            retry_context = RetryContext()
+            service._apply_host(request, _OperationContext(), retry_context)
+            return retry_context.location_mode
+
+        # Act
+        read = apply_host(True)
+        write = apply_host(False)
+        time.sleep(0.2)
+        probe = apply_host(True)
+        during_probe = apply_host(True)
+        service.health_tracker._record(LocationMode.PRIMARY, 200, 0.1)
+        closed = apply_host(True)
+
+        # Assert
+        self.assertEqual((read, write), (LocationMode.SECONDARY, LocationMode.PRIMARY))
+        self.assertEqual((probe, during_probe), (LocationMode.PRIMARY, LocationMode.SECONDARY))
+        self.assertEqual(closed, LocationMode.PRIMARY)
+        self.assertFalse(service.health_tracker.is_open(LocationMode.PRIMARY))
+
+    def test_metrics_latency_percentile(self):
+        # Arrange
+        metrics = StorageMetrics()
+        for latency in (0.001, 0.002, 0.003, 0.2):
+            recorder = metrics._start('get_blob')
+            recorder.started -= latency
+            recorder.end(True)
+
+        # Act
+        operation = metrics.snapshot().operations['get_blob']
+
+        # Assert
+        self.assertEqual(operation.count, 4)
+        self.assertEqual(operation.get_latency_percentile(50), 0.005)
+        self.assertEqual(operation.get_latency_percentile(75), 0.005)
+        self.assertEqual(operation.get_latency_percentile(100), 0.25)
+        self.assertIsNone(OperationMetrics().get_latency_percentile(50))
+
+    def test_import_defers_optional_modules(self):
+        # Arrange
+        script = 'import sys, azure.storage.blob, azure.storage.file, azure.storage.queue, ' \
+                 'azure.storage.table; sys.stdout.write(",".join(sorted(sys.modules)))'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        # Act
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=root,
+                                         env=dict(os.environ, PYTHONPATH=root))
+        modules = output.decode('utf-8').split(',')
+
+        # Assert
+        for deferred in ('cryptography', 'asyncio', 'xml.sax'):
+            self.assertNotIn(deferred, modules)
+
+    def test_parse_date(self):
+        # Act
+        header = _parse_date('Mon, 01 Aug 2016 01:02:03 GMT')
+        body = _parse_date('2016-08-01T01:02:03.1234567Z')
+        whole_seconds = _parse_date('2016-08-01T01:02:03Z')
+        offset = _parse_date('2016-08-01T01:02:03+01:00')
+
+        # Assert
+        self.assertEqual(header, datetime(2016, 8, 1, 1, 2, 3, tzinfo=tzutc()))
+        self.assertEqual(body, datetime(2016, 8, 1, 1, 2, 3, 123456, tzinfo=tzutc()))
+        self.assertEqual(whole_seconds, datetime(2016, 8, 1, 1, 2, 3, tzinfo=tzutc()))
+        self.assertEqual(offset, datetime(2016, 8, 1, 1, 2, 3, tzinfo=tzoffset(None, 3600)))
+        self.assertIs(_parse_date('Mon, 01 Aug 2016 01:02:03 GMT'), header)
+
+    def test_shared_key_signature(self):
+        # Arrange
+        authentication = _StorageSharedKeyAuthentication('account', DEV_ACCOUNT_KEY)
+        request = HTTPRequest()
+        request.method = 'PUT'
+        request.path = '/container/blob'
+        request.query = {'comp': 'block', 'blockid': 'MDA=', 'timeout': None}
+        request.headers = {'Content-Length': '0', 'Content-Type': 'text/plain', 'x-ms-version': '2015-07-08',
+                           'x-ms-date': 'Mon, 01 Aug 2016 00:00:00 GMT', 'x-ms-meta-empty': ''}
+        expected = 'PUT\n\n\n\n\ntext/plain\n\n\n\n\n\n\n' \
+                   'x-ms-date:Mon, 01 Aug 2016 00:00:00 GMT\nx-ms-meta-empty:\nx-ms-version:2015-07-08\n' \
+                   '/account/container/blob\nblockid:MDA=\ncomp:block'
+
+        # Act
+        authentication.sign_request(request)
+        signature = request.headers['Authorization']
+        authentication.account_key = 'a2V5'
+        authentication.sign_request(request)
+
+        # Assert
+        self.assertEqual(signature, 'SharedKey account:' + _sign_string(DEV_ACCOUNT_KEY, expected))
+        self.assertEqual(request.headers['Authorization'], 'SharedKey account:' + _sign_string('a2V5', expected))
+
+    def test_table_shared_key_signature(self):
+        # Arrange
+        authentication = _StorageTableSharedKeyAuthentication('account', DEV_ACCOUNT_KEY)
+        request = HTTPRequest()
+        request.method = 'GET'
+        request.path = '/Tables'
+        request.query = {'comp': 'properties', 'restype': 'service'}
+        request.headers = {'Content-Type': 'application/json', 'x-ms-date': 'Mon, 01 Aug 2016 00:00:00 GMT'}
+        expected = 'GET\n\napplication/json\nMon, 01 Aug 2016 00:00:00 GMT\n/account/Tables?comp=properties'
+
+        # Act
+        authentication.sign_request(request)
+
+        # Assert
+        self.assertEqual(request.headers['Authorization'],
+                         'SharedKey account:' + _sign_string(DEV_ACCOUNT_KEY, expected))
+
+    def test_client_request_id(self):
+        # Act
+        ids = [_get_client_request_id() for _ in range(1000)]
+
+        # Assert
+        self.assertEqual(len(set(ids)), 1000)
+        for request_id in ids:
+            self.assertTrue(re.match('^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', request_id))
+
+    def test_update_request(self):
+        # Arrange
+        http_requests = []
+        for _ in range(2):
+            request = HTTPRequest()
+            request.method = 'PUT'
+            request.host = '127.0.0.1:10000/devstoreaccount1'
+            request.path = u"/container/blob name \u00e9(1),'2'"
+            request.body = b'data'
+            http_requests.append(request)
+
+        # Act
+        for request in http_requests:
+            _update_request(request)
+
+        # Assert
+        for request in http_requests:
+            self.assertEqual(request.host, '127.0.0.1:10000')
+            self.assertEqual(request.path, "/devstoreaccount1/container/blob%20name%20%C3%A9(1),'2'")
+            self.assertEqual(request.headers['Content-Length'], '4')
+        self.assertNotEqual(http_requests[0].headers['x-ms-client-request-id'],
+                            http_requests[1].headers['x-ms-client-request-id'])
+
 #------------------------------------------------------------------------------
 if __name__ == '__main__':
     unittest.main()
@@ -19,6 +19,7 @@ import os
 import requests
 import sys
 import unittest
+from io import BytesIO
 from datetime import datetime, timedelta
 from azure.common import (
     AzureHttpError,
@@ -720,6 +721,28 @@ class StorageFileTest(StorageTestCase):
         # Assert
         self.assertFileEqual(self.share_name, None, file_name, data[:file_size])
 
+    def test_create_file_from_stream_non_seekable_parallel(self):
+        # Arrange
+        file_name = self._get_file_reference()
+        data = self.get_random_bytes(LARGE_FILE_SIZE)
+        ranges = {}
+
+        def update_range(share_name, directory_name, file_name, data, start_range, end_range,
+                         validate_content=False, timeout=None):
+            ranges[start_range] = data
+
+        self.fs.create_file = lambda *args, **kwargs: None
+        self.fs.update_range = update_range
+
+        # Act
+        non_seekable_file = StorageFileTest.NonSeekableFile(BytesIO(data))
+        self.fs.create_file_from_stream(self.share_name, None, file_name,
+                                        non_seekable_file, len(data), max_connections=2)
+
+        # Assert
+        self.assertEqual(b''.join(ranges[start] for start in sorted(ranges)), data)
+        self.assertEqual(len(ranges), (len(data) + self.fs.MAX_RANGE_SIZE - 1) // self.fs.MAX_RANGE_SIZE)
+
     def test_create_file_from_stream_with_progress(self):
         # parallel tests introduce random order of requests, can only run live
         if TestMode.need_recording_file(self.test_mode):
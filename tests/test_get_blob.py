@@ -16,8 +16,11 @@
 #--------------------------------------------------------------------------
 import base64
 import os
+import time
 import unittest
+from io import BytesIO
 
+from azure.common import AzureHttpError
 from azure.storage.blob import (
     Blob,
     BlockBlobService,
@@ -77,6 +80,35 @@ class StorageGetBlobTest(StorageTestCase):
     def _get_blob_reference(self):
         return self.get_resource_name(TEST_BLOB_PREFIX)
 
+    def _serve_ranges_out_of_order(self, data, failing=None, requested=None):
+        # Later ranges are returned sooner so the chunks complete out of order.
+        # Ranges starting at an offset in failing fail once.
+        writers = []
+
+        def get_blob(container_name, blob_name, snapshot=None, start_range=None,
+                     end_range=None, _stream_writer=None, **kwargs):
+            if requested is not None:
+                requested.append(start_range)
+            time.sleep(0.01 * (len(data) - start_range) / self.bs.MAX_CHUNK_GET_SIZE)
+            if failing and start_range in failing:
+                failing.remove(start_range)
+                raise AzureHttpError('Server busy', 503)
+            content = data[start_range:end_range + 1]
+            blob = Blob()
+            blob.properties.etag = '"etag"'
+            blob.properties.content_length = len(content)
+            blob.properties.content_range = 'bytes {0}-{1}/{2}'.format(
+                start_range, start_range + len(content) - 1, len(data))
+            writers.append(type(_stream_writer).__name__)
+            if _stream_writer is None:
+                blob.content = content
+            else:
+                _stream_writer.write(0, content)
+            return blob
+
+        self.bs._get_blob = get_blob
+        return writers
+
     class NonSeekableFile(object):
         def __init__(self, wrapped_file):
             self.wrapped_file = wrapped_file
@@ -313,6 +345,89 @@ class StorageGetBlobTest(StorageTestCase):
             self.assertEqual(self.byte_data, actual)
         self.assert_download_progress(len(self.byte_data), self.bs.MAX_CHUNK_GET_SIZE, self.bs.MAX_SINGLE_GET_SIZE, progress)
 
+    @unittest.skipIf(not hasattr(os, 'pwrite'), 'os.pwrite is not available')
+    def test_get_blob_to_path_writes_ranges_in_place(self):
+        # Arrange
+        data = self.get_random_bytes(self.bs.MAX_SINGLE_GET_SIZE + 8 * self.bs.MAX_CHUNK_GET_SIZE + 5)
+        writers = self._serve_ranges_out_of_order(data)
+        progress = []
+        def callback(current, total):
+            progress.append((current, total))
+
+        # Act
+        self.bs.get_blob_to_path(self.container_name, 'blob', FILE_PATH,
+                                 progress_callback=callback, max_connections=4)
+
+        # Assert
+        with open(FILE_PATH, 'rb') as stream:
+            self.assertEqual(stream.read(), data)
+        self.assertEqual(writers[1:], ['_RangeFileWriter'] * (len(writers) - 1))
+        self.assertEqual([current for current, total in progress],
+                         sorted(current for current, total in progress))
+        self.assertEqual(progress[-1], (len(data), len(data)))
+        self.assert_download_progress(len(data), self.bs.MAX_CHUNK_GET_SIZE, self.bs.MAX_SINGLE_GET_SIZE, progress)
+
+    @unittest.skipIf(not hasattr(os, 'pwrite'), 'os.pwrite is not available')
+    def test_get_blob_to_stream_writes_ranges_in_place(self):
+        # Arrange
+        data = self.get_random_bytes(self.bs.MAX_SINGLE_GET_SIZE + 8 * self.bs.MAX_CHUNK_GET_SIZE + 5)
+        self._serve_ranges_out_of_order(data)
+        with open(FILE_PATH, 'wb') as stream:
+            stream.write(b'head' + b'x' * (len(data) + 4))
+
+        # Act
+        with open(FILE_PATH, 'r+b') as stream:
+            stream.seek(4)
+            self.bs.get_blob_to_stream(self.container_name, 'blob', stream, max_connections=4)
+            stream.write(b'next')
+
+        # Assert
+        with open(FILE_PATH, 'rb') as stream:
+            self.assertEqual(stream.read(), b'head' + data + b'next')
+
+    def test_get_blob_to_stream_adaptive_chunk_size(self):
+        # Arrange
+        data = self.get_random_bytes(self.bs.MAX_SINGLE_GET_SIZE + 40 * self.bs.MAX_CHUNK_GET_SIZE + 5)
+        requested = []
+        self._serve_ranges_out_of_order(data, requested=requested)
+        self.bs.ADAPTIVE_CHUNK_SIZE = True
+        stream = BytesIO()
+
+        # Act
+        self.bs.get_blob_to_stream(self.container_name, 'blob', stream, max_connections=2)
+
+        # Assert
+        self.assertEqual(stream.getvalue(), data)
+        starts = sorted(requested)
+        sizes = [end - start for start, end in zip(starts[1:], starts[2:])]
+        self.assertEqual(sizes[0], self.bs.MAX_CHUNK_GET_SIZE)
+        self.assertEqual(max(sizes), 8 * self.bs.MAX_CHUNK_GET_SIZE)
+
+    def test_get_blob_to_path_resumes_from_checkpoint(self):
+        # Arrange
+        checkpoint_path = FILE_PATH + '.checkpoint'
+        data = self.get_random_bytes(self.bs.MAX_SINGLE_GET_SIZE + 8 * self.bs.MAX_CHUNK_GET_SIZE + 5)
+        failing = [self.bs.MAX_SINGLE_GET_SIZE + 6 * self.bs.MAX_CHUNK_GET_SIZE]
+        requested = []
+        self._serve_ranges_out_of_order(data, failing, requested)
+
+        # Act
+        with self.assertRaises(AzureHttpError):
+            self.bs.get_blob_to_path(self.container_name, 'blob', FILE_PATH,
+                                     max_connections=4, checkpoint_path=checkpoint_path)
+        first_attempt = set(requested)
+        del requested[:]
+        self.bs.get_blob_to_path(self.container_name, 'blob', FILE_PATH,
+                                 max_connections=4, checkpoint_path=checkpoint_path)
+
+        # Assert
+        with open(FILE_PATH, 'rb') as stream:
+            self.assertEqual(stream.read(), data)
+        self.assertFalse(os.path.exists(checkpoint_path))
+        self.assertIn(self.bs.MAX_SINGLE_GET_SIZE + 6 * self.bs.MAX_CHUNK_GET_SIZE, requested)
+        self.assertEqual(set(requested) & first_attempt,
+                         set([0, self.bs.MAX_SINGLE_GET_SIZE + 6 * self.bs.MAX_CHUNK_GET_SIZE]))
+
     @record
     def test_get_blob_to_path_non_parallel(self):
         # Arrange
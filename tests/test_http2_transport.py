@@ -0,0 +1,229 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import os
+import socket
+import threading
+import unittest
+
+from azure.storage.blob import BlockBlobService
+from azure.storage.retry import LinearRetry
+from tests.testcase import StorageTestCase
+
+try:
+    import httpx
+    import h2.config
+    import h2.connection
+    import h2.events
+    from azure.storage import HTTP2Transport
+except ImportError:
+    httpx = None
+
+#------------------------------------------------------------------------------
+
+class _H2Server(object):
+    '''
+    A local HTTP/2 server, spoken to with prior knowledge over plain tcp,
+    answering each request with respond(method, path, headers, body). The
+    number of connections accepted and the requests received are kept.
+    '''
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.connections = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._socket = socket.socket()
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(8)
+        self.port = self._socket.getsockname()[1]
+
+    def start(self):
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self._socket.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.connections += 1
+            thread = threading.Thread(target=self._serve, args=(sock,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, sock):
+        config = h2.config.H2Configuration(client_side=False, header_encoding='utf-8')
+        connection = h2.connection.H2Connection(config=config)
+        connection.initiate_connection()
+        sock.sendall(connection.data_to_send())
+
+        streams = {}
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                sock.close()
+                return
+
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    streams[event.stream_id] = (dict(event.headers), [])
+                elif isinstance(event, h2.events.DataReceived):
+                    streams[event.stream_id][1].append(event.data)
+                    connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    headers, body = streams.pop(event.stream_id)
+                    self._send_response(connection, event.stream_id, headers, b''.join(body))
+            sock.sendall(connection.data_to_send())
+
+    def _send_response(self, connection, stream_id, headers, body):
+        with self._lock:
+            self.requests.append((headers[':method'], headers[':path'], headers, body))
+        status, response_headers, response_body = \
+            self.respond(headers[':method'], headers[':path'], headers, body)
+
+        response_headers = [(':status', str(status)),
+                            ('content-length', str(len(response_body)))] + response_headers
+        connection.send_headers(stream_id, response_headers)
+
+        # Bodies are kept smaller than the flow control window
+        size = connection.max_outbound_frame_size
+        for start in range(0, len(response_body), size):
+            connection.send_data(stream_id, response_body[start:start + size])
+        connection.end_stream(stream_id)
+
+
+_BLOB_HEADERS = [
+    ('etag', '"0x8D3"'),
+    ('last-modified', 'Mon, 01 Aug 2016 00:00:00 GMT'),
+    ('x-ms-blob-type', 'BlockBlob'),
+]
+
+#------------------------------------------------------------------------------
+
+@unittest.skipIf(httpx is None, 'requires httpx and h2')
+class StorageHTTP2TransportTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageHTTP2TransportTest, self).setUp()
+        self.data = os.urandom(20000)
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        return super(StorageHTTP2TransportTest, self).tearDown()
+
+    #--Helpers-----------------------------------------------------------------
+    def _respond_with_blob(self, method, path, headers, body):
+        if method == 'PUT':
+            return 201, list(_BLOB_HEADERS), b''
+
+        if 'x-ms-range' not in headers:
+            return 200, list(_BLOB_HEADERS), self.data
+
+        start, end = headers['x-ms-range'].split('=')[1].split('-')
+        start, end = int(start), min(int(end), len(self.data) - 1)
+        content_range = 'bytes {0}-{1}/{2}'.format(start, end, len(self.data))
+        return 206, _BLOB_HEADERS + [('content-range', content_range)], self.data[start:end + 1]
+
+    def _start_server(self):
+        self.server = _H2Server(self._respond_with_blob)
+        self.server.start()
+        service = BlockBlobService('account', 'a2V5',
+                                   custom_domain='127.0.0.1:{0}'.format(self.server.port),
+                                   protocol='http')
+        service.retry = LinearRetry(backoff=0, max_attempts=1).retry
+
+        # Plain http only speaks HTTP/2 when the client knows the server does
+        session = httpx.AsyncClient(http1=False, http2=True, limits=httpx.Limits(max_connections=1))
+        service.transport = HTTP2Transport(session=session)
+        return service
+
+    #--Test cases -------------------------------------------------------------
+    def test_get_blob(self):
+        # Arrange
+        service = self._start_server()
+
+        # Act
+        blob = service.get_blob_to_bytes('container', 'blob', max_connections=1)
+
+        # Assert
+        self.assertEqual(blob.content, self.data)
+        self.assertEqual(blob.properties.etag, '"0x8D3"')
+        self.assertEqual(service.transport.protocol, 'http')
+        self.assertEqual(service.connection_pool_stats.requests, 1)
+        self.assertEqual(service.connection_pool_stats.opens, 1)
+
+    def test_parallel_ranges_share_connection(self):
+        # Arrange
+        service = self._start_server()
+        service.MAX_SINGLE_GET_SIZE = 1024
+        service.MAX_CHUNK_GET_SIZE = 1024
+
+        # Act
+        blob = service.get_blob_to_bytes('container', 'blob', max_connections=4)
+
+        # Assert
+        self.assertEqual(blob.content, self.data)
+        self.assertEqual(len(self.server.requests), 20)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_parallel_blocks_share_connection(self):
+        # Arrange
+        service = self._start_server()
+        service.MAX_SINGLE_PUT_SIZE = 1024
+        service.MAX_BLOCK_SIZE = 1024
+
+        # Act
+        service.create_blob_from_bytes('container', 'blob', self.data, max_connections=4)
+
+        # Assert
+        blocks = sorted((path, body) for method, path, headers, body in self.server.requests
+                        if 'comp=block&' in path)
+        self.assertEqual(len(blocks), 20)
+        self.assertEqual(sorted(len(body) for path, body in blocks), [544] + [1024] * 19)
+        self.assertTrue(self.server.requests[-1][1].endswith('comp=blocklist'))
+        self.assertEqual(self.server.connections, 1)
+
+    def test_streamed_response_decoded(self):
+        # Arrange
+        service = self._start_server()
+        stream = _CollectingStream()
+
+        # Act
+        service.get_blob_to_stream('container', 'blob', stream, max_connections=1)
+        service.close()
+
+        # Assert
+        self.assertEqual(b''.join(stream.pieces), self.data)
+        self.assertIsNotNone(service.transport.session)
+
+
+class _CollectingStream(object):
+    def __init__(self):
+        self.pieces = []
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+
+#------------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,358 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import os
+import threading
+import time
+import unittest
+
+from azure.common import (
+    AzureConflictHttpError,
+    AzureHttpError,
+)
+from azure.storage import (
+    AdaptiveConcurrencyLimiter,
+    StorageMetrics,
+)
+from azure.storage.blob import (
+    AppendBlobService,
+    BlockBlobService,
+    HedgePolicy,
+    PageBlobService,
+)
+from azure.storage.queue import QueueService
+from azure.storage.retry import LinearRetry
+from azure.storage.table import (
+    TableBatch,
+    TableService,
+)
+from tests.localstorage import LocalStorageServer
+from tests.testcase import StorageTestCase
+
+#------------------------------------------------------------------------------
+
+class StorageLocalServerTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageLocalServerTest, self).setUp()
+        self.server = LocalStorageServer(0, 0, 0).start()
+
+    def tearDown(self):
+        self.server.stop()
+        return super(StorageLocalServerTest, self).tearDown()
+
+    #--Helpers-----------------------------------------------------------------
+    def _create_service(self, service_class):
+        service = self.server.create_service(service_class)
+        service.retry = LinearRetry(backoff=0, max_attempts=3).retry
+        return service
+
+    #--Test cases for blobs ---------------------------------------------------
+    def test_block_blob_chunked_round_trip(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.MAX_SINGLE_PUT_SIZE = 1024
+        service.MAX_BLOCK_SIZE = 1024
+        service.MAX_SINGLE_GET_SIZE = 1024
+        service.MAX_CHUNK_GET_SIZE = 1024
+        service.create_container('container')
+        data = os.urandom(10000)
+
+        # Act
+        service.create_blob_from_bytes('container', 'blob', data, max_connections=4)
+        blob = service.get_blob_to_bytes('container', 'blob', max_connections=4, validate_content=True)
+        block_list = service.get_block_list('container', 'blob')
+
+        # Assert
+        self.assertEqual(blob.content, data)
+        self.assertEqual(blob.properties.content_length, len(data))
+        self.assertEqual(len(block_list.committed_blocks), 10)
+        self.assertEqual(block_list.uncommitted_blocks, [])
+
+    def test_get_blob_range(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.create_container('container')
+        data = os.urandom(2000)
+        service.create_blob_from_bytes('container', 'blob', data)
+
+        # Act
+        blob = service.get_blob_to_bytes('container', 'blob', start_range=100, end_range=1099)
+        empty = service.create_blob_from_bytes('container', 'empty', b'')
+        empty_blob = service.get_blob_to_bytes('container', 'empty')
+
+        # Assert
+        self.assertEqual(blob.content, data[100:1100])
+        self.assertEqual(blob.properties.content_range, 'bytes 100-1099/2000')
+        self.assertEqual(empty_blob.content, b'')
+
+    def test_page_blob_ranges(self):
+        # Arrange
+        service = self._create_service(PageBlobService)
+        service.create_container('container')
+        service.create_blob('container', 'blob', 4096)
+
+        # Act
+        service.update_page('container', 'blob', b'a' * 1024, 0, 1023)
+        service.update_page('container', 'blob', b'b' * 512, 2048, 2559)
+        service.update_page('container', 'blob', b'c' * 512, 2560, 3071)
+        service.clear_page('container', 'blob', 512, 1023)
+        ranges = service.get_page_ranges('container', 'blob')
+        blob = service.get_blob_to_bytes('container', 'blob')
+
+        # Assert
+        self.assertEqual([(r.start, r.end) for r in ranges], [(0, 511), (2048, 3071)])
+        self.assertEqual(blob.content, b'a' * 512 + b'\x00' * 1536 + b'b' * 512 + b'c' * 512 + b'\x00' * 1024)
+
+    def test_append_blob_offsets(self):
+        # Arrange
+        service = self._create_service(AppendBlobService)
+        service.create_container('container')
+        service.create_blob('container', 'blob')
+
+        # Act
+        first = service.append_block('container', 'blob', b'abc')
+        second = service.append_block('container', 'blob', b'def', appendpos_condition=3)
+        with self.assertRaises(AzureHttpError):
+            service.append_block('container', 'blob', b'ghi', appendpos_condition=3)
+        with self.assertRaises(AzureHttpError):
+            service.append_block('container', 'blob', b'ghi', maxsize_condition=8)
+
+        # Assert
+        self.assertEqual((first.append_offset, second.append_offset), (0, 3))
+        self.assertEqual(second.committed_block_count, 2)
+        self.assertEqual(service.get_blob_to_bytes('container', 'blob').content, b'abcdef')
+
+    def test_retries_injected_failures(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.create_container('container')
+        self.server.fail_requests(2, service='blob')
+
+        # Act
+        service.create_blob_from_bytes('container', 'blob', b'data')
+
+        # Assert
+        self.assertEqual(service.get_blob_to_bytes('container', 'blob').content, b'data')
+        self.assertEqual(self.server.request_counts['blob'], 5)
+
+    def test_hedged_download(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.MAX_SINGLE_GET_SIZE = 1024
+        service.MAX_CHUNK_GET_SIZE = 1024
+        service.create_container('container')
+        data = os.urandom(8 * 1024)
+        service.create_blob_from_bytes('container', 'blob', data)
+
+        reported = []
+        service.hedge_policy = HedgePolicy(min_samples=2, min_delay=0.5, callback=reported.append)
+        requests = []
+        lock = threading.Lock()
+
+        def slow_fifth_request(request):
+            # The first get and the ranges before the fifth set the hedge delay
+            with lock:
+                requests.append(request)
+                straggler = len(requests) == 5
+            if straggler:
+                time.sleep(2)
+        service.request_callback = slow_fifth_request
+
+        # Act
+        started = time.time()
+        blob = service.get_blob_to_bytes('container', 'blob', max_connections=2)
+        elapsed = time.time() - started
+
+        # Assert
+        self.assertEqual(blob.content, data)
+        self.assertLess(elapsed, 2)
+        self.assertEqual(len(reported), 1)
+        self.assertEqual(reported[0].ranges, 7)
+        self.assertGreaterEqual(reported[0].hedged, 1)
+        self.assertGreaterEqual(reported[0].hedges_won, 1)
+
+    def test_concurrency_limiter(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.MAX_BLOCK_SIZE = 1024
+        service.MAX_SINGLE_PUT_SIZE = 1024
+        service.concurrency_limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        service.create_container('container')
+        host = service.primary_endpoint.split('/', 1)[0]
+        self.server.fail_requests(2, status=503, service='blob')
+        data = os.urandom(16 * 1024)
+
+        # Act
+        service.create_blob_from_bytes('container', 'blob', data, max_connections=4)
+
+        # Assert
+        self.assertEqual(service.get_blob_to_bytes('container', 'blob').content, data)
+        self.assertEqual(service.concurrency_limiter.get_throttled(host), 2)
+        self.assertLess(service.concurrency_limiter.get_limit(host), 8)
+
+    def test_timing_callback(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+        service.MAX_SINGLE_PUT_SIZE = 1024
+        service.MAX_BLOCK_SIZE = 1024
+        service.MAX_SINGLE_GET_SIZE = 1024
+        service.MAX_CHUNK_GET_SIZE = 1024
+        service.create_container('container')
+        reports = []
+        service.timing_callback = reports.append
+        data = os.urandom(10000)
+
+        # Act
+        service.create_blob_from_bytes('container', 'blob', data, max_connections=4, validate_content=True)
+        service.get_blob_to_bytes('container', 'blob', max_connections=4)
+        service.get_blob_properties('container', 'blob')
+
+        # Assert
+        upload, download, properties = reports
+        self.assertEqual(upload.operation, 'create_blob_from_stream')
+        self.assertEqual(sorted(set(r.operation for r in upload.requests)), ['put_block', 'put_block_list'])
+        self.assertEqual(len(upload.requests), 11)
+        self.assertGreater(upload.cpu['hash'], 0)
+        self.assertGreater(upload.cpu['sign'], 0)
+        self.assertEqual(download.operation, 'get_blob_to_stream')
+        self.assertEqual(len(download.requests), 10)
+        self.assertGreater(download.cpu['write'], 0)
+        self.assertEqual(properties.operation, 'get_blob_properties')
+        self.assertEqual(properties.requests[0].status, 200)
+        self.assertIsNotNone(properties.requests[0].first_byte)
+        self.assertGreater(properties.cpu_total, 0)
+        self.assertGreater(upload.get_phase_total('connect'), 0)
+        self.assertGreaterEqual(upload.elapsed, max(r.elapsed for r in upload.requests))
+
+    def test_missing_container(self):
+        # Arrange
+        service = self._create_service(BlockBlobService)
+
+        # Act
+        exists = service.exists('container')
+        created = service.create_container('container')
+        with self.assertRaises(AzureConflictHttpError):
+            service.create_container('container', fail_on_exist=True)
+
+        # Assert
+        self.assertFalse(exists)
+        self.assertTrue(created)
+
+    #--Test cases for queues --------------------------------------------------
+    def test_queue_messages(self):
+        # Arrange
+        service = self._create_service(QueueService)
+        service.create_queue('queue')
+        service.put_message('queue', u'first')
+        service.put_message('queue', u'second')
+
+        # Act
+        received = service.get_messages('queue', num_messages=1, visibility_timeout=60)[0]
+        peeked = service.peek_messages('queue', num_messages=32)
+        updated = service.update_message('queue', received.id, received.pop_receipt, 0, content=u'changed')
+        with self.assertRaises(AzureHttpError):
+            service.delete_message('queue', received.id, received.pop_receipt)
+        again = service.get_messages('queue', num_messages=32)
+        for message in again:
+            service.delete_message('queue', message.id, message.pop_receipt)
+
+        # Assert
+        self.assertEqual(received.content, u'first')
+        self.assertEqual([message.content for message in peeked], [u'second'])
+        self.assertIsNone(peeked[0].pop_receipt)
+        self.assertNotEqual(updated.pop_receipt, received.pop_receipt)
+        self.assertEqual(sorted(message.content for message in again), [u'changed', u'second'])
+        self.assertEqual(sorted(message.dequeue_count for message in again), [1, 2])
+        self.assertEqual(service.peek_messages('queue'), [])
+
+    #--Test cases for tables --------------------------------------------------
+    def test_metrics(self):
+        # Arrange
+        service = self._create_service(QueueService)
+        service.metrics = StorageMetrics()
+        service.create_queue('queue')
+        self.server.fail_requests(1, status=503, service='queue')
+
+        # Act
+        service.put_message('queue', u'message')
+        service.get_messages('queue')
+        with self.assertRaises(AzureHttpError):
+            service.delete_message('queue', 'missing', 'receipt')
+        snapshot = service.metrics.snapshot()
+        prometheus = service.metrics.to_prometheus()
+        opentelemetry = service.metrics.to_opentelemetry()
+
+        # Assert
+        put_message = snapshot.operations['put_message']
+        self.assertEqual((put_message.count, put_message.errors), (1, 0))
+        self.assertEqual(put_message.retries, {'503': 1})
+        self.assertEqual(put_message.throttled, 1)
+        self.assertGreater(put_message.bytes_sent, 0)
+        self.assertEqual(put_message.latency_buckets[-1], (float('inf'), 1))
+        self.assertGreater(snapshot.operations['get_messages'].bytes_received, 0)
+        self.assertEqual(snapshot.operations['delete_message'].errors, 1)
+        self.assertEqual(snapshot.in_flight, 0)
+        self.assertIn('azure_storage_operation_duration_seconds_count{operation="put_message"} 1\n', prometheus)
+        self.assertIn('azure_storage_retries_total{operation="put_message",cause="503"} 1\n', prometheus)
+        self.assertEqual(opentelemetry[0]['name'], 'azure.storage.operation.duration')
+        self.assertEqual(len(opentelemetry[0]['histogram']['dataPoints']), 4)
+
+    def test_table_entities(self):
+        # Arrange
+        service = self._create_service(TableService)
+        service.create_table('table')
+        for index in range(5):
+            service.insert_entity('table', {'PartitionKey': 'pk', 'RowKey': str(index), 'age': index})
+
+        # Act
+        merged = service.merge_entity('table', {'PartitionKey': 'pk', 'RowKey': '1', 'name': 'one'})
+        entity = service.get_entity('table', 'pk', '1')
+        older = service.query_entities('table', filter="PartitionKey eq 'pk' and age ge 2", num_results=2)
+        rest = service.query_entities('table', filter="PartitionKey eq 'pk' and age ge 2",
+                                      marker=older.next_marker)
+
+        # Assert
+        self.assertEqual((entity.age, entity.name, entity.etag), (1, 'one', merged))
+        self.assertEqual([e.RowKey for e in older], ['2', '3'])
+        self.assertEqual([e.RowKey for e in rest], ['4'])
+
+    def test_table_batch(self):
+        # Arrange
+        service = self._create_service(TableService)
+        service.create_table('table')
+        service.insert_entity('table', {'PartitionKey': 'pk', 'RowKey': 'existing'})
+
+        # Act
+        batch = TableBatch()
+        batch.insert_entity({'PartitionKey': 'pk', 'RowKey': 'a'})
+        batch.insert_or_replace_entity({'PartitionKey': 'pk', 'RowKey': 'b'})
+        batch.delete_entity('pk', 'existing')
+        etags = service.commit_batch('table', batch)
+
+        failing = TableBatch()
+        failing.insert_entity({'PartitionKey': 'pk', 'RowKey': 'c'})
+        failing.insert_entity({'PartitionKey': 'pk', 'RowKey': 'a'})
+        with self.assertRaises(AzureHttpError):
+            service.commit_batch('table', failing)
+
+        # Assert
+        self.assertEqual(len(etags), 3)
+        self.assertIsNotNone(etags[0])
+        self.assertEqual([e.RowKey for e in service.query_entities('table')], ['a', 'b'])
+
+
+#------------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()
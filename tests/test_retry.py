@@ -14,12 +14,21 @@
 #--------------------------------------------------------------------------
 import unittest
 from io import BytesIO
-from azure.storage import LocationMode
+from azure.storage import (
+    LocationMode,
+    RetryContext,
+)
+from azure.storage._http import (
+    HTTPRequest,
+    HTTPResponse,
+)
 from azure.storage.blob import BlockBlobService
 from azure.common import AzureHttpError
 from azure.storage.retry import (
     LinearRetry,
     ExponentialRetry,
+    DecorrelatedJitterRetry,
+    RetryBudget,
     no_retry,
 )
 from tests.testcase import (
@@ -44,6 +53,14 @@ class ResponseCallback(object):
         if response.status == self.status:
             response.status = self.new_status
 
+def _failed_context(status=503, headers=None):
+    context = RetryContext()
+    context.request = HTTPRequest()
+    context.request.host_locations = {LocationMode.PRIMARY: 'account.blob.core.windows.net'}
+    context.response = HTTPResponse(status, 'Server Busy', headers or {}, b'')
+    context.location_mode = LocationMode.PRIMARY
+    return context
+
 class _OperationContext(object):
     def __init__(self, location_lock=False):
         self.location_lock = location_lock
@@ -278,6 +295,48 @@ class StorageRetryTest(StorageTestCase):
         service._list_containers(prefix='lock', _context=context)
         
 
+    def test_decorrelated_jitter_retry(self):
+        # Arrange
+        retry = DecorrelatedJitterRetry(initial_backoff=1, max_backoff=5, max_attempts=20).retry
+        context = _failed_context()
+
+        # Act
+        backoffs = [retry(context) for _ in range(20)]
+
+        # Assert
+        self.assertIsNone(retry(context))
+        previous = 1
+        for backoff in backoffs:
+            self.assertTrue(1 <= backoff <= min(5, previous * 3))
+            previous = backoff
+        self.assertGreater(len(set(backoffs)), 1)
+
+    def test_retry_budget(self):
+        # Arrange
+        budget = RetryBudget(max_tokens=2, tokens_per_second=0)
+        first = LinearRetry(backoff=0, retry_budget=budget).retry
+        second = ExponentialRetry(initial_backoff=0, retry_budget=budget).retry
+
+        # Act
+        intervals = [first(_failed_context()), second(_failed_context()), first(_failed_context())]
+
+        # Assert
+        self.assertEqual(intervals, [0, 3, None])
+        self.assertEqual((budget.retries, budget.exhausted), (2, 1))
+
+    def test_retry_after(self):
+        # Arrange
+        retry = LinearRetry(backoff=5).retry
+
+        # Act
+        longer = retry(_failed_context(headers={'retry-after': '20'}))
+        shorter = retry(_failed_context(headers={'retry-after': '1'}))
+        date = retry(_failed_context(headers={'retry-after': 'Sun, 06 Nov 1994 08:49:37 GMT'}))
+        invalid = retry(_failed_context(headers={'retry-after': 'soon'}))
+
+        # Assert
+        self.assertEqual((longer, shorter, date, invalid), (20, 5, 5, 5))
+
 #------------------------------------------------------------------------------
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,301 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#--------------------------------------------------------------------------
+import base64
+import gzip
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from io import BytesIO
+
+import requests
+
+from azure.common import AzureException
+from azure.storage._http import HTTPRequest
+from azure.storage._http.connectionpool import _PooledSession
+from azure.storage._http.httpclient import _HTTPClient
+from azure.storage.blob import BlockBlobService
+from azure.storage.retry import LinearRetry
+from tests.testcase import StorageTestCase
+
+if sys.version_info >= (3,):
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+else:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+#------------------------------------------------------------------------------
+
+class _ScriptedServer(ThreadingMixIn, HTTPServer):
+    '''
+    A local http server sending canned responses in order. A response is a
+    tuple of status, headers, body, the number of body bytes to send before
+    dropping the connection, or None to send it all, and the time to pause
+    between the quarters of the body. The requests received are kept as
+    tuples of method, path, headers and body.
+    '''
+    daemon_threads = True
+
+    def __init__(self, responses):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), _ScriptedHandler)
+        self.responses = list(responses)
+        self.requests = []
+        self.connections = 0
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.server.requests.append((self.command, self.path, self.headers, self.rfile.read(length)))
+
+        status, headers, body, cut_at, pause = self.server.responses.pop(0)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if cut_at is not None:
+            self.wfile.write(body[:cut_at])
+            self.wfile.flush()
+            self.close_connection = True
+        elif pause:
+            quarter = len(body) // 4 + 1
+            for start in range(0, len(body), quarter):
+                time.sleep(pause)
+                self.wfile.write(body[start:start + quarter])
+                self.wfile.flush()
+        else:
+            self.wfile.write(body)
+
+    do_PUT = do_GET
+
+
+def _blob_response(body, headers=(), cut_at=None, pause=0):
+    headers = [
+        ('ETag', '"0x8D3"'),
+        ('Last-Modified', 'Mon, 01 Aug 2016 00:00:00 GMT'),
+        ('x-ms-blob-type', 'BlockBlob'),
+    ] + list(headers)
+    return 200, headers, body, cut_at, pause
+
+
+class _NonSeekableStream(object):
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data):
+        self.data += data
+
+#------------------------------------------------------------------------------
+
+class StorageStreamedDownloadTest(StorageTestCase):
+
+    def setUp(self):
+        super(StorageStreamedDownloadTest, self).setUp()
+        self.data = os.urandom(10000)
+        self.server = None
+
+    def tearDown(self):
+        if self.server is not None:
+            self.server.stop()
+        return super(StorageStreamedDownloadTest, self).tearDown()
+
+    #--Helpers-----------------------------------------------------------------
+    def _start_server(self, responses, request_session=None):
+        self.server = _ScriptedServer(responses)
+        self.server.start()
+        service = BlockBlobService('account', 'a2V5',
+                                   custom_domain='127.0.0.1:{0}'.format(self.server.server_port),
+                                   protocol='http', request_session=request_session)
+        service.retry = LinearRetry(backoff=0, max_attempts=1).retry
+        return service
+
+    #--Test cases -------------------------------------------------------------
+    def test_iter_content(self):
+        # Arrange
+        self._start_server([_blob_response(self.data)])
+        client = _HTTPClient('http', requests.Session(), 10)
+        request = HTTPRequest()
+        request.method = 'GET'
+        request.host = '127.0.0.1:{0}'.format(self.server.server_port)
+        request.path = '/container/blob'
+
+        # Act
+        response = client.perform_request(request, stream=True)
+        pieces = list(response.iter_content(1000))
+        response.close()
+
+        # Assert
+        self.assertIsNone(response.body)
+        self.assertTrue(all(len(piece) <= 1000 for piece in pieces))
+        self.assertEqual(b''.join(pieces), self.data)
+
+    def test_get_blob_streams_into_stream(self):
+        # Arrange
+        service = self._start_server([_blob_response(self.data)])
+        stream = BytesIO(b'head')
+        stream.seek(4)
+
+        # Act
+        blob = service.get_blob_to_stream('container', 'blob', stream, max_connections=1)
+
+        # Assert
+        self.assertIsNone(blob.content)
+        self.assertEqual(blob.properties.content_length, len(self.data))
+        self.assertEqual(stream.getvalue(), b'head' + self.data)
+
+    def test_retry_after_partial_body_overwrites(self):
+        # Arrange
+        service = self._start_server([
+            _blob_response(self.data, cut_at=5000),
+            _blob_response(self.data),
+        ])
+        stream = BytesIO(b'head')
+        stream.seek(4)
+
+        # Act
+        service.get_blob_to_stream('container', 'blob', stream, max_connections=1)
+
+        # Assert
+        self.assertEqual(stream.getvalue(), b'head' + self.data)
+
+    def test_retry_after_partial_body_into_appended_file(self):
+        # Arrange
+        service = self._start_server([
+            _blob_response(self.data, cut_at=5000),
+            _blob_response(self.data),
+        ])
+        handle, file_path = tempfile.mkstemp()
+        os.write(handle, b'head')
+        os.close(handle)
+
+        # Act
+        try:
+            service.get_blob_to_path('container', 'blob', file_path, open_mode='ab',
+                                     max_connections=1)
+            with open(file_path, 'rb') as stream:
+                actual = stream.read()
+        finally:
+            os.remove(file_path)
+
+        # Assert
+        self.assertEqual(actual, b'head' + self.data)
+
+    def test_validate_content_while_streaming(self):
+        # Arrange
+        md5 = base64.b64encode(hashlib.md5(self.data).digest()).decode('utf-8')
+        service = self._start_server([
+            _blob_response(self.data, [('Content-MD5', md5)]),
+            _blob_response(self.data, [('Content-MD5', md5[::-1])]),
+        ])
+
+        # Act
+        blob = service.get_blob_to_bytes('container', 'blob', start_range=0,
+                                         end_range=len(self.data) - 1,
+                                         validate_content=True, max_connections=1)
+        with self.assertRaises(AzureException):
+            service.get_blob_to_stream('container', 'blob', BytesIO(), start_range=0,
+                                       end_range=len(self.data) - 1,
+                                       validate_content=True, max_connections=1)
+
+        # Assert
+        self.assertEqual(blob.content, self.data)
+
+    def test_encoded_body_same_streamed_or_buffered(self):
+        # Arrange
+        compressed = BytesIO()
+        with gzip.GzipFile(fileobj=compressed, mode='wb') as stream:
+            stream.write(self.data)
+        headers = [('Content-Encoding', 'gzip')]
+        service = self._start_server([
+            _blob_response(compressed.getvalue(), headers),
+            _blob_response(compressed.getvalue(), headers),
+        ])
+        buffered = _NonSeekableStream()
+
+        # Act
+        streamed = service.get_blob_to_bytes('container', 'blob', max_connections=1)
+        service.get_blob_to_stream('container', 'blob', buffered, max_connections=1)
+
+        # Assert
+        self.assertEqual(streamed.content, self.data)
+        self.assertEqual(buffered.data, self.data)
+
+    def test_close_releases_connection(self):
+        # Arrange
+        service = self._start_server([_blob_response(self.data) for i in range(3)])
+
+        # Act
+        for i in range(3):
+            service.get_blob_to_bytes('container', 'blob', max_connections=1)
+
+        # Assert
+        self.assertEqual(self.server.connections, 1)
+
+    def test_connection_pool_stats(self):
+        # Arrange
+        service = self._start_server([_blob_response(self.data) for i in range(3)])
+
+        # Act
+        for i in range(3):
+            service.get_blob_to_bytes('container', 'blob', max_connections=1)
+        stats = service.connection_pool_stats
+
+        # Assert
+        self.assertEqual(stats.requests, 3)
+        self.assertEqual(stats.opens, 1)
+        self.assertEqual(stats.reuses, 2)
+        self.assertEqual(stats.exhausted, 0)
+        self.assertEqual(stats.discards, 0)
+
+    def test_connection_pool_closes_idle_connections(self):
+        # Arrange
+        service = self._start_server([_blob_response(self.data) for i in range(2)],
+                                     _PooledSession(4, idle_timeout=0))
+
+        # Act
+        for i in range(2):
+            service.get_blob_to_bytes('container', 'blob', max_connections=1)
+
+        # Assert
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(service.connection_pool_stats.opens, 2)
+
+#------------------------------------------------------------------------------
+if __name__ == '__main__':
+    unittest.main()